@@ -0,0 +1,123 @@
+#-----------------------------------------------------------------------------------------------------------------------#
+# Function: analysis                                                                                                    #
+# Purpose: host side peak, harmonic and band power analysis of spectrum analyser traces                                 #
+# Parameters: accepts and returns refer to the code                                                                     #
+# Author: TJA                                                                                                           #
+# Date: 17/10/2026                                                                                                      #
+# Revision: A                                                                                                           #
+# Status: development                                                                                                   #
+#-----------------------------------------------------------------------------------------------------------------------#
+# The trace is fetched once as a REAL,32 binary block and everything is worked out from it on the host, instead of
+# placing markers and reading them back one round trip at a time, e.g.
+#
+#  (freqs, levels) = analysis.fetch_cxa(addr_spec_an, 1)
+#  (tone_freq, tone_level) = analysis.tone(freqs, levels, 1000000, 50000)
+#  harmonics = analysis.harmonics(freqs, levels, tone_freq, 50000)
+#
+# Frequencies are in Hz, levels in dBm as displayed, bandwidths in Hz.
+#-----------------------------------------------------------------------------------------------------------------------#
+
+#imports
+import math
+import numpy
+
+import equip
+
+#noise bandwidth of the analyser resolution bandwidth filter relative to its -3dB bandwidth (gaussian filters)
+nbw_ratio = 1.06
+
+#Boltzmann constant (J/K)
+boltzmann = 1.380649e-23
+
+#-----------------------------------------------------------------------------------------------------------------------#
+# Purpose: Trace fetch                                                                                                  #
+#-----------------------------------------------------------------------------------------------------------------------#
+def fetch_cxa(addr_cxa, trace):
+ # Frequency axis and levels of a CXA trace as numpy arrays
+ (start, stop) = equip.freqssrd_cxa(addr_cxa)
+ levels = equip.trace_cxa(addr_cxa, trace)
+ return(numpy.linspace(start, stop, len(levels)), levels)
+#-----------------------------------------------------------------------------------------------------------------------#
+def fetch_fsp(addr_fsp, trace):
+ # Frequency axis and levels of an FSP trace as numpy arrays
+ (start, stop) = equip.freqssrd_fsp(addr_fsp)
+ levels = equip.trace_fsp(addr_fsp, trace)
+ return(numpy.linspace(start, stop, len(levels)), levels)
+#-----------------------------------------------------------------------------------------------------------------------#
+# Purpose: Peaks                                                                                                        #
+#-----------------------------------------------------------------------------------------------------------------------#
+def peaks(freqs, levels, threshold, excursion=6.0):
+ # Indices of the peaks above threshold (dBm) which fall by at least excursion (dB) on both sides before the trace
+ # rises above them again, highest first
+ levels = numpy.asarray(levels, dtype=numpy.float64)
+ maxima = numpy.flatnonzero((levels[1:-1] > levels[:-2]) & (levels[1:-1] >= levels[2:])) + 1
+ maxima = maxima[levels[maxima] >= threshold]
+ found = []
+ for index in maxima:
+  level = levels[index]
+  dips = []
+  for side in (levels[:index][::-1], levels[index + 1:]):
+   higher = numpy.flatnonzero(side > level)
+   if len(higher) > 0:
+    side = side[:higher[0]]
+   dips.append(level - side.min() if len(side) > 0 else math.inf)
+  if min(dips) >= excursion:
+   found.append(index)
+ found = numpy.array(found, dtype=int)
+ return(found[numpy.argsort(levels[found])[::-1]])
+#-----------------------------------------------------------------------------------------------------------------------#
+def interpolate(freqs, levels, index):
+ # Frequency and level of a peak refined by fitting a parabola through the peak point and its two neighbours (in dB),
+ # which recovers the tone between trace points when the RBW spans a few points
+ if index <= 0 or index >= len(levels) - 1:
+  return(float(freqs[index]), float(levels[index]))
+ (left, centre, right) = [float(level) for level in levels[index - 1:index + 2]]
+ curvature = left - 2*centre + right
+ if curvature >= 0:
+  return(float(freqs[index]), centre)
+ offset = 0.5 * (left - right) / curvature
+ step = float(freqs[index + 1] - freqs[index])
+ return(float(freqs[index]) + offset*step, centre - 0.25*(left - right)*offset)
+#-----------------------------------------------------------------------------------------------------------------------#
+def tone(freqs, levels, freq, window):
+ # Interpolated frequency and level of the highest point within window (Hz) of freq, nan if freq is off the trace
+ inwindow = numpy.flatnonzero(numpy.abs(freqs - freq) <= window)
+ if len(inwindow) == 0:
+  return(math.nan, math.nan)
+ return(interpolate(freqs, levels, inwindow[numpy.argmax(levels[inwindow])]))
+#-----------------------------------------------------------------------------------------------------------------------#
+def harmonics(freqs, levels, fundamental, window, orders=(2, 3)):
+ # Frequency, level and level relative to the fundamental (dBc) of the harmonics of a tone, one tuple per order,
+ # nan for harmonics beyond the end of the trace
+ (fund_freq, fund_level) = tone(freqs, levels, fundamental, window)
+ result = []
+ for order in orders:
+  (harm_freq, harm_level) = tone(freqs, levels, order * fund_freq, window)
+  result.append((order, harm_freq, harm_level, harm_level - fund_level))
+ return(result)
+#-----------------------------------------------------------------------------------------------------------------------#
+# Purpose: Power                                                                                                        #
+#-----------------------------------------------------------------------------------------------------------------------#
+def band_power(freqs, levels, low, high, rbw):
+ # Power (dBm) integrated from low to high (Hz) of a trace taken with resolution bandwidth rbw (Hz), nan if no trace
+ # point falls in the band
+ inband = (freqs >= low) & (freqs <= high)
+ if not numpy.any(inband):
+  return(math.nan)
+ step = float(freqs[1] - freqs[0])
+ power = numpy.sum(numpy.power(10.0, numpy.asarray(levels, dtype=numpy.float64)[inband] / 10))
+ return(10 * math.log10(power * step / (rbw * nbw_ratio)))
+#-----------------------------------------------------------------------------------------------------------------------#
+def noise_density(freqs, levels, freq, window, rbw):
+ # Average noise power density (dBm/Hz) within window (Hz) of freq, from a trace taken with no tone present, nan if
+ # no trace point falls in the window
+ inwindow = numpy.abs(freqs - freq) <= window
+ if not numpy.any(inwindow):
+  return(math.nan)
+ power = numpy.mean(numpy.power(10.0, numpy.asarray(levels, dtype=numpy.float64)[inwindow] / 10))
+ return(10 * math.log10(power / (rbw * nbw_ratio)))
+#-----------------------------------------------------------------------------------------------------------------------#
+def thermal_noise(temp):
+ # Thermal noise power density kT (dBm/Hz) at temp degrees Celsius
+ return(10 * math.log10(boltzmann * (temp + 273.15) * 1000))
+#-----------------------------------------------------------------------------------------------------------------------#
@@ -0,0 +1,95 @@
+#-----------------------------------------------------------------------------------------------------------------------#
+# Function: autorange                                                                                                   #
+# Purpose: predictive spectrum analyser reference level ranging for swept measurements                                  #
+# Parameters: accepts and returns refer to the code                                                                     #
+# Author: TJA                                                                                                           #
+# Date: 17/10/2026                                                                                                      #
+# Revision: A                                                                                                           #
+# Status: development                                                                                                   #
+#-----------------------------------------------------------------------------------------------------------------------#
+# The level at the next point of a sweep is predicted from the previous points of the same sweep (the LED response is
+# smooth) and the reference level is only changed, once, when the prediction falls outside the headroom window below
+# the current reference level. The measurement is only repeated at a new reference level when the measured peak
+# itself falls outside the window (overloaded or under range), e.g.
+#
+#  ranging = autorange.new(addr_spec_an)
+#  for freq in freq_list:
+#   ...
+#   (peak_freq, peak_level) = autorange.measure(ranging, freq, read)
+#
+# where read(addr) makes the measurement and returns (frequency, level). The attenuation is left coupled to the
+# reference level (atten_cxa "AUTO") so it follows every change.
+#-----------------------------------------------------------------------------------------------------------------------#
+
+#imports
+import math
+
+import equip
+
+#-----------------------------------------------------------------------------------------------------------------------#
+def new(addr, setref=equip.reflev_cxa, start=10, headroom=10, window=(3, 25), step=5, retries=2):
+ # Ranging state for one sweep. start is the reference level (dBm) used until there is a measurement to go on,
+ # headroom (dB) is put between the predicted level and the reference level, a measured peak less than window[0] dB
+ # or more than window[1] dB below the reference level is over or under range. Reference levels are multiples of step
+ return({"addr": addr, "setref": setref, "start": start, "headroom": headroom, "window": window, "step": step,
+         "retries": retries, "reflev": None, "points": [], "reranges": 0})
+#-----------------------------------------------------------------------------------------------------------------------#
+def predict(state, freq):
+ # Level expected at freq, extrapolated linearly in log frequency from the last two points, or the last point
+ points = state["points"]
+ if len(points) == 0:
+  return(None)
+ (freq1, level1) = points[-1]
+ if len(points) == 1 or freq <= 0 or freq1 <= 0 or points[-2][0] <= 0 or points[-2][0] == freq1:
+  return(level1)
+ (freq0, level0) = points[-2]
+ slope = (level1 - level0) / (math.log10(freq1) - math.log10(freq0))
+ return(level1 + slope * (math.log10(freq) - math.log10(freq1)))
+#-----------------------------------------------------------------------------------------------------------------------#
+def reflev(state, level):
+ # Reference level giving headroom above level, rounded up to a whole step
+ if level is None or math.isnan(level):
+  return(state["start"])
+ return(int(math.ceil((level + state["headroom"]) / state["step"]) * state["step"]))
+#-----------------------------------------------------------------------------------------------------------------------#
+def setref(state, level):
+ # Sets the reference level (the setter waits for the analyser to settle), returns 1 if it changed
+ if level == state["reflev"]:
+  return(0)
+ state["setref"](state["addr"], level)
+ state["reflev"] = level
+ return(1)
+#-----------------------------------------------------------------------------------------------------------------------#
+def check(state, level):
+ # "OVER" if the peak is within window[0] dB of the reference level (or above it, i.e. the analyser may be
+ # overloaded), "UNDER" if more than window[1] dB below it, otherwise "OK"
+ if math.isnan(level) or level > state["reflev"] - state["window"][0]:
+  return("OVER")
+ if level < state["reflev"] - state["window"][1]:
+  return("UNDER")
+ return("OK")
+#-----------------------------------------------------------------------------------------------------------------------#
+def measure(state, freq, read):
+ # Sets the reference level for the predicted level (unless it is already in the window of the current one),
+ # measures with read(addr) and re-ranges on the measured level if that is out of the window, returning the
+ # (frequency, level) of the last measurement
+ predicted = predict(state, freq)
+ if state["reflev"] is None or (predicted is not None and check(state, predicted) != "OK"):
+  setref(state, reflev(state, predicted))
+ (peak_freq, peak_level) = read(state["addr"])
+ for count in range(state["retries"]):
+  verdict = check(state, peak_level)
+  if verdict == "OK":
+   break
+  if math.isnan(peak_level) or peak_level >= state["reflev"]:
+   level = reflev(state, state["reflev"]) # nothing to go on, or clipped at the top, step up by the headroom
+  else:
+   level = reflev(state, peak_level)
+  if setref(state, level) == 0:
+   break
+  state["reranges"] = state["reranges"] + 1 # the reference level setter waits for the analyser to settle
+  (peak_freq, peak_level) = read(state["addr"])
+ if not math.isnan(peak_level):
+  state["points"].append((freq, peak_level))
+ return(peak_freq, peak_level)
+#-----------------------------------------------------------------------------------------------------------------------#
@@ -0,0 +1,325 @@
+#-----------------------------------------------------------------------------------------------------------------------#
+# Function: bench_sweep                                                                                                 #
+# Purpose: sweep throughput benchmarks against the simulated instruments, results written as JSON                       #
+# Parameters: see python bench_sweep.py --help, e.g. python bench_sweep.py --points 21 --output bench.json             #
+# Author: TJA                                                                                                           #
+# Date: 17/10/2026                                                                                                      #
+# Revision: A                                                                                                           #
+# Status: development                                                                                                   #
+#-----------------------------------------------------------------------------------------------------------------------#
+# Every benchmark reports points per second and the seconds per point spent in each phase:
+#  settle   - fixed time.sleep calls in equip and macro
+#  opc      - operation complete waits (OPCQ and the *OPC? of single sweeps), including their bus traffic
+#  transfer - instrument writes, reads and datagrams outside the operation complete waits
+#  parse    - converting replies and binary blocks to numbers
+#  disk     - formatting and writing the results, captures and column store files
+#  other    - everything else (the sweep logic itself)
+# and the peak resident memory (peak_rss_mb) of the process it ran in, each benchmark being run in a process of its own
+# (forked from this one once the modules are imported) so the figure is that benchmark's alone.
+# Instrument latencies come from --latency/--settle or from a recorded --profile JSON file of the form
+#  {"latency": 0.002, "settle": 0.01, "sweep_time": 0.02, "command_latency": {"*RST": 0.5, "FREQ:CENT": 0.004}}
+# with the command_latency keys being simulator.header_key forms of the SCPI headers.
+#-----------------------------------------------------------------------------------------------------------------------#
+
+#imports
+import argparse
+import concurrent.futures
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+#append source directory (parent of this folder) and the instruments folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "instruments"))
+
+import autorange
+import colstore
+import csvf
+import equip
+import macro
+import psu7213300
+import simulator
+with contextlib.redirect_stdout(io.StringIO()): # banner printed on import
+ import vlc_led_test
+
+phases = ("settle", "opc", "transfer", "parse", "disk")
+
+#-----------------------------------------------------------------------------------------------------------------------#
+# Phase accounting, time is charged to the innermost phase running except inside an opaque phase (an operation
+# complete wait), which is charged in full including the transfers it makes. Only the time between begin() and end()
+# is measured, benchmarks call them around the sweep to leave out the rig set up and tear down
+class PhaseTimer:
+ def __init__(self):
+  self.stack = []
+  self.opaque = 0
+  self.begin()
+
+ def begin(self):
+  self.totals = dict.fromkeys(phases, 0.0)
+  self.start = time.perf_counter()
+  self.mark = self.start
+  self.stop = None
+  return(0)
+
+ def end(self):
+  if self.stop is None:
+   self.stop = time.perf_counter()
+  return(0)
+
+ @contextlib.contextmanager
+ def phase(self, name, opaque=False):
+  if self.opaque or self.stop is not None:
+   yield
+   return
+  now = time.perf_counter()
+  if self.stack:
+   self.totals[self.stack[-1]] += now - self.mark
+  self.stack.append(name)
+  self.mark = now
+  self.opaque = self.opaque + opaque
+  try:
+   yield
+  finally:
+   now = time.perf_counter()
+   if self.stop is not None: # ended inside this phase
+    now = self.stop
+   self.totals[name] += now - self.mark
+   self.stack.pop()
+   self.mark = now
+   self.opaque = self.opaque - opaque
+#-----------------------------------------------------------------------------------------------------------------------#
+class SleepProxy:
+ # Stands in for the time module of equip and macro so only their own sleeps are charged to settle
+ def __init__(self, timer):
+  self.timer = timer
+
+ def sleep(self, seconds):
+  with self.timer.phase("settle"):
+   time.sleep(seconds)
+
+ def __getattr__(self, name):
+  return(getattr(time, name))
+#-----------------------------------------------------------------------------------------------------------------------#
+@contextlib.contextmanager
+def instrumented(timer):
+ patches = [(equip, "OPCQ", "opc", True), (equip, "single_cxa", "opc", True),
+            (simulator.SimResource, "write", "transfer", False), (simulator.SimResource, "read", "transfer", False),
+            (simulator.SimResource, "read_bytes", "transfer", False), (simulator.SimResource, "ask", "transfer", False),
+            (psu7213300.PSU72Transport, "query_many", "transfer", False),
+            (equip, "str_strip", "parse", False), (equip, "strin_strout", "parse", False),
+            (equip, "BLOCKREAD", "parse", False),
+            (csvf, "fappn", "disk", False), (csvf, "fappn_trace", "disk", False),
+            (csvf.ResultsWriter, "writerow", "disk", False), (csvf.ResultsWriter, "writeblock", "disk", False),
+            (csvf.ResultsWriter, "flush", "disk", False), (csvf.ResultsWriter, "checkpoint", "disk", False),
+            (colstore.ColumnStore, "append_trace", "disk", False), (colstore.ColumnStore, "append_row", "disk", False),
+            (colstore.ColumnStore, "flush", "disk", False)]
+ originals = []
+ for (owner, name, phase, opaque) in patches:
+  original = getattr(owner, name)
+  originals.append((owner, name, original))
+  setattr(owner, name, wrap(timer, original, phase, opaque))
+ proxy = SleepProxy(timer)
+ originals.extend([(equip, "time", equip.time), (macro, "time", macro.time)])
+ equip.time = proxy
+ macro.time = proxy
+ try:
+  yield timer
+ finally:
+  for (owner, name, original) in reversed(originals):
+   setattr(owner, name, original)
+#-----------------------------------------------------------------------------------------------------------------------#
+def wrap(timer, func, phase, opaque):
+ def wrapper(*args, **kwargs):
+  with timer.phase(phase, opaque):
+   return(func(*args, **kwargs))
+ return(wrapper)
+#-----------------------------------------------------------------------------------------------------------------------#
+def peak_rss_mb():
+ # ru_maxrss is in kB on Linux and in bytes on macOS
+ peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+ return(peak / (1024*1024 if sys.platform == "darwin" else 1024))
+#-----------------------------------------------------------------------------------------------------------------------#
+def run(name, bench, settings):
+ timer = PhaseTimer()
+ result = {"name": name}
+ with tempfile.TemporaryDirectory() as tmpdir, contextlib.redirect_stdout(io.StringIO()):
+  try:
+   with instrumented(timer):
+    points = bench(settings, tmpdir, timer)
+  except Exception as error:
+   result["error"] = "%s: %s" %(type(error).__name__, error)
+   return(result)
+  timer.end()
+  seconds = timer.stop - timer.start
+ result["points"] = points
+ result["seconds"] = seconds
+ result["points_per_second"] = points / seconds
+ result["seconds_per_point"] = {phase: timer.totals[phase] / points for phase in phases}
+ result["seconds_per_point"]["other"] = (seconds - sum(timer.totals.values())) / points
+ result["seconds_per_point"]["total"] = seconds / points
+ result["peak_rss_mb"] = peak_rss_mb()
+ return(result)
+#-----------------------------------------------------------------------------------------------------------------------#
+def run_isolated(name, bench, settings):
+ # run() in a new worker process, so peak_rss_mb is not carried over from the benchmarks run before it
+ with concurrent.futures.ProcessPoolExecutor(max_workers=1) as pool:
+  return(pool.submit(run, name, bench, settings).result())
+#-----------------------------------------------------------------------------------------------------------------------#
+# Benchmarks, each takes the settings, a scratch directory and the phase timer and returns the number of points
+def resource_manager(settings):
+ rig = simulator.SimRig(sweep_time=settings["sweep_time"])
+ return(simulator.SimResourceManager(rig, settings["latency"], settings["settle"], settings["command_latency"]))
+#-----------------------------------------------------------------------------------------------------------------------#
+def sim_rig(settings):
+ rm = resource_manager(settings)
+ spec_an = rm.open_resource("TCPIP0::10.42.0.90::inst0::INSTR")
+ sig_gen = rm.open_resource("TCPIP0::10.42.0.38::inst0::INSTR")
+ for addr in (spec_an, sig_gen):
+  equip.OPCMODE(addr, "SRQ")
+  equip.CACHE(addr, "ON")
+ equip.SETTLEMODE(spec_an, settings["settle_mode"])
+ equip.init_cxa(spec_an)
+ equip.init_esg(sig_gen)
+ return(rm, spec_an, sig_gen)
+#-----------------------------------------------------------------------------------------------------------------------#
+def freq_list(settings):
+ return([1000000 + 1000000*count/(settings["points"] - 1) for count in range(settings["points"])])
+#-----------------------------------------------------------------------------------------------------------------------#
+def bench_main(settings, tmpdir, timer):
+ # Whole script, including the rig start up, with the sweep settings of vlc_led_test
+ vlc_led_test.main(resource_manager(settings), tmpdir + os.sep)
+ (store,) = [os.path.join(tmpdir, name) for name in os.listdir(tmpdir) if name.endswith("_results.store")]
+ return(len(colstore.load_rows(store, "freqresp")["sig_gen_freq"]))
+#-----------------------------------------------------------------------------------------------------------------------#
+def bench_freqresp_list(settings, tmpdir, timer):
+ (rm, spec_an, sig_gen) = sim_rig(settings)
+ with csvf.ResultsWriter(os.path.join(tmpdir, "results.csv")) as results, \
+      csvf.ResultsWriter(os.path.join(tmpdir, "captures.csv")) as captures:
+  timer.begin()
+  macro.freqresp_list(results, captures, spec_an, sig_gen, freq_list(settings), -10, 0)
+  timer.end()
+ return(settings["points"])
+#-----------------------------------------------------------------------------------------------------------------------#
+def bench_freqresp_maxhold(settings, tmpdir, timer):
+ (rm, spec_an, sig_gen) = sim_rig(settings)
+ with csvf.ResultsWriter(os.path.join(tmpdir, "results.csv")) as results, \
+      csvf.ResultsWriter(os.path.join(tmpdir, "captures.csv")) as captures:
+  timer.begin()
+  macro.freqresp_maxhold(results, captures, spec_an, sig_gen, freq_list(settings), -10, 0)
+  timer.end()
+ return(settings["points"])
+#-----------------------------------------------------------------------------------------------------------------------#
+def bench_freqresp_step(settings, tmpdir, timer):
+ (rm, spec_an, sig_gen) = sim_rig(settings)
+ with csvf.ResultsWriter(os.path.join(tmpdir, "results.csv")) as results:
+  timer.begin()
+  macro.freqresp_step(results, spec_an, sig_gen, freq_list(settings), -10, 1000000, 0)
+  timer.end()
+ return(settings["points"])
+#-----------------------------------------------------------------------------------------------------------------------#
+def bench_cgaint(settings, tmpdir, timer):
+ (rm, spec_an, sig_gen) = sim_rig(settings)
+ with csvf.ResultsWriter(os.path.join(tmpdir, "results.csv")) as results:
+  timer.begin()
+  ranging = autorange.new(spec_an)
+  for (count, freq) in enumerate(freq_list(settings)):
+   macro.cgaint(results, spec_an, sig_gen, None, freq, freq, -10, 12, 25, count, ranging=ranging)
+  timer.end()
+ return(settings["points"])
+#-----------------------------------------------------------------------------------------------------------------------#
+def bench_readtrace_fsp(settings, tmpdir, timer):
+ rm = resource_manager(settings)
+ fsp = rm.open_resource("SIM::FSP")
+ equip.OPCMODE(fsp, "SRQ")
+ equip.CACHE(fsp, "ON")
+ equip.SETTLEMODE(fsp, settings["settle_mode"])
+ equip.init_fsp(fsp)
+ equip.freqss_fsp(fsp, 1000000, 2000000)
+ with csvf.ResultsWriter(os.path.join(tmpdir, "captures.csv")) as captures:
+  timer.begin()
+  for count in range(settings["points"]):
+   equip.readtrace_fsp(fsp, 1, captures, "trace %s" %count)
+  timer.end()
+ return(settings["points"])
+#-----------------------------------------------------------------------------------------------------------------------#
+def bench_psu72(settings, tmpdir, timer):
+ # One point is a readback of V and I on both outputs
+ with simulator.SimPSU72("127.0.0.2", latency=settings["latency"]):
+  psu = psu7213300.PSU72("127.0.0.2", logging.getLogger("bench"), local_port=28190)
+  timer.begin()
+  for count in range(settings["points"]):
+   (psu.ch1_out_voltage, psu.ch1_out_current, psu.ch2_out_voltage, psu.ch2_out_current)
+  timer.end()
+  del psu
+ return(settings["points"])
+#-----------------------------------------------------------------------------------------------------------------------#
+def bench_psu72_all(settings, tmpdir, timer):
+ # One point is a readback of V and I on both outputs of four supplies sharing one socket
+ addresses = ["127.0.0.%s" %count for count in range(2, 6)]
+ with contextlib.ExitStack() as stack:
+  for address in addresses:
+   stack.enter_context(simulator.SimPSU72(address, latency=settings["latency"]))
+  psus = [psu7213300.PSU72(address, logging.getLogger("bench"), local_port=28190) for address in addresses]
+  timer.begin()
+  for count in range(settings["points"]):
+   psu7213300.read_all_outputs(psus)
+  timer.end()
+  del psus
+ return(settings["points"])
+#-----------------------------------------------------------------------------------------------------------------------#
+benchmarks = {"vlc_led_test.main": bench_main,
+              "macro.freqresp_list": bench_freqresp_list,
+              "macro.freqresp_maxhold": bench_freqresp_maxhold,
+              "macro.freqresp_step": bench_freqresp_step,
+              "macro.cgaint": bench_cgaint,
+              "equip.readtrace_fsp": bench_readtrace_fsp,
+              "psu72.readback": bench_psu72,
+              "psu72.read_all_outputs": bench_psu72_all}
+#-----------------------------------------------------------------------------------------------------------------------#
+def main(argv=None):
+ parser = argparse.ArgumentParser(description="Sweep throughput benchmarks against the simulated instruments")
+ parser.add_argument("--points", type=int, default=21, help="sweep points per benchmark")
+ parser.add_argument("--latency", type=float, default=0.001, help="per command latency (s)")
+ parser.add_argument("--settle", type=float, default=0.002, help="instrument settle time after each setting (s)")
+ parser.add_argument("--sweep-time", type=float, default=0.01, help="analyser sweep time (s)")
+ parser.add_argument("--settle-mode", default="FIXED", choices=("FIXED", "SWEEP"),
+                     help="analyser settling after setting changes (equip.SETTLEMODE)")
+ parser.add_argument("--profile", help="recorded latencies (JSON), overrides the three options above")
+ parser.add_argument("--only", action="append", choices=sorted(benchmarks), help="run only this benchmark")
+ parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+ args = parser.parse_args(argv)
+
+ settings = {"points": args.points, "latency": args.latency, "settle": args.settle,
+             "sweep_time": args.sweep_time, "command_latency": {}, "settle_mode": args.settle_mode}
+ if args.profile:
+  with open(args.profile) as profile_file:
+   settings.update(json.load(profile_file))
+
+ report = {"benchmark": "bench_sweep", "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+           "python": platform.python_version(), "platform": platform.platform(), "settings": settings,
+           "results": [run_isolated(name, benchmarks[name], settings) for name in (args.only or benchmarks)]}
+
+ if args.output:
+  with open(args.output, 'w') as output_file:
+   json.dump(report, output_file, indent=1)
+  for result in report["results"]:
+   if "error" in result:
+    print("%-24s %s" %(result["name"], result["error"]))
+   else:
+    print("%-24s %8.2f points/s  %s" %(result["name"], result["points_per_second"],
+          "  ".join(["%s %.4f" %item for item in result["seconds_per_point"].items()])))
+ else:
+  json.dump(report, sys.stdout, indent=1)
+  print()
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+
+if __name__ == "__main__":
+ sys.exit(main())
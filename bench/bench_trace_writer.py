@@ -0,0 +1,80 @@
+#-----------------------------------------------------------------------------------------------------------------------#
+# Function: bench_trace_writer                                                                                          #
+# Purpose: benchmarks csvf.fappn_trace against the previous per point fappn implementation                             #
+# Parameters: optional number of sweep points and repeats, e.g. python bench_trace_writer.py 1001 20                    #
+# Author: TJA                                                                                                           #
+# Date: 17/10/2026                                                                                                      #
+# Revision: A                                                                                                           #
+# Status: development                                                                                                   #
+#-----------------------------------------------------------------------------------------------------------------------#
+
+#imports
+import os
+import sys
+import tempfile
+import time
+import random
+
+#append source directory (parent of this folder)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import csvf
+
+#-----------------------------------------------------------------------------------------------------------------------#
+# Previous implementation, one fappn call (file open, csv.writer, close) per sweep point
+def fappn_trace_legacy(fd, safstart, safstop, string_in, notes):
+ csvf.fappn(fd, notes, "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")
+ csvf.fappn(fd, "begin trace", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")
+ swp_points = string_in.count(",")+1
+ step_size = (safstop - safstart) / (swp_points - 1)
+ total_length = len(string_in)
+ counter = 0
+ beg = 0
+ end = string_in.find(",",0,total_length)
+ while (counter < swp_points):
+  freq = safstart + (step_size*counter)
+  amplitude = float(string_in[beg:end])
+  csvf.fappn(fd, freq, amplitude, "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")
+  beg = string_in.find(",",end,total_length) + 1
+  if (counter == (swp_points - 2)):
+   end = beg + total_length
+  else:
+   end = string_in.find(",",beg,total_length)
+  counter = counter + 1
+ csvf.fappn(fd, "end trace", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def timeit(writer, fd, safstart, safstop, trace, repeats):
+ if os.path.exists(fd):
+  os.remove(fd)
+ timestore = time.perf_counter()
+ for count in range(repeats):
+  writer(fd, safstart, safstop, trace, "bench trace %s" %count)
+ return((time.perf_counter() - timestore) / repeats)
+#-----------------------------------------------------------------------------------------------------------------------#
+def main(swp_points, repeats):
+ random.seed(0)
+ # ASCII trace as returned by the analyser with :FORM ASC
+ trace = ",".join(["%.2f" %random.uniform(-90, -10) for count in range(swp_points)])
+ safstart = 1000000.0
+ safstop = 2000000.0
+
+ with tempfile.TemporaryDirectory() as tmpdir:
+  fd_legacy = os.path.join(tmpdir, "legacy_captures.csv")
+  fd_bulk = os.path.join(tmpdir, "bulk_captures.csv")
+  t_legacy = timeit(fappn_trace_legacy, fd_legacy, safstart, safstop, trace, repeats)
+  t_bulk = timeit(csvf.fappn_trace, fd_bulk, safstart, safstop, trace, repeats)
+  with open(fd_legacy, 'rb') as f_legacy, open(fd_bulk, 'rb') as f_bulk:
+   identical = f_legacy.read() == f_bulk.read()
+
+ print("Sweep points: %s, repeats: %s" %(swp_points, repeats))
+ print("Per point fappn writer: %.3f ms per trace" %(t_legacy*1000))
+ print("Bulk fappn_trace writer: %.3f ms per trace" %(t_bulk*1000))
+ print("Speedup: %.1fx" %(t_legacy/t_bulk))
+ print("Byte identical output: %s" %identical)
+ return(0 if identical else 1)
+#-----------------------------------------------------------------------------------------------------------------------#
+
+if __name__ == "__main__":
+ args = [int(arg) for arg in sys.argv[1:]]
+ sys.exit(main(*(args + [1001, 20][len(args):])))
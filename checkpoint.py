@@ -0,0 +1,119 @@
+#-----------------------------------------------------------------------------------------------------------------------#
+# Function: checkpoint                                                                                                  #
+# Purpose: progress journal of a run so long nested sweeps can be resumed after a crash or instrument time out          #
+# Parameters: accepts and returns refer to the code                                                                     #
+# Author: TJA                                                                                                           #
+# Date: 17/10/2026                                                                                                      #
+# Revision: A                                                                                                           #
+# Status: development                                                                                                   #
+#-----------------------------------------------------------------------------------------------------------------------#
+# The journal sits next to the results file and holds one JSON line per completed point, e.g.
+#
+#  {"run": {"sweep_mode": "STEP", "freq_list": [...], ...}}
+#  {"key": [25, 9.0, 1000000.0], "data": {"peak_freq": 1000000.0, "peak_level": -30.1}}
+#  {"key": [25, 9.0]}
+#
+# The key is the position in the nested sweep (outer loop values first) and data whatever is needed to carry on from
+# that point. The results writers given to the journal are checkpointed to disk before each line is written, so every
+# point in the journal is also in the results files. A line cut short by a crash is dropped when the journal is reopened.
+# Points are recorded at least once: a crash after a point's results reach the disk but before its journal line does
+# measures the point again on resume, and its rows appear twice in the results files.
+#
+# Instrument state is not journalled. On resume the instruments are initialised afresh, the first sweep not completed
+# is started again from its setup (which sets everything the sweep relies on) and each point writes its own settings
+# (ESG frequency, analyser centre and span, the reference level predicted from the journalled levels), which is how the
+# state for the next point is restored.
+#-----------------------------------------------------------------------------------------------------------------------#
+
+#imports
+import json
+import os
+
+#-----------------------------------------------------------------------------------------------------------------------#
+def journal_path(csvfn):
+ # Journal of the run writing results file csvfn, e.g. ..._results.csv -> ..._results.journal
+ return(os.path.splitext(csvfn)[0] + ".journal")
+#-----------------------------------------------------------------------------------------------------------------------#
+def point_key(key):
+ return(json.dumps(list(key)))
+#-----------------------------------------------------------------------------------------------------------------------#
+class Journal:
+ # Opens the journal of a new run, or reopens it to resume, run is a dict describing the run (sweep lists and
+ # settings) written as the first line of a new journal and read back on resume as Journal.run
+ def __init__(self, path, run=None, writers=()):
+  self.path = path
+  self.writers = list(writers)
+  self.run = None
+  self.points = {}
+  if os.path.exists(path):
+   with open(path, 'rb') as journal_file:
+    lines = journal_file.read()
+   end = lines.rfind(b"\n") + 1
+   if end < len(lines): # last line cut short by the crash, dropped so the next record starts on a line of its own
+    os.truncate(path, end)
+   for line in lines[:end].splitlines():
+    try:
+     record = json.loads(line)
+    except ValueError:
+     continue
+    if "run" in record:
+     self.run = record["run"]
+    elif "key" in record:
+     self.points[point_key(record["key"])] = record.get("data")
+  self.journal_file = open(path, 'a')
+  if self.run is None and run is not None:
+   self.run = json.loads(json.dumps(run)) # as it will read back on resume
+   self.write({"run": self.run})
+
+ def __enter__(self):
+  return(self)
+
+ def __exit__(self, exc_type, exc_value, traceback):
+  self.close()
+  return(False)
+
+ def __len__(self):
+  return(len(self.points))
+
+ def done(self, *key):
+  return(point_key(key) in self.points)
+
+ def data(self, *key):
+  return(self.points.get(point_key(key)))
+
+ def completed(self, *prefix):
+  # (key, data) of every completed point whose key starts with prefix, in the order they were completed
+  prefix = list(prefix)
+  points = []
+  for (key, data) in self.points.items():
+   key = json.loads(key)
+   if key[:len(prefix)] == prefix and len(key) > len(prefix):
+    points.append((tuple(key), data))
+  return(points)
+
+ def mark(self, key, data=None):
+  # Records point key as completed, once the results written for it are on disk (a crash in between leaves the results
+  # without the journal line, the point is then measured and written again on resume)
+  for writer in self.writers:
+   if hasattr(writer, "checkpoint"):
+    writer.checkpoint()
+   else:
+    writer.flush()
+  record = {"key": list(key)}
+  if data is not None:
+   record["data"] = data
+  self.write(record)
+  self.points[point_key(key)] = data
+  return(0)
+
+ def write(self, record):
+  self.journal_file.write(json.dumps(record) + "\n")
+  self.journal_file.flush()
+  os.fsync(self.journal_file.fileno())
+  return(0)
+
+ def close(self):
+  if not self.journal_file.closed:
+   self.journal_file.close()
+  return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
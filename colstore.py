@@ -0,0 +1,253 @@
+#-----------------------------------------------------------------------------------------------------------------------#
+# Function: colstore                                                                                                    #
+# Purpose: columnar binary result store written alongside the CSV results and captures files                           #
+# Parameters: accepts and returns refer to the code                                                                     #
+# Author: TJA                                                                                                           #
+# Date: 17/10/2026                                                                                                      #
+# Revision: A                                                                                                           #
+# Status: development                                                                                                   #
+#-----------------------------------------------------------------------------------------------------------------------#
+# Store layout (one directory per run, see store_path):
+#  schema.json     - JSON description of the files below, rewritten whenever a chunk is added
+#  traces.f32      - append-only little endian float32 amplitudes of every trace, back to back
+#  traces.idx      - append-only fixed size records (trace_dtype) giving the offset, length and frequency span of
+#                    each trace in traces.f32
+#  <table>_NNNNN.npz - chunks of scalar result rows, one array per column
+#  trace_notes_NNNNN.npz - notes of the traces longer than the 64 characters kept in traces.idx (load_notes)
+#  pending.jsonl   - rows not yet in a chunk, one JSON line each numbered within its table, so checkpoint can make them
+#                    durable without cutting a chunk per row. Read back into the next chunks when the store is reopened
+# traces.f32 and traces.idx can be memory-mapped (load_traces) so a run is sliced without parsing any text.
+#-----------------------------------------------------------------------------------------------------------------------#
+
+#imports
+import json
+import os
+import time
+import numpy
+
+#record layout of traces.idx
+notes_length = 64
+trace_dtype = numpy.dtype([("offset", "<i8"), ("points", "<i8"), ("fstart", "<f8"), ("fstop", "<f8"), ("time", "<f8"), ("notes", "<U%d" %notes_length)])
+
+#-----------------------------------------------------------------------------------------------------------------------#
+def store_path(csvfn):
+ # Store directory next to a results file, e.g. ..._results.csv -> ..._results.store
+ return(os.path.splitext(csvfn)[0] + ".store")
+#-----------------------------------------------------------------------------------------------------------------------#
+class ColumnStore:
+ def __init__(self, path, chunk_rows=1000):
+  self.path = path
+  self.chunk_rows = chunk_rows
+  os.makedirs(path, exist_ok=True)
+  self.schema = read_schema(path)
+  self.traces = repair_traces(path, self.schema)
+  self.tracefile = open(os.path.join(path, self.schema["traces"]["data"]), 'ab')
+  self.indexfile = open(os.path.join(path, self.schema["traces"]["index"]), 'ab')
+  self.offset = self.tracefile.tell() // 4
+  self.rows = read_pending(path, self.schema)
+  self.pendingfile = None
+  self.write_pending()
+  write_schema(path, self.schema)
+
+ def __enter__(self):
+  return(self)
+
+ def __exit__(self, exc_type, exc_value, traceback):
+  self.close()
+  return(False)
+
+ def append_trace(self, fstart, fstop, amplitudes, notes=""):
+  amplitudes = numpy.ascontiguousarray(amplitudes, dtype="<f4")
+  notes = str(notes)
+  if len(notes) > notes_length: # kept whole in the trace_notes table
+   self.append_row("trace_notes", {"trace": self.traces, "notes": notes})
+  record = numpy.array([(self.offset, len(amplitudes), fstart, fstop, time.time(), notes[:notes_length])], dtype=trace_dtype)
+  self.tracefile.write(amplitudes.tobytes())
+  self.indexfile.write(record.tobytes())
+  self.offset = self.offset + len(amplitudes)
+  self.traces = self.traces + 1
+  return(0)
+
+ def append_row(self, table, row):
+  # row is a dict of column name to value, every row of a table should have the same columns
+  rows = self.rows.setdefault(table, [])
+  self.pendingfile.write(pending_line(table, table_rows(self.path, self.schema, table) + len(rows), row))
+  rows.append(row)
+  if len(rows) >= self.chunk_rows:
+   self.flush_rows(table)
+  return(0)
+
+ def flush_rows(self, table):
+  rows = self.rows.pop(table, [])
+  if len(rows) == 0:
+   return(0)
+  columns = []
+  for row in rows:
+   columns.extend([column for column in row if column not in columns])
+  chunks = self.schema["tables"].setdefault(table, {"columns": columns, "chunks": []})
+  chunk = "%s_%05d.npz" %(table, len(chunks["chunks"]))
+  arrays = {column: numpy.asarray([row.get(column, numpy.nan) for row in rows]) for column in columns}
+  with open(os.path.join(self.path, chunk), 'wb') as chunk_file:
+   numpy.savez(chunk_file, **arrays)
+   chunk_file.flush()
+   os.fsync(chunk_file.fileno())
+  rows_before = table_rows(self.path, self.schema, table)
+  chunks["chunks"].append(chunk)
+  chunks["columns"].extend([column for column in columns if column not in chunks["columns"]])
+  chunks["rows"] = rows_before + len(rows)
+  write_schema(self.path, self.schema)
+  self.write_pending() # rows now in the chunk, a crash before this is harmless as they are numbered
+  return(0)
+
+ def write_pending(self):
+  # Rewrites pending.jsonl with the rows not yet in a chunk and reopens it for appending
+  pending_fn = os.path.join(self.path, "pending.jsonl")
+  if self.pendingfile is not None:
+   self.pendingfile.close()
+  with open(pending_fn + ".tmp", 'w') as pending_file:
+   for (table, rows) in self.rows.items():
+    first = table_rows(self.path, self.schema, table)
+    pending_file.writelines([pending_line(table, first + count, row) for (count, row) in enumerate(rows)])
+   pending_file.flush()
+   os.fsync(pending_file.fileno())
+  os.replace(pending_fn + ".tmp", pending_fn)
+  self.pendingfile = open(pending_fn, 'a')
+  return(0)
+
+ def checkpoint(self):
+  # Makes everything appended so far durable, the rows stay pending rather than being cut into a chunk each time
+  for openfile in (self.pendingfile, self.tracefile, self.indexfile):
+   openfile.flush()
+   os.fsync(openfile.fileno())
+  return(0)
+
+ def flush(self):
+  for table in list(self.rows):
+   self.flush_rows(table)
+  self.checkpoint()
+  return(0)
+
+ def close(self):
+  if not self.tracefile.closed:
+   self.flush()
+   self.tracefile.close()
+   self.indexfile.close()
+   self.pendingfile.close()
+  return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def read_schema(path):
+ schema_fn = os.path.join(path, "schema.json")
+ if os.path.exists(schema_fn):
+  with open(schema_fn) as schema_file:
+   return(json.load(schema_file))
+ return({"version": 1,
+         "traces": {"data": "traces.f32", "dtype": "<f4", "index": "traces.idx", "index_dtype": trace_dtype.descr},
+         "tables": {}})
+#-----------------------------------------------------------------------------------------------------------------------#
+def write_schema(path, schema):
+ # Written to a temporary file and renamed so a crash never leaves a half written schema
+ schema_fn = os.path.join(path, "schema.json")
+ with open(schema_fn + ".tmp", 'w') as schema_file:
+  json.dump(schema, schema_file, indent=1)
+  schema_file.flush()
+  os.fsync(schema_file.fileno())
+ os.replace(schema_fn + ".tmp", schema_fn)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def table_rows(path, schema, table):
+ # Number of rows of a table in chunks, counted from the chunks for a store written before the schema kept it
+ if table not in schema["tables"]:
+  return(0)
+ chunks = schema["tables"][table]
+ if "rows" not in chunks:
+  chunks["rows"] = 0
+  for chunk in chunks["chunks"]:
+   with numpy.load(os.path.join(path, chunk)) as arrays:
+    chunks["rows"] = chunks["rows"] + len(arrays[arrays.files[0]])
+ return(chunks["rows"])
+#-----------------------------------------------------------------------------------------------------------------------#
+def pending_line(table, number, row):
+ # numpy scalars are written as the python value
+ return(json.dumps({"table": table, "row": number, "values": row}, default=lambda value: value.item()) + "\n")
+#-----------------------------------------------------------------------------------------------------------------------#
+def read_pending(path, schema):
+ # Rows left in pending.jsonl by a run that stopped before they were cut into a chunk, skipping a line cut short by a
+ # crash and rows already in a chunk. Returns a dict of table name to the list of rows
+ pending_fn = os.path.join(path, "pending.jsonl")
+ rows = {}
+ if not os.path.exists(pending_fn):
+  return(rows)
+ with open(pending_fn) as pending_file:
+  for line in pending_file:
+   try:
+    record = json.loads(line)
+   except ValueError:
+    continue
+   table = record["table"]
+   if record["row"] == table_rows(path, schema, table) + len(rows.get(table, [])):
+    rows.setdefault(table, []).append(record["values"])
+ return(rows)
+#-----------------------------------------------------------------------------------------------------------------------#
+def repair_traces(path, schema):
+ # Drops what a crash may have left at the end of traces.idx and traces.f32 (a partial index record, a record whose
+ # data never reached the disk, data without a record) so traces appended on resume stay aligned. Returns the number
+ # of traces
+ index_fn = os.path.join(path, schema["traces"]["index"])
+ data_fn = os.path.join(path, schema["traces"]["data"])
+ if not os.path.exists(index_fn):
+  return(0)
+ count = os.path.getsize(index_fn) // trace_dtype.itemsize
+ data_size = os.path.getsize(data_fn) if os.path.exists(data_fn) else 0
+ end = 0
+ if count > 0:
+  index = numpy.fromfile(index_fn, dtype=trace_dtype, count=count)
+  ends = (index["offset"] + index["points"]) * 4
+  while count > 0 and ends[count - 1] > data_size:
+   count = count - 1
+  if count > 0:
+   end = int(ends[count - 1])
+ for (filename, size) in ((index_fn, count * trace_dtype.itemsize), (data_fn, end)):
+  if os.path.exists(filename) and os.path.getsize(filename) != size:
+   os.truncate(filename, size)
+ return(count)
+#-----------------------------------------------------------------------------------------------------------------------#
+def load_traces(path):
+ # Returns (index, data), both memory-mapped read only. Trace n is data[index["offset"][n]:][:index["points"][n]]
+ schema = read_schema(path)
+ index_fn = os.path.join(path, schema["traces"]["index"])
+ data_fn = os.path.join(path, schema["traces"]["data"])
+ if not os.path.exists(index_fn) or os.path.getsize(index_fn) == 0 or os.path.getsize(data_fn) == 0:
+  return(numpy.zeros(0, dtype=trace_dtype), numpy.zeros(0, dtype=schema["traces"]["dtype"]))
+ index = numpy.memmap(index_fn, dtype=trace_dtype, mode='r')
+ data = numpy.memmap(data_fn, dtype=schema["traces"]["dtype"], mode='r')
+ return(index, data)
+#-----------------------------------------------------------------------------------------------------------------------#
+def load_trace(path, number):
+ # Returns (frequencies, amplitudes) of one trace
+ (index, data) = load_traces(path)
+ record = index[number]
+ amplitudes = data[record["offset"]:record["offset"] + record["points"]]
+ freqs = numpy.linspace(record["fstart"], record["fstop"], record["points"])
+ return(freqs, amplitudes)
+#-----------------------------------------------------------------------------------------------------------------------#
+def load_notes(path):
+ # Returns the notes of every trace, in full
+ (index, data) = load_traces(path)
+ notes = [str(record) for record in index["notes"]]
+ if "trace_notes" in read_schema(path)["tables"]:
+  rows = load_rows(path, "trace_notes")
+  for (number, text) in zip(rows["trace"], rows["notes"]):
+   if number < len(notes):
+    notes[number] = str(text)
+ return(notes)
+#-----------------------------------------------------------------------------------------------------------------------#
+def load_rows(path, table):
+ # Returns a dict of column name to numpy array holding every row of a table
+ schema = read_schema(path)
+ columns = {}
+ for chunk in schema["tables"][table]["chunks"]:
+  with numpy.load(os.path.join(path, chunk)) as arrays:
+   for column in schema["tables"][table]["columns"]:
+    columns.setdefault(column, []).append(arrays[column] if column in arrays else numpy.full(len(arrays[arrays.files[0]]), numpy.nan))
+ return({column: numpy.concatenate(values) for (column, values) in columns.items()})
+#-----------------------------------------------------------------------------------------------------------------------#
@@ -1,84 +1,153 @@
-#-----------------------------------------------------------------------------------------------------------------------#	
-# Function: csv handling							                                                                                	#
-# Purpose: writes and reads CSV files	       							                                                              #
-# Parameters: accepts and returns refer to the code								                                                     	#
-# Author: TJA														                                                                                #
-# Date: 03/12/2021													                                                                            #
-# Revision: 1.0														                                                                              #
-# Status: finished												                                                                             	#
-#-----------------------------------------------------------------------------------------------------------------------#
-
-#imports
-import csv
-import time
-
-#-----------------------------------------------------------------------------------------------------------------------#
-def csv_dtstamp():
- localtime = time.localtime(time.time())     
- thour = str(localtime.tm_hour)
- tmin = str(localtime.tm_min) 
- tsec = str(localtime.tm_sec) 
- return(time.strftime("%Y%m%d") + thour + tmin + tsec)
-#-----------------------------------------------------------------------------------------------------------------------#  
-def csv_file(CSV_PATH,CSV_FILE_NAME, dtstamp, mfr_name, mfr_prtnum, mfr_srnum): 
- return(CSV_PATH + mfr_name + "_" + mfr_prtnum + "_" + mfr_srnum + "_" + dtstamp + "_" + CSV_FILE_NAME)
-#-----------------------------------------------------------------------------------------------------------------------#   
-def cal_file(CSV_PATH,CSV_FILE_NAME, dtstamp, calname): 
- return(CSV_PATH + calname + "_" + dtstamp + CSV_FILE_NAME)
-#-----------------------------------------------------------------------------------------------------------------------#   
-# Append existing CSV file     
-def fappn(csvfn, prma, prmb, prmc, prmd, prme, prmf, prmg, prmh, prmi, prmj, prmk, prml, pramm, prmn, prmo, prmp, prmq, prmr, prms, prmt):
- with open(csvfn, 'a', newline='') as csvfile:
-  filewriter = csv.writer(csvfile, delimiter=',')                    
-  filewriter.writerow([prma, prmb, prmc, prmd, prme, prmf, prmg, prmh, prmi, prmj, prmk, prml, pramm, prmn, prmo, prmp, prmq, prmr, prms, prmt])
-#-----------------------------------------------------------------------------------------------------------------------#   
-# Append tracedata to existing CSV file
-def fappn_trace(fd, safstart, safstop, string_in, notes):
-  
-  # Place "begin trace" in the CSV file
-  fappn(fd, notes, "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")
-  fappn(fd, "begin trace", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")	
-  
-  # Determine how many sweep points are contained in the string
-  swp_points = string_in.count(",")+1
-  # Determine step size
-  step_size = (safstop - safstart) / (swp_points - 1)
-  # Determine the total number of characters in the string
-  total_length = len(string_in)
-  # Determine the total length of one sweep point from the start of the string
-  
-  # Initialise variables
-  freq = 0
-  counter = 0
-  beg = 0
-  end = string_in.find(",",0,total_length)
-  
-  # Strip the data points from the string  
-  while (counter  < swp_points):
-   
-   # Calculate the current frequency for the sweep point
-   freq = safstart + (step_size*counter)
-   # Strip amplitude from the string
-   amplitude = float(string_in[beg:end])   
-   
-   # Append the CSV file with the frequency and amplitude 
-   fappn(fd, freq, amplitude, "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")	
-   
-   # Calculate the position of the sweep points in the string
-   beg = string_in.find(",",end,total_length) + 1
-   if (counter == (swp_points - 2)):
-    end = beg + total_length  # This applies for the last sweep point in the string
-   else:
-    end = string_in.find(",",beg,total_length)    # This applies for all but the last sweep point in the string
-   
-   # Increment the counter
-   counter = counter + 1
-   
-  # Place "end trace" in the CSV file 
-  fappn(fd, "end trace", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")	
-  
-  #Empty string_in (effectively empties the allocated memory) 
-  string_in = ""
-                            
-  return(0)
-  
\ No newline at end of file
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Function: csv handling							                                                                                	#
+# Purpose: writes and reads CSV files	       							                                                              #
+# Parameters: accepts and returns refer to the code								                                                     	#
+# Author: TJA														                                                                                #
+# Date: 03/12/2021													                                                                            #
+# Revision: 1.0														                                                                              #
+# Status: finished												                                                                             	#
+#-----------------------------------------------------------------------------------------------------------------------#
+
+#imports
+import csv
+import io
+import os
+import time
+import numpy
+
+#-----------------------------------------------------------------------------------------------------------------------#
+def csv_dtstamp():
+ localtime = time.localtime(time.time())     
+ thour = str(localtime.tm_hour)
+ tmin = str(localtime.tm_min) 
+ tsec = str(localtime.tm_sec) 
+ return(time.strftime("%Y%m%d") + thour + tmin + tsec)
+#-----------------------------------------------------------------------------------------------------------------------#  
+def csv_file(CSV_PATH,CSV_FILE_NAME, dtstamp, mfr_name, mfr_prtnum, mfr_srnum): 
+ return(CSV_PATH + mfr_name + "_" + mfr_prtnum + "_" + mfr_srnum + "_" + dtstamp + "_" + CSV_FILE_NAME)
+#-----------------------------------------------------------------------------------------------------------------------#   
+def cal_file(CSV_PATH,CSV_FILE_NAME, dtstamp, calname): 
+ return(CSV_PATH + calname + "_" + dtstamp + CSV_FILE_NAME)
+#-----------------------------------------------------------------------------------------------------------------------#   
+# Append existing CSV file (csvfn is a file name or an open ResultsWriter)
+def fappn(csvfn, prma, prmb, prmc, prmd, prme, prmf, prmg, prmh, prmi, prmj, prmk, prml, pramm, prmn, prmo, prmp, prmq, prmr, prms, prmt):
+ row = [prma, prmb, prmc, prmd, prme, prmf, prmg, prmh, prmi, prmj, prmk, prml, pramm, prmn, prmo, prmp, prmq, prmr, prms, prmt]
+ if isinstance(csvfn, ResultsWriter):
+  csvfn.writerow(row)
+  return(0)
+ with open(csvfn, 'a', newline='') as csvfile:
+  filewriter = csv.writer(csvfile, delimiter=',')                    
+  filewriter.writerow(row)
+#-----------------------------------------------------------------------------------------------------------------------#
+# Results file writer which keeps the CSV file open for the whole run. Rows may be any length up to the column count
+# (padded with empty fields to the usual 20 columns) or dicts keyed by the names given in fields. Rows are flushed to
+# the operating system every flush_rows rows or flush_interval seconds, checkpoint() also fsyncs them to disk.
+# Use as a context manager so the file is flushed, synced and closed even if the run fails:
+#  with csvf.ResultsWriter(fd_results) as results:
+#   results.writerow(["Frequency (Hz)", "Level (dBm)"])
+class ResultsWriter:
+ def __init__(self, csvfn, columns=20, fields=None, flush_rows=100, flush_interval=10.0):
+  self.csvfn = csvfn
+  self.columns = columns
+  self.fields = fields
+  self.flush_rows = flush_rows
+  self.flush_interval = flush_interval
+  self.csvfile = open(csvfn, 'a', newline='')
+  self.filewriter = csv.writer(self.csvfile, delimiter=',')
+  self.pending = 0
+  self.flushtime = time.time()
+
+ def __enter__(self):
+  return(self)
+
+ def __exit__(self, exc_type, exc_value, traceback):
+  self.close()
+  return(False)
+
+ def writerow(self, row):
+  if isinstance(row, dict):
+   if self.fields is None:
+    raise ValueError("ResultsWriter needs fields to write dict rows")
+   unknown = set(row) - set(self.fields)
+   if unknown:
+    raise ValueError("Unknown result fields: %s" %", ".join(sorted(unknown)))
+   row = [row.get(field, "") for field in self.fields]
+  else:
+   row = list(row)
+  if len(row) > self.columns:
+   raise ValueError("Row has %s fields, results file has %s columns" %(len(row), self.columns))
+  self.filewriter.writerow(row + [""]*(self.columns - len(row)))
+  self.written(1)
+  return(0)
+
+ def writerows(self, rows):
+  for row in rows:
+   self.writerow(row)
+  return(0)
+
+ def writeheader(self):
+  return(self.writerow(list(self.fields)))
+
+ def writeblock(self, text, rows):
+  # Already formatted CSV text holding rows rows, e.g. a complete trace block from fappn_trace
+  self.csvfile.write(text)
+  self.written(rows)
+  return(0)
+
+ def written(self, rows):
+  self.pending = self.pending + rows
+  if self.pending >= self.flush_rows or (time.time() - self.flushtime) >= self.flush_interval:
+   self.flush()
+
+ def flush(self):
+  self.csvfile.flush()
+  self.pending = 0
+  self.flushtime = time.time()
+  return(0)
+
+ def checkpoint(self):
+  self.flush()
+  os.fsync(self.csvfile.fileno())
+  return(0)
+
+ def close(self):
+  if not self.csvfile.closed:
+   self.checkpoint()
+   self.csvfile.close()
+  return(0)
+#-----------------------------------------------------------------------------------------------------------------------#   
+# Append tracedata to existing CSV file
+def fappn_trace(fd, safstart, safstop, string_in, notes):
+  
+  # Trace data is either the comma separated ASCII string returned by the analyser or a sequence of amplitudes
+  # (e.g. the numpy array from a binary trace transfer)
+  if isinstance(string_in, str):
+   amplitudes = [float(value) for value in string_in.split(",")]
+  else:
+   amplitudes = numpy.asarray(string_in, dtype=numpy.float64).tolist()
+  # Determine how many sweep points are contained in the trace
+  swp_points = len(amplitudes)
+  # Determine step size
+  step_size = (safstop - safstart) / (swp_points - 1)
+  # Frequency of every sweep point, evaluated as safstart + (step_size*counter) like the per point loop did
+  freqs = (safstart + (step_size*numpy.arange(swp_points))).tolist()
+  
+  # Build the whole block in memory and append it to the CSV file with a single write
+  buffer = io.StringIO()
+  filewriter = csv.writer(buffer, delimiter=',')
+  # Place notes and "begin trace" in the CSV file
+  filewriter.writerow([notes] + [""]*19)
+  filewriter.writerow(["begin trace"] + [""]*19)
+  # Frequency and amplitude rows padded to 20 columns, floats formatted with repr exactly as csv.writer does
+  padding = ","*18 + "\r\n"
+  buffer.write("".join(["%r,%r%s" %(freq, amplitude, padding) for (freq, amplitude) in zip(freqs, amplitudes)]))
+  # Place "end trace" in the CSV file 
+  filewriter.writerow(["end trace"] + [""]*19)
+  
+  if isinstance(fd, ResultsWriter):
+   fd.writeblock(buffer.getvalue(), swp_points + 3)
+  else:
+   with open(fd, 'a', newline='') as csvfile:
+    csvfile.write(buffer.getvalue())
+                            
+  return(0)
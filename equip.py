@@ -1,1289 +1,1950 @@
-#-----------------------------------------------------------------------------------------------------------------------#	
-# Function: equip												                                                                               	#
-# Purpose: test equipment driver library									                                                              #
-# Parameters: accepts and returns refer to the code								                                                     	#
-# Author: TJA														                                                                                #
-# Date: 16/12/2021													                                                                            #
-# Revision: A 														                                                                              #
-# Status: development												                                                                          	#
-#-----------------------------------------------------------------------------------------------------------------------#
-
-#imports
-import pyvisa
-import binascii
-import csv
-import sys
-import importlib # available changed from import imp - depricated
-import os
-import time
-
-#set top level directory path
-dirpath = '/home/instrument/Desktop/'
-#append source directory
-sys.path.append (dirpath+'vlc_rig')
-
-import csvf
-import user
-#import macro
-
-#-----------------------------------------------------------------------------------------------------------------------#	
-# Purpose: Agilent Technologies N9000A CXA Signal Analyser Commands                                                     #
-# Author: TJA													                                                                                 	#
-# Date: 28/08/2021	(last update): 28/08/2021													                                                 	#          
-# Revision: A 													                                                                                #
-# Status: development											                                                                          		#
-#-----------------------------------------------------------------------------------------------------------------------#
-def init_cxa(addr_cxa):
- addr_cxa.clear()
- addr_cxa.term_chars="\n"
- RESET(addr_cxa)
- addr_cxa.write(":DISP:ENAB ON")
- addr_cxa.write(":INIT:CONT ON")
- return(ID(addr_cxa))
-#-----------------------------------------------------------------------------------------------------------------------#
-def reflev_cxa(addr_cxa, reflev):
- addr_cxa.write(":DISP:WIND:TRAC:Y:RLEV %s" %reflev)
- OPCQ(addr_cxa)
- time.sleep(0.2)
- return(0) 
-#-----------------------------------------------------------------------------------------------------------------------#
-def atten_cxa(addr_cxa,atten_mode,atten):
- if atten_mode == "AUTO":
-  addr_cxa.write(":POW:ATT:AUTO ON")
-  OPCQ(addr_cxa)
- elif atten_mode == "MAN":
-  addr_cxa.write(":POW:ATT:AUTO OFF")
-  OPCQ(addr_cxa)
-  addr_cxa.write(":POW:ATT %s" %atten)
-  OPCQ(addr_cxa)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def resbw_cxa(addr_cxa,resbw_mode,resbw):
- if resbw_mode == "AUTO":
-  addr_cxa.write(":BAND:RES:AUTO ON")
-  OPCQ(addr_cxa)
- elif resbw_mode == "MAN":
-  addr_cxa.write(":BAND:RES:AUTO OFF")
-  OPCQ(addr_cxa)
-  addr_cxa.write(":BAND:RES %s" %resbw)
-  OPCQ(addr_cxa)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def vidbw_cxa(addr_cxa,vidbw_mode,vidbw):
- if vidbw_mode == "AUTO":
-  addr_cxa.write(":BAND:VID:AUTO ON")
-  OPCQ(addr_cxa)
- elif vidbw_mode == "MAN":
-  addr_cxa.write(":BAND:VID:AUTO OFF")
-  OPCQ(addr_cxa)
-  addr_cxa.write(":BAND:VID %s" %vidbw)
-  OPCQ(addr_cxa)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def mrkrmode_cxa(addr_cxa,mrkr,mode):
- if mode == "NORMAL":
-  addr_cxa.write(":CALC:MARK%s:STAT ON" %mrkr)
-  OPCQ(addr_cxa)
-  addr_cxa.write(":CALC:MARK%s:MODE POS" %mrkr)
-  OPCQ(addr_cxa)
- elif mode == "DELTA":
-  addr_cxa.write(":CALC:MARK%s:STAT ON" %mrkr)
-  OPCQ(addr_cxa)
-  addr_cxa.write(":CALC:MARK%s:MODE DELT" %mrkr)
-  OPCQ(addr_cxa)
- elif mode == "BAND":
-  addr_cxa.write(":CALC:MARK%s:STAT ON" %mrkr)
-  OPCQ(addr_cxa)
-  addr_cxa.write(":CALC:MARK%s:MODE BAND" %mrkr)
-  OPCQ(addr_cxa)
- elif mode == "SPAN":
-  addr_cxa.write(":CALC:MARK%s:STAT ON" %mrkr)
-  OPCQ(addr_cxa)
-  addr_cxa.write(":CALC:MARK%s:MODE SPAN" %mrkr)
-  OPCQ(addr_cxa)
- elif mode == "OFF":
-  addr_cxa.write(":CALC:MARK%s:STAT OFF" %mrkr)
-  OPCQ(addr_cxa)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def freqcs_cxa(addr_cxa, centfreq, spanfreq):
- addr_cxa.write(":FREQ:CENT %s" %centfreq)
- OPCQ(addr_cxa)
- addr_cxa.write(":FREQ:SPAN %s" %spanfreq)
- OPCQ(addr_cxa)
- time.sleep(0.2)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------# 
-def mrkrpksrch_cxa(addr_cxa,mrkr,mode):
- if mode == "PEAK":
-  addr_cxa.write(":CALC:MARK%s:MAX" %mrkr)
-  OPCQ(addr_cxa)
- elif mode == "NEXT":
-  addr_cxa.write(":CALC:MARK%s:MAX:NEXT" %mrkr)
-  OPCQ(addr_cxa)
- elif mode == "LEFT":
-  addr_cxa.write(":CALC:MARK%s:MAX:LEFT" %mrkr)
-  OPCQ(addr_cxa)
- elif mode == "RIGHT":
-  addr_cxa.write(":CALC:MARK%s:MAX:RIGH" %mrkr)
-  OPCQ(addr_cxa)
- elif mode == "MIN":
-  addr_cxa.write(":CALC:MARK%s:MIN" %mrkr)
-  OPCQ(addr_cxa)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def mrkrxoffset_cxa(addr_cxa,mrkr,offset):
- addr_cxa.write(":CALC:MARK%s:X %s" %(mrkr, offset))
- OPCQ(addr_cxa)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def xmrkrval_cxa(addr_cxa,mrkr):
- addr_cxa.write(":CALC:MARK%s:X?" %mrkr)
- xval = addr_cxa.read()
- #Convert string to float
- xval = str_strip(xval)	
- return(xval)
-#-----------------------------------------------------------------------------------------------------------------------#
-def ymrkrval_cxa(addr_cxa,mrkr):
- addr_cxa.write(":CALC:MARK%s:Y?" %mrkr)
- yval = addr_cxa.read()
- #Convert string to float
- yval = str_strip(yval)	
- return(yval)
-#-----------------------------------------------------------------------------------------------------------------------#
-def mrkrcenfreq_cxa(addr_cxa,mrkr):
- addr_cxa.write("CALC:MARK%s:FUNC:CENT" %mrkr)	
- OPCQ(addr_fsp)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def mrkrreflev_(addr_cxa,mrkr):
- addr_cxa.write("CALC:MARK%s:FUNC:REF" %mrkr)	
- OPCQ(addr_cxa)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def average_cxa(addr_cxa,state,count,type):
- if state == "OFF":
-  addr_cxa.write(":AVER OFF")
-  OPCQ(addr_cxa)
- elif state == "ON":
-  addr_cxa.write(":AVER ON")
-  OPCQ(addr_cxa)
-  addr_fsp.write(":AVER:COUN %s" %count)
-  OPCQ(addr_cxa)
-  addr_cxa.write(":AVER:TYPE %s" %type)
-  OPCQ(addr_cxa)
-  addr_cxa.write("SWEep:TIME?")
-  sweeptime = addr_cxa.read()
-  sweeptime = str_strip(sweeptime)  
-  addr_cxa.write("INIT;*WAI")
-  delay = (sweeptime * count) + (2*sweeptime)
-  time.sleep(delay)
- return(0)
-
-
-#-----------------------------------------------------------------------------------------------------------------------#	
-# Purpose: Agilent Technologies E4438C ESG Vector Signal Generator Commands                                             #
-# Author: TJA													                                                                                 	#
-# Date: 28/08/2021	(last update): 28/08/2021												                                                   	#          
-# Revision: A 													                                                                                #
-# Status: development											                                                                          		#
-#-----------------------------------------------------------------------------------------------------------------------#
-def init_esg(addr_esg):
- addr_esg.clear()
- addr_esg.term_chars="\n"
- RESET(addr_esg)
- return(ID(addr_esg))
-#-----------------------------------------------------------------------------------------------------------------------#
-def output_esg(addr_esg, state):
- if state == "ON":
-  addr_esg.write("OUTP:STAT ON")
-  OPCQ(addr_esg)
- elif state == "OFF":
-  addr_esg.write("OUTP:STAT OFF")
-  OPCQ(addr_esg)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def freq_esg(addr_esg, freq):
- addr_esg.write("FREQ %s Hz" %freq)
- OPCQ(addr_esg)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def lev_esg(addr_esg, level):
- addr_esg.write("POW %s dBm" %level)
- OPCQ(addr_esg)
- return(0)
-
-
-
-
-#-----------------------------------------------------------------------------------------------------------------------#	
-# Purpose: Agilent Technologies DSO6014A DSO Scope Commands                                                             #
-# Author: TJA													                                                                                 	#
-# Date: 28/08/2021	(last update): 28/08/2021											                                                     	#          
-# Revision: A 													                                                                                #
-# Status: development											                                                                          		#
-#-----------------------------------------------------------------------------------------------------------------------#
-def init_dso(addr_dso):
- addr_dso.clear()
- addr_dso.term_chars="\n"
- RESET(addr_dso)
- return(ID(addr_dso))
-                     
-
-
-
-
-
-
-#--------LEGACY DRIVERS BELOW THIS LINE---------------------------------------------------------------------------------#
-
-#-----------------------------------------------------------------------------------------------------------------------#	
-# Purpose: String stripping function used to remove characters returned by Prologix GPIB to IP adapter 	                #
-# Author: TJA													                                                                                 	#
-# Date: 28/08/2021												                                                                             	#          
-# Revision: A 													                                                                                #
-# Status: development											                                                                          		#
-#-----------------------------------------------------------------------------------------------------------------------#
-def str_strip(string_in):  
- string_in=str(string_in)
- if string_in.startswith("b") == True: # Indicates Prologix GPIB to IP interface in use
-  string_in = string_in.lstrip("b")
-  string_in = string_in.strip("'")
-  num_out = float(string_in) 
- elif string_in.startswith("V") == True: # Indicated TTi PL303-P Volts looks like: "V1 18.00"
-  num_out = float(string_in[3:])
- elif string_in.endswith("A") == True: # Indicated TTi PL303-P Amps looks like: "0.915A"
-  num_out = float(string_in[:-2])
- else:
-  num_out = float(string_in)
- return(num_out)
-#-----------------------------------------------------------------------------------------------------------------------#
-def strin_strout(string_in):  
- string_in=str(string_in)
- if string_in.startswith("b") == True: # Indicates Prologix GPIB to IP interface in use
-  string_in = string_in.lstrip("b")
-  string_in = string_in.strip("'")
-  string_out = string_in 
- else:
-  string_out = string_in
- return(string_out)                             
-#-----------------------------------------------------------------------------------------------------------------------#	
-# Purpose: Standard commands									                                                         	                #
-# Author: TJA													                                                                                 	#
-# Date: 28/08/2021												                                                                             	#          
-# Revision: A 													                                                                                #
-# Status: development											                                                                          		#
-#-----------------------------------------------------------------------------------------------------------------------#
-def OPCQ(addr):
- #addr.term_chars="\n"
- time.sleep(0.1)
- timestore = time.time()
- #10 second time out
- timeout = timestore + 10
- response = 0
- while True:
-  addr.write("*OPC?")
-  timecurrent = time.time()
-  response = float(addr.read())
-  if response != 0 or timecurrent > timeout:
-    timediff = timecurrent - timestore
-    if response != 0: 
-     #print("Exiting...Response:%s received from *OPC?" %response)
-     #print("Time taken %s" %timediff)
-     break 
-    elif timecurrent > timeout:
-     #print("Exiting...Timeout %s" %timediff)
-     break 
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def RESET(addr):
- time.sleep(0.25)
- addr.write("*RST")
- CLS(addr)
- OPCQ(addr)
- return(0) 
-#-----------------------------------------------------------------------------------------------------------------------#
-def ID(addr):
- addr.write("*IDN?")
- response = strin_strout(addr.read())
- return(response)  
-#-----------------------------------------------------------------------------------------------------------------------#
-def CLS(addr):
- addr.write("*CLS")
- time.sleep(1)
- return(0) 
-#-----------------------------------------------------------------------------------------------------------------------#
-def DCL(addr):
- addr.write("DCL")
- return(0) 
-#-----------------------------------------------------------------------------------------------------------------------#
-def STBQ(addr):
-  addr.write("*STB?")
-  response = addr.read()
-  return(response) 
- 
-#-----------------------------------------------------------------------------------------------------------------------#	
-# Purpose: R&S FSP spectrum analyser commands									                                                         	#
-# Author: TJA													                                                                                 	#
-# Date: 21/08/2021												                                                                             	#
-# Revision: A 													                                                                                #
-# Status: development											                                                                          		#
-#-----------------------------------------------------------------------------------------------------------------------#
-def init_fsp(addr_fsp):
- #addr_fsp.clear()
- addr_fsp.term_chars="\n"
- RESET(addr_fsp)
- addr_fsp.write("SYSTem:DISPlay:UPDate ON")
- return(ID(addr_fsp))
-#-----------------------------------------------------------------------------------------------------------------------#
-def freqss_fsp(addr_fsp, starfreq, stopfreq):
- addr_fsp.write(":FREQ:STAR %s" %starfreq)
- OPCQ(addr_fsp)
- addr_fsp.write(":FREQ:STOP %s" %stopfreq)
- OPCQ(addr_fsp)
- time.sleep(0.2)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def freqssrd_fsp(addr_fsp):
- addr_fsp.write(":FREQ:STAR?")
- time.sleep(0.2)
- freqstart = str_strip(addr_fsp.read())
- addr_fsp.write(":FREQ:STOP?")
- freqstop = str_strip(addr_fsp.read())
- time.sleep(0.2)
- return(freqstart,freqstop)
-#-----------------------------------------------------------------------------------------------------------------------#
-def freqcs_fsp(addr_fsp, centfreq, spanfreq):
- addr_fsp.write(":FREQ:CENT %s" %centfreq)
- OPCQ(addr_fsp)
- addr_fsp.write(":FREQ:SPAN %s" %spanfreq)
- OPCQ(addr_fsp)
- time.sleep(0.2)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def freqspan_fsp(addr_fsp, spanfreq):
- addr_fsp.write(":FREQ:SPAN %s" %spanfreq)
- OPCQ(addr_fsp)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def reflev_fsp(addr_fsp, reflev):
- addr_fsp.write(":DISP:WIND:TRAC:Y:RLEV %s" %reflev)
- OPCQ(addr_fsp)
- time.sleep(0.2)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------# 
-def reflevrd_fsp(addr_fsp):
- addr_fsp.write(":DISP:WIND:TRAC:Y:RLEV?")
- response = str_strip(addr_fsp.read())
- return(response) 
-#-----------------------------------------------------------------------------------------------------------------------#
-def atten_fsp(addr_fsp,atten_mode,atten):
- if atten_mode == "AUTO":
-  addr_fsp.write(":POW:ATT:AUTO ON")
-  OPCQ(addr_fsp)
- elif atten_mode == "MAN":
-  addr_fsp.write(":POW:ATT:AUTO OFF")
-  OPCQ(addr_fsp)
-  addr_fsp.write(":POW:ATT %s" %atten)
-  OPCQ(addr_fsp)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def preamp_fsp(addr_fsp,preamp_mode):
- if preamp_mode == "OFF":
-  addr_fsp.write(":POW:GAIN OFF")
-  OPCQ(addr_fsp)
- elif preamp_mode == "ON":
-  addr_fsp.write(":POW:GAIN ON")
-  OPCQ(addr_fsp)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def resbw_fsp(addr_fsp,resbw_mode,resbw):
- if resbw_mode == "AUTO":
-  addr_fsp.write(":BAND:RES:AUTO ON")
-  OPCQ(addr_fsp)
- elif resbw_mode == "MAN":
-  addr_fsp.write(":BAND:RES:AUTO OFF")
-  OPCQ(addr_fsp)
-  addr_fsp.write(":BAND:RES %s" %resbw)
-  OPCQ(addr_fsp)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def vidbw_fsp(addr_fsp,vidbw_mode,vidbw):
- if vidbw_mode == "AUTO":
-  addr_fsp.write(":BAND:VID:AUTO ON")
-  OPCQ(addr_fsp)
- elif vidbw_mode == "MAN":
-  addr_fsp.write(":BAND:VID:AUTO OFF")
-  OPCQ(addr_fsp)
-  addr_fsp.write(":BAND:VID %s" %vidbw)
-  OPCQ(addr_fsp)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def swpmode_fsp(addr_fsp,swp_mode):
- if swp_mode == "CONT":
-  addr_fsp.write(":INIT:CONT ON")
-  OPCQ(addr_fsp)
- elif swp_mode == "SINGLE":
-  addr_fsp.write(":INIT:CONT OFF")
-  OPCQ(addr_fsp)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def average_fsp(addr_fsp,state,count,type):
- if state == "OFF":
-  addr_fsp.write(":AVER OFF")
-  OPCQ(addr_fsp)
- elif state == "ON":
-  addr_fsp.write(":AVER ON")
-  OPCQ(addr_fsp)
-  addr_fsp.write(":AVER:COUN %s" %count)
-  OPCQ(addr_fsp)
-  addr_fsp.write(":AVER:TYPE %s" %type)
-  OPCQ(addr_fsp)
-  addr_fsp.write("SWEep:TIME?")
-  sweeptime = addr_fsp.read()
-  sweeptime = str_strip(sweeptime)  
-  addr_fsp.write("INIT;*WAI")
-  delay = (sweeptime * count) + (2*sweeptime)
-  time.sleep(delay)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def mrkrmode_fsp(addr_fsp,mrkr,mode):
- if mode == "NORMAL":
-  addr_fsp.write(":CALC:MARK%s:STAT ON" %mrkr)
-  OPCQ(addr_fsp)
-  addr_fsp.write(":CALC:MARK%s:MODE POS" %mrkr)
-  OPCQ(addr_fsp)
- elif mode == "DELTA":
-  addr_fsp.write(":CALC:MARK%s:STAT ON" %mrkr)
-  OPCQ(addr_fsp)
-  addr_fsp.write(":CALC:MARK%s:MODE DELT" %mrkr)
-  OPCQ(addr_fsp)
- elif mode == "BAND":
-  addr_fsp.write(":CALC:MARK%s:STAT ON" %mrkr)
-  OPCQ(addr_fsp)
-  addr_fsp.write(":CALC:MARK%s:MODE BAND" %mrkr)
-  OPCQ(addr_fsp)
- elif mode == "SPAN":
-  addr_fsp.write(":CALC:MARK%s:STAT ON" %mrkr)
-  OPCQ(addr_fsp)
-  addr_fsp.write(":CALC:MARK%s:MODE SPAN" %mrkr)
-  OPCQ(addr_fsp)
- elif mode == "OFF":
-  addr_fsp.write(":CALC:MARK%s:STAT OFF" %mrkr)
-  OPCQ(addr_fsp)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def mrknoise_fsp(addr_fsp,mrkr,state):
- addr_fsp.write(":CALC:MARK%s:FUNC:NOIS:STAT %s" %(mrkr,state))
- OPCQ(addr_fsp)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------# 
-def mrknoiserd_fsp(addr_fsp,mrkr):
- addr_fsp.write(":CALC:MARK%s:FUNC:NOIS:RES?" %mrkr)
- xnoiseval = addr_fsp.read()
- #Convert string to float
- xnoiseval = str_strip(xnoiseval)
- return(xnoiseval) 
-#-----------------------------------------------------------------------------------------------------------------------#
-def mrkrpksrch_fsp(addr_fsp,mrkr,mode):
- if mode == "PEAK":
-  addr_fsp.write(":CALC:MARK%s:MAX" %mrkr)
-  OPCQ(addr_fsp)
- elif mode == "NEXT":
-  addr_fsp.write(":CALC:MARK%s:MAX:NEXT" %mrkr)
-  OPCQ(addr_fsp)
- elif mode == "LEFT":
-  addr_fsp.write(":CALC:MARK%s:MAX:LEFT" %mrkr)
-  OPCQ(addr_fsp)
- elif mode == "RIGHT":
-  addr_fsp.write(":CALC:MARK%s:MAX:RIGH" %mrkr)
-  OPCQ(addr_fsp)
- elif mode == "MIN":
-  addr_fsp.write(":CALC:MARK%s:MIN" %mrkr)
-  OPCQ(addr_fsp)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def mrkrxoffset_fsp(addr_fsp,mrkr,offset):
- addr_fsp.write(":CALC:MARK%s:X %s" %(mrkr, offset))
- OPCQ(addr_fsp)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def xmrkrval_fsp(addr_fsp,mrkr):
- addr_fsp.write(":CALC:MARK%s:X?" %mrkr)
- xval = addr_fsp.read()
- #Convert string to float
- xval = str_strip(xval)	
- return(xval)
-#-----------------------------------------------------------------------------------------------------------------------#
-def ymrkrval_fsp(addr_fsp,mrkr):
- addr_fsp.write(":CALC:MARK%s:Y?" %mrkr)
- yval = addr_fsp.read()
- #Convert string to float
- yval = str_strip(yval)	
- return(yval)
-#-----------------------------------------------------------------------------------------------------------------------#
-def mrkrcenfreq_fsp(addr_fsp,mrkr):
- addr_fsp.write("CALC:MARK%s:FUNC:CENT" %mrkr)	
- OPCQ(addr_fsp)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def mrkrreflev_fsp(addr_fsp,mrkr):
- addr_fsp.write("CALC:MARK%s:FUNC:REF" %mrkr)	
- OPCQ(addr_fsp)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def maxhold_fsp(addr_fsp, state):
-  if state == "ON":
-   addr_fsp.write(":DISP:WIND:TRAC1:MODE WRIT")
-   OPCQ(addr_fsp)
-   addr_fsp.write(":DISP:WIND:TRAC1:MODE MAXH")
-   OPCQ(addr_fsp)
-  if state == "OFF":
-   addr_fsp.write(":DISP:WIND:TRAC1:MODE WRIT")
-   OPCQ(addr_fsp)  
-  return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def view_fsp(addr_fsp, state):
-  if state == "ON":
-   addr_fsp.write(":DISP:WIND:TRAC1:MODE WRIT")
-   OPCQ(addr_fsp)
-   addr_fsp.write(":DISP:WIND:TRAC1:MODE VIEW")
-   OPCQ(addr_fsp)
-  if state == "OFF":
-   addr_fsp.write(":DISP:WIND:TRAC1:MODE WRIT")
-   OPCQ(addr_fsp)  
-  return(0)  
-#-----------------------------------------------------------------------------------------------------------------------#
-def readtrace_fsp(addr_fsp, trace, fd, notes):
- (safstart,safstop)=freqssrd_fsp(addr_fsp)
- addr_fsp.write(":FORM ASC")
- addr_fsp.write(":TRAC? TRACE%s" %trace)
- datastore = "" 
- flag = 0
- istr_len = 1
- str_len = 1
- while (str_len >= istr_len):
-  time.sleep(0.1)
-  tracedata = addr_fsp.read()
-  tracedata = tracedata.decode("utf-8")
-  datastore = datastore + tracedata
-  
-  if flag == 0:
-   istr_len = len(tracedata) 
-   str_len = istr_len
-  if flag != 0: 
-   str_len = len(tracedata)
-
-  flag = flag + 1 
-  
- csvf.fappn_trace(fd, safstart, safstop, datastore, notes)
- 
- #Empty string_in (effectively empties the allocated memory) 
- tracedata = ""
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-#UNTESTED
-def cfgchanpwr_fsp(addr_fsp,state,bw,avgstate,count):
- if state == "ON":
-  addr_fsp.write("INIT:CHP")
-  OPCQ(addr_fsp)
-  addr_fsp.write("CHP:BAND:INT %s" %bw)
-  OPCQ(addr_fsp)
-  addr_fsp.write("CHP:AVER:STAT %s" %avgstate)
-  OPCQ(addr_fsp)
-  addr_fsp.write("CHP:AVER:COUN %s" %count)
-  OPCQ(addr_fsp)
-  addr_fsp.write("CHP:AVER:TCON REP")
-  OPCQ(addr_fsp)
- elif state == "OFF":
-  addr_fsp.write("CONF:SAN")
-  OPCQ(addr_fsp)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-#UNTESTED
-def chanpwr_fsp(addr_fsp,wait):
- addr_fsp.write("INIT:CHP")
- time.sleep(wait)
- addr_fsp.write("FETC:CHP?")
- chanpwr = addr_fsp.read()
- #Convert string to float
- chanpwr = str_strip(chanpwr)	
- return(chanpwr)
-#-----------------------------------------------------------------------------------------------------------------------#	
-# Purpose: Agilent E4433 commands									                                                                  		#
-# Author: TJA														                                                                                #
-# Date: 15/08/2021												                                                                            	#
-# Revision: A 													                                                                              	#
-# Status: development												                                                                          	#
-#-----------------------------------------------------------------------------------------------------------------------#
-def init_4433(addr_4433):
- #addr_4433.clear()
- addr_4433.term_chars="\n"
- RESET(addr_4433)
- addr_4433.write("OUTP:STAT OFF")
- OPCQ(addr_4433)
- addr_4433.write("POW:OFFS 0 dB")
- OPCQ(addr_4433)
- addr_4433.write("FREQ 100000000 Hz")
- OPCQ(addr_4433)
- addr_4433.write("POW -143 dBm")
- OPCQ(addr_4433)
- addr_4433.write("FM1:STAT OFF")
- OPCQ(addr_4433)
- addr_4433.write("FM1:SOUR INT")
- OPCQ(addr_4433)
- addr_4433.write("FM1 0 Hz")
- OPCQ(addr_4433)
- addr_4433.write("FM1:INT:FREQ 1000 Hz")
- OPCQ(addr_4433)
- addr_4433.write("FM2:STAT OFF")
- OPCQ(addr_4433)
- addr_4433.write("FM2:SOUR INT")
- OPCQ(addr_4433)
- addr_4433.write("FM2 0 Hz")
- OPCQ(addr_4433)
- addr_4433.write("FM2:INT:FREQ 1000 Hz")
- OPCQ(addr_4433)
- return(ID(addr_4433))
-#-----------------------------------------------------------------------------------------------------------------------#
-def output_4433(addr_4433, state):
- if state == "ON":
-  addr_4433.write("OUTP:STAT ON")
-  OPCQ(addr_4433)
- elif state == "OFF":
-  addr_4433.write("OUTP:STAT OFF")
-  OPCQ(addr_4433)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def offset_4433(addr_4433, offset):
- addr_4433.write("POW:OFFS %s dB" %offset)
- OPCQ(addr_4433)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def set_4433(addr_4433, freq, level):
- addr_4433.write("FREQ %s Hz" %freq)
- OPCQ(addr_4433)
- addr_4433.write("POW %s dBm" %level)
- OPCQ(addr_4433)
- addr_4433.write("OUTP:STAT ON")
- OPCQ(addr_4433)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def freq_4433(addr_4433, freq):
- addr_4433.write("FREQ %s Hz" %freq)
- OPCQ(addr_4433)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def lev_4433(addr_4433, level):
- addr_4433.write("POW %s dBm" %level)
- OPCQ(addr_4433)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def fm_4433(addr_4433, state, source, tonefreq, dev):
- if state == "ON":
-  addr_4433.write("FM%s:STAT ON" %source)
-  OPCQ(addr_4433)
-  addr_4433.write("FM%s:SOUR INT" %source)
-  OPCQ(addr_4433)
-  addr_4433.write("FM%s %s Hz" %(source,dev))
-  OPCQ(addr_4433)
-  addr_4433.write("FM%s:INT:FREQ %s Hz" %(source,tonefreq))
-  OPCQ(addr_4433)
- elif state == "OFF":
-  addr_4433.write("FM%s:STAT OFF" %source)
-  OPCQ(addr_4433)
- return(0)      
-#-----------------------------------------------------------------------------------------------------------------------#
-def am_4433(addr_4433, state, modfreq, modlev):
- if state == "ON":
-  addr_4433.write("AM:STAT ON")
-  OPCQ(addr_4433)
-  addr_4433.write("AM:SOUR INT")
-  OPCQ(addr_4433)
-  addr_4433.write("AM:DEPT %s PCT" %modlev)
-  OPCQ(addr_4433)
-  addr_4433.write("AM:INT:FREQ %s Hz" %modfreq)
-  OPCQ(addr_4433)
- elif state == "OFF":
-  addr_4433.write("AM:STAT OFF")
-  OPCQ(addr_4433)
- return(0)
-
-#-----------------------------------------------------------------------------------------------------------------------#	
-# Purpose: marconi 2024 commands										                                                                  	#
-# Author: TJA														                                                                                #
-# Date: 15/08/2021													                                                                            #
-# Revision: A 													                                                                              	#
-# Status: development													                                                                          #
-#-----------------------------------------------------------------------------------------------------------------------#
-def init_2024(addr_2024):
- #addr_2024.clear()
- addr_2024.term_chars="\n"
- RESET(addr_2024)
- addr_2024.write(":OUTPUT:DISABLE")
- OPCQ(addr_2024)
- addr_2024.write(":CFRQ:VALUE 100000000HZ;INC 1KHZ")
- OPCQ(addr_2024)
- addr_2024.write(":RFLV:UNITS DBM;TYPE PD;VALUE -140;INC 0.5;OFF")
- OPCQ(addr_2024)
- addr_2024.write(":RFLV:OFFS:VALUE 0;DISABLE")
- OPCQ(addr_2024)
- addr_2024.write(":MODE AM,FM")
- OPCQ(addr_2024)
- addr_2024.write(":MOD:OFF")
- OPCQ(addr_2024)
- addr_2024.write(":FM1:DEVN 0KHZ;INC 1KHZ;INT;OFF")
- OPCQ(addr_2024)
- addr_2024.write(":FM1:MODF:VALUE 1.0HZ;SIN")
- OPCQ(addr_2024)
- addr_2024.write(":FM2:DEVN 0KHZ;INC 1KHZ;INT;OFF")
- OPCQ(addr_2024)
- addr_2024.write(":FM2:MODF:VALUE 1.0HZ;SIN")
- OPCQ(addr_2024)
- return(ID(addr_2024))
-#-----------------------------------------------------------------------------------------------------------------------#
-def output_2024(addr_2024, state):
- if state == "ON":
-  addr_2024.write(":OUTPUT:ENABLE")
-  OPCQ(addr_2024)
- elif state == "OFF":
-  addr_2024.write(":OUTPUT:DISABLE")
-  OPCQ(addr_2024)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def set_2024(addr_2024, freq, level):
- addr_2024.write(":CFRQ:VALUE %sHZ;INC 1KHZ" %freq)
- OPCQ(addr_2024)
- addr_2024.write(":RFLV:UNITS DBM;TYPE PD;VALUE %s;INC 0.5;ON" %level)
- OPCQ(addr_2024)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def freq_2024(addr_2024, freq):
- addr_2024.write(":CFRQ:VALUE %sHZ;INC 1KHZ" %freq)
- OPCQ(addr_2024)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def lev_2024(addr_2024, level):
- addr_2024.write(":RFLV:UNITS DBM;TYPE PD;VALUE %s;INC 0.5;ON" %level)
- OPCQ(addr_2024)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def fm_2024(addr_2024, state, source, tonefreq, dev):
- if state == "ON":
-  addr_2024.write(":MODE FM")
-  OPCQ(addr_2024)
-  addr_2024.write(":MOD:ON")
-  OPCQ(addr_2024)
-  addr_2024.write(":FM%s:DEVN %sHZ;INC 1KHZ;INT;ON" %(source,dev))  
-  OPCQ(addr_2024)
-  addr_2024.write(":FM%s:MODF:VALUE %sHZ;SIN" %(source,tonefreq))
-  OPCQ(addr_2024)
- elif state == "OFF":
-  addr_2024.write(":MODE AM,FM")
-  OPCQ(addr_2024)
-  addr_2024.write(":MOD:OFF")
-  OPCQ(addr_2024)
-  addr_2024.write(":FM%s:DEVN 0KHZ;INC 1KHZ;INT;OFF" %source)  
-  OPCQ(addr_2024)
-  addr_2024.write(":FM%s:MODF:VALUE 1.0HZ;SIN" %source)
-  OPCQ(addr_2024)
- return(0)      
-#-----------------------------------------------------------------------------------------------------------------------#
-def am_2024(addr_2024, state, source, modfreq, mdepth):
- if state == "ON":
-  addr_2024.write(":MODE AM")
-  OPCQ(addr_2024)
-  addr_2024.write(":MOD:ON")
-  OPCQ(addr_2024)
-  addr_2024.write(":AM%s:DEPTH %sPCT;INT;ON" %(source,mdepth))  
-  OPCQ(addr_2024)
-  addr_2024.write(":AM%s:MODF:VALUE %sKHZ;SIN" %(source,modfreq))
-  OPCQ(addr_2024)
- if state == "OFF":
-  addr_2024.write(":MODE AM,FM")
-  OPCQ(addr_2024)
-  addr_2024.write(":MOD:OFF")
-  OPCQ(addr_2024)
-  addr_2024.write(":AM%s:DEPTH 25PCT;INT;OFF" %source)  
-  OPCQ(addr_2024)
-  addr_2024.write(":AM%s:MODF:VALUE 1KHZ;SIN" %source) 
-  OPCQ(addr_2024)
- return(0)
-
-#-----------------------------------------------------------------------------------------------------------------------#	
-# Purpose: model 8x5-M signal generator commands									                                                      #
-# Author: TJA														                                                                                #
-# Date: 19/08/2021													                                                                            #
-# Revision: A 														                                                                              #
-# Status: development												                                                                           	#
-#-----------------------------------------------------------------------------------------------------------------------#
-def init_8x5m(addr_8x5m):
- addr_8x5m.clear()
- addr_8x5m.term_chars="\n"  
- RESET(addr_8x5m)
- return(ID(addr_8x5m))
-#-----------------------------------------------------------------------------------------------------------------------#
-def output_8x5m(addr_8x5m, state):
- if state == "ON":
-  addr_8x5m.write("OUTP:STAT ON")
-  OPCQ(addr_8x5m)
- elif state == "OFF":
-  addr_8x5m.write("OUTP:STAT OFF")
-  OPCQ(addr_8x5m)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def set_8x5m(addr_8x5m, freq, level):
- addr_8x5m.write("SOUR:FREQ:CW %s Hz" %freq)
- OPCQ(addr_8x5m)
- addr_8x5m.write("SOUR:POW:ATT:AUTO ON")
- OPCQ(addr_8x5m)
- addr_8x5m.write("SOUR:POW:LEV %s dBm" %level)
- OPCQ(addr_8x5m)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def freq_8x5m(addr_8x5m, freq):
- addr_8x5m.write("SOUR:FREQ:CW %s Hz" %freq)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def lev_8x5m(addr_8x5m, level):
- addr_8x5m.write("SOUR:POW:ATT:AUTO ON")
- OPCQ(addr_8x5m)
- addr_8x5m.write("SOUR:POW:LEV %s dBm" %level)
- OPCQ(addr_8x5m)
- return(0)
-
-#-----------------------------------------------------------------------------------------------------------------------#	
-# Purpose: R&S SFC-U Compact Modulator commands			        						                                                #
-# Author: TJA														                                                                                #
-# Date: 17/09/2021													                                                                            #
-# Revision: A 														                                                                              #
-# Status: development												                                                                           	#
-#-----------------------------------------------------------------------------------------------------------------------#
-def init_sfc(addr_sfc):
- addr_sfc.open()
- addr_sfc.clear()
- addr_sfc.term_chars="\n"  
- RESET(addr_sfc)            
- return(ID(addr_sfc))
-#-----------------------------------------------------------------------------------------------------------------------#
-def freq_sfc(addr_sfc, freq):
- addr_sfc.write("SOUR:FREQ:ACTual:CENTer %s HZ" %freq)
- OPCQ(addr_sfc)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------# 
-def lev_sfc(addr_sfc, lev):
- addr_sfc.write("SOURce:POWer %s dBm" %lev)
- OPCQ(addr_sfc)
- return(0) 
-#-----------------------------------------------------------------------------------------------------------------------# 
-def set_sfc(addr_sfc, freq, lev):
- addr_sfc.write("SOUR:FREQ:ACTual:CENTer %s HZ" %freq)
- addr_sfc.write("SOURce:POWer %s dBm" %lev)
- OPCQ(addr_sfc)
- return(0) 
-#-----------------------------------------------------------------------------------------------------------------------# 
-def out_sfc(addr_sfc, state):
- addr_sfc.write("OUTPut:STATe %s" %state)
- OPCQ(addr_sfc)
- return(0)  
-#-----------------------------------------------------------------------------------------------------------------------#
-def mod_sfc(addr_sfc, state):
- # Modulation ON or OFF. Modulation OFF provides a CW output
- addr_sfc.write("SOURce:MODulator:STATe %s" %state)
- OPCQ(addr_sfc)
- addr_sfc.write("SOURce:MODulator:STAT?")
- response = addr_sfc.read()
- return(response) 
-#-----------------------------------------------------------------------------------------------------------------------#
-def specpol_sfc(addr_sfc, pol):
- # Set IQ polarity NORM = Normal, INV = Inverted
- addr_sfc.write("SOUR:DM:POL %s" %pol)
- OPCQ(addr_sfc)
- addr_sfc.write("SOUR:DM:POL?")
- response = addr_sfc.read()
- return(response)
-#-----------------------------------------------------------------------------------------------------------------------#
-'''
-Modulation Settings
-
-TRANsmission commands available/not available in this driver
-DVBC............Available
-DVBS............Available
-DVBT............Available
-VSB.............Available
-J83B............Available
-ISDBt...........Available
-DTMB............Available
-DVS2............Available
-DIRectv.........Available
-TDMB............Available
-MEDiaflo.... ...Available
-CMMB............Available
-T2DVb...........Available
-ATSM............Available
-'''
-def trans_sfc(addr_sfc, trans):
- if trans == "DVBS":
-  addr_sfc.write("SOURce:DM:TRANsmission DVBS")
- if trans == "DVBS2":
-  addr_sfc.write("SOURce:DM:TRANsmission DVS2")
- if trans == "DIRECTV":
-  addr_sfc.write("SOURce:DM:TRANsmission DIRectv")
- if trans == "DVBC": 
-  addr_sfc.write("SOURce:DM:TRANsmission DVBC")
- if trans == "DVBC2": 
-  addr_sfc.write("SOURce:DM:TRANsmission C2DVb") 
- if trans == "DVBT": 
-  addr_sfc.write("SOURce:DM:TRANsmission DVBT") 
- if trans == "DVBT2": 
-  addr_sfc.write("SOURce:DM:TRANsmission T2DVb") 
- if trans == "J83B": 
-  addr_sfc.write("SOURce:DM:TRANsmission J83B")   
- if trans == "VSB": 
-  addr_sfc.write("SOURce:DM:TRANsmission VSB") 
- if trans == "ISDBT": 
-  addr_sfc.write("SOURce:DM:TRANsmission ISDBt") 
- if trans == "DTMB": 
-  addr_sfc.write("SOURce:DM:TRANsmission DTMB")   
- if trans == "TDMB": 
-  addr_sfc.write("SOURce:DM:TRANsmission TDMB")      
- if trans == "MEDIAFLO": 
-  addr_sfc.write("SOURce:DM:TRANsmission MEDiaflo")
- if trans == "CMMB": 
-  addr_sfc.write("SOURce:DM:TRANsmission CMMB") 
- if trans == "ATSM": 
-  addr_sfc.write("SOURce:DM:TRANsmission ATSM") 
- OPCQ(addr_sfc)
- addr_sfc.write("SOURce:DM:TRANsmission:STAN?") 
- response = addr_sfc.read()
- return(response)
- 
-#-----------------------------------------------------------------------------------------------------------------------#
-def dvbs_sfc(addr_sfc, constel, input, payload, sequence, coderate, rolloff, source, stuffing, symbolrate, testsignal, tspackets, reedsolomon, special):
-
- #example: dvbs_sfc(addr_sfc, "QPSK", "ASI1", "PRBS", "P23_1", "R2_3", 0.25, "TESTsignal", "OFF", "27.5000e6", "TTSP", "H184", "ON", "OFF")
- 
- # SFC-U Modulation Screen
- # Transmission DVBS 
- print("Transmission: %s" %trans_sfc(addr_sfc, "DVBS"))
- #Spectrum NORMAL
- print("Spectrum: %s" %specpol_sfc(addr_sfc, "NORM"))
- #Turn Modulation ON
- print("Modulation: %s" %mod_sfc(addr_sfc, "ON"))
- 
- # SFC-U Input Signal Screen
- # Source EXTernal(default),TSPLayer,TESTsignal
- addr_sfc.write("SOURce:IQCoder:DVBS:SOUR %s" %source)
- print("Input source: %s" %source)
- # ASI Input ASI1 or ASI2
- addr_sfc.write("SOURce:IQCoder:DVBS:INPut %s", input)
- print("ASI Input: %s" %input)  
- # Stuffing ON/OFF
- addr_sfc.write("SOURce:IQCoder:DVBS:STUF %s" %stuffing)
- print("stuffing: %s" %stuffing)
- # Test signal TS packet = TTSP, PRBS before conv. = PBEC
- addr_sfc.write("SOURce:IQCoder:DVBS:SOUR %s" %testsignal)
- print("Test signal: %s" %testsignal)
- 
- # SFC-U Coding Screen
- # Symbol Rate range 0.100000e6 S/s to 45.000000e6 S/s   default 27.5000e6 S/s
- # Example SOURce:IQCoder:DVBS:SYMBols:RATE 22.5000e6  
- addr_sfc.write("SOURce:IQCoder:DVBS:SYMBols:RATE %s" %symbolrate)
- print("Symbol rate %s" %symbolrate)
- # Constellation QPSK = S4, 8PSK = S8, 16QAM = S16
- if constel == "QPSK":
-  addr_sfc.write("SOURce:IQCoder:DVBS:CONS S4")
- if constel == "8PSK":
-  addr_sfc.write("SOURce:IQCoder:DVBS:CONS S8") 
- if constel == "16QAM":
-  addr_sfc.write("SOURce:IQCoder:DVBS:CONS S16")  
- print("Constellation: %s" %constel)  
- # Roll off 0.2, 0.25, 0.35
- addr_sfc.write("SOURce:IQCoder:DVBS:ROLL %s" %rolloff)
- print("Roll off: %s" %rolloff)
- # Code Rate 1/2 = R1_2, 2/3 = R2_3, 3/4 = R3_4, 5/6 = R5_6, 7/8 = R7_8, 8/9 = R8_9
- addr_sfc.write("SOURce:IQCoder:D VBS:RATE %s" %coderate)
- print("Code rate: %s" %coderate)
- 
- # SFC-U Special Screen 
- # Special Settings ON/OFF 
- addr_sfc.write("SOURce:IQCoder:DVBS:SPECial:SETT:STAT %s" %special)
- print("Special settings: %s" %special)
- # Reed Solomon ON/OFF 
- addr_sfc.write("SOURce:IQCoder:DVBS:SPECial:REED %s" %reedsolomon)
- print("Reed Solomon: %s" %reedsolomon)
- 
- # SFC-U Settings Screen 
- # TS Packets Head / 184 payload = H184, Sync / 187 payload = S187 
- addr_sfc.write("SOURce:IQCoder:DVBS:TSP %s" %tspackets)
- print("Test TS packet: %s" %tspackets)
- # Payload PRBS = PRBS, Hex 00 = H00, Hex FF = HFF 
- addr_sfc.write("SOURce:IQCoder:DVBS:PAYL %s" %payload)
- print("Payload Test: %s" %payload) 
- # PRBS 2^23 - 1 (ITU-T O.151) = P23_1, 2^15 - 1 (ITU-T O.151) = P15_1
- addr_sfc.write("SOURce:IQCoder:DVBS:PRBS:SEQ %s" %sequence)
- print("PRBS sequence: %s" %sequence)  
-
- OPCQ(addr_sfc)
- return(0)
-
-#-----------------------------------------------------------------------------------------------------------------------# 
-#DVB-S2 Settings
-def dvbs2_sfc(addr_sfc, constel, input, fecframe, payload, pilots, sequence, coderate, rolloff, source, stuffing, symbolrate, testsignal, tspackets):
-
-#example: dvbs2_sfc(addr_sfc, "QPSK", "ASI1", "NORM", "PRBS", "ON", "P23_1", "R2_3", 0.25, "TESTsignal", "OFF", "27.5000e6", "TTSP", "H184")
-
- # SFC-U Modulation Screen
- # Transmission DVBS 
- print("Transmission: %s" %trans_sfc(addr_sfc, "DVBS2"))
- #Spectrum NORMAL
- print("Spectrum: %s" %specpol_sfc(addr_sfc, "NORM"))
- #Turn Modulation ON
- print("Modulation: %s" %mod_sfc(addr_sfc, "ON"))
-
- # SFC-U Input Signal Screen
- # Source EXTernal(default),TSPLayer,TESTsignal
- addr_sfc.write("SOURce:IQCoder:DVBS2:SOUR %s" %source)
- print("Input source: %s" %source)
- # ASI Input ASI1 or ASI2
- addr_sfc.write("SOURce:IQCoder:DVBS2:INPut %s", input)
- print("ASI Input: %s" %input)  
- # Stuffing ON/OFF
- addr_sfc.write("SOURce:IQCoder:DVBS2:STUF %s" %stuffing)
- print("stuffing: %s" %stuffing)
- # Test signal TS packet = TTSP, PRBS before conv. = PBEC
- addr_sfc.write("SOURce:IQCoder:DVBS2:SOUR %s" %testsignal)
- print("Test signal: %s" %testsignal)
-
- # SFC-U Coding Screen
- # Symbol Rate range 0.100000e6 S/s to 45.000000e6 S/s   default 20.0000e6 S/s
- # Example SOURce:IQCoder:DVBS2:SYMBols:RATE 22.5000e6  
- addr_sfc.write("SOURce:IQCoder:DVBS2:SYMBols:RATE %s" %symbolrate)
- print("Symbol rate %s" %symbolrate)
- # Constellation QPSK = S4, 8PSK = S8, 16APSK = A16, 32APSK = A32
- if constel == "QPSK":
-  addr_sfc.write("SOURce:IQCoder:DVBS2:CONStel S4")
- if constel == "8PSK":
-  addr_sfc.write("SOURce:IQCoder:DVBS2:CONStel S8") 
- if constel == "16APSK":
-  addr_sfc.write("SOURce:IQCoder:DVBS2:CONStel A16") 
- if constel == "32APSK":
-  addr_sfc.write("SOURce:IQCoder:DVBS2:CONStel A32")   
- print("Constellation: %s" %constel)  
- # FEC Frame Normal = NORM, Short = SHOR
- addr_sfc.write("SOURce:IQCoder:DVBS2:FECFrame %s" %fecframe)
- print("FECFrame: %s" %fecframe)
- # Pilots ON/OFF 
- addr_sfc.write("SOURce:IQCoder:DVBS2:PILots %s" %pilots) 
- print("Pilots: %s" %pilots)
- # Roll off 0.15, 0.2, 0.25, 0.35
- addr_sfc.write("SOURce:IQCoder:DVBS2:ROLLoff %s" %rolloff)
- print("Roll off: %s" %rolloff)
- # Code Rate 1/4 = R1_4, 1/3 = R1_3, 2/5 = R2_5, 1/2 = R1_2,3/5 = R3_5, 2/3 = R2_3, 
- # 3/4 = R3_4, 4/5 = R4_5, 5/6 = R5_6, 6/7 = R6_7, 7/8 = R7_8, 8/9 = R8_9, 9/10 = R9_10
- addr_sfc.write("SOURce:IQCoder:DVBS2:RATE %s" %coderate)
- print("Code rate: %s" %coderate)
-
- # SFC-U Settings Screen 
- # TS Packets Head / 184 payload = H184, Sync / 187 payload = S187 
- addr_sfc.write("SOURce:IQCoder:DVBS:TSP %s" %tspackets)
- print("Test TS packet: %s" %tspackets)
- # Payload PRBS = PRBS, Hex 00 = H00, Hex FF = HFF 
- addr_sfc.write("SOURce:IQCoder:DVBS2:PAYL %s" %payload)
- print("Payload Test: %s" %payload) 
- # PRBS 2^23 - 1 (ITU-T O.151) = P23_1, 2^15 - 1 (ITU-T O.151) = P15_1
- addr_sfc.write("SOURce:IQCoder:DVBS:PRBS:SEQ %s" %sequence)
- print("PRBS sequence: %s" %sequence) 
-
- #Turn Modulation ON
- mod_sfc(addr_sfc, "ON")
-
- OPCQ(addr_sfc)
- return(0)
-
-#-----------------------------------------------------------------------------------------------------------------------#
-def cnadd_sfc(addr_sfc, state, cn):
- addr_sfc.write("SOURce:NOISe:MODE AWGN")
- addr_sfc.write("SOURce:NOISe:COUPling %s" %state)
- 
- if state == "ON":
-  addr_sfc.write("SOURce:NOISe:STATe ADD")
-  addr_sfc.write("SOURce:NOISe:AWGN ON")
- elif state == "OFF":
-  addr_sfc.write("SOURce:NOISe:STATe OFF")
-  addr_sfc.write("SOURce:NOISe:AWGN OFF")
-  
- addr_sfc.write("SOURce:NOISe:CN %s" %cn)
- OPCQ(addr_sfc) 
- return(0) 
- 
-#-----------------------------------------------------------------------------------------------------------------------#	
-# Purpose: TTi TG5011A Arb generator commands			        						                                                  #
-# Author: TJA														                                                                                #
-# Date: 21/08/2021													                                                                            #
-# Revision: A 														                                                                              #
-# Status: development												                                                                           	#
-#-----------------------------------------------------------------------------------------------------------------------#
-def init_tg5011a(addr_tg5011a):
- addr_tg5011a.clear()
- addr_tg5011a.term_chars="\r\n"
- RESET(addr_tg5011a)
- return(ID(addr_tg5011a))
-#-----------------------------------------------------------------------------------------------------------------------#
-def configarb_tg5011a(addr_tg5011a, arbnumber):
-  #print(addr_tg5011a.ask("ARB1DEF?"))
-  addr_tg5011a.write("ARBLOAD ARB%s" %arbnumber)
-  OPCQ(addr_tg5011a)
-  #Set frequency (For a command with four bytes this is 1/(9bits*4words*1.5ms)=18.51851851851852 Hz )
-  addr_tg5011a.write("FREQ 18.518518518")
-  OPCQ(addr_tg5011a)
-  #Select Burst
-  #Set Burst type to multiple (1)
-  addr_tg5011a.write("BSTCOUNT 1")
-  OPCQ(addr_tg5011a)
-  addr_tg5011a.write("BSTPHASE 0")
-  OPCQ(addr_tg5011a)
-  addr_tg5011a.write("BST NCYC")
-  OPCQ(addr_tg5011a)
-  #Select Trigger
-  #Set trigger to manual
-  addr_tg5011a.write("TRGSRC MAN")
-  OPCQ(addr_tg5011a)
-  #Turn generator output on
-  addr_tg5011a.write("OUTPUT ON")
-  OPCQ(addr_tg5011a)
-  return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def readwav_tg5011a(addr_tg5011a, filename, arbnumber):
-  addr_tg5011a.write("ARB%s?" %arbnumber)
-  OPCQ(addr_tg5011a)
-  #fetch first two characters 
-  addr_tg5011a.term_chars=None
-  headervalue = addr_tg5011a.visalib.read(addr_tg5011a.session, 2)
-  #check first is # (hex 23)
-  #if it is, second character defines the number of bytes to follow. Fetch this number.
-  numberofbytes = addr_tg5011a.visalib.read(addr_tg5011a.session, int(chr((headervalue[1]))))
-  f = open(filename, 'wb')
-  f.write(addr_tg5011a.read(int(numberofbytes))) 
-  addr_tg5011a.term_chars="\r\n"
-#-----------------------------------------------------------------------------------------------------------------------#
-def trigger_tg5011a(addr_tg5011a):
-  addr_tg5011a.write("*TRG")
-  addr_tg5011a.write("*CLS")
-  return(0) 
-#-----------------------------------------------------------------------------------------------------------------------#
-def writewav_tg5011a(addr_tg5011a, filename, arbnumber):
- addr_tg5011a.write("ARBDEF ARB%s,PORT%s,ON" %(arbnumber,arbnumber))
- OPCQ(addr_tg5011a)
- #load data from file
- #f = open('C:\data\Perl\PCB_Sim\waveform.wfm', 'rb')
- f = open(filename, 'rb')
- wavedata=f.read()
- #strip existing header
- #add new header (#...)
- #calculate how many bytes in wavedata
- lengthofwave=len(wavedata)
- # for i in (str(lengthofwave)):
- # headerdata.append(ord(i))
- # "#"+str(len(str(lengthofwave)))+str(lengthofwave)
- # convert header data to ascii numbers
- # headerdata_ascii=""
- # for i,c in enumerate(headerdata):
- # headerdata_ascii=headerdata_ascii + str(ord(headerdata[i]))
- # headerdata_ascii=bytearray(headerdata)
- headerdata="#"
- headerdata+=str(len(str(lengthofwave)))
- headerdata+=str(lengthofwave)
- #write to generator
- addr_tg5011a.term_chars=""
- addr_tg5011a.send_end=False
- 
- count = addr_tg5011a.visalib.write(addr_tg5011a.session, "ARB%s " %arbnumber)
- 
- count = addr_tg5011a.visalib.write(addr_tg5011a.session, headerdata)
- 
- addr_tg5011a.values_format = 5
- 
- #############################################
- #  Write binary to device using visa32.dll  #
- #############################################
- #bufferToWrite = "*IDN?" #*IDN? typically tells devices to return identification
- #bytesToWrite = len(bufferToWrite) + 1
- bytesWritten = c_int(0) 
- #Function Prototype: ViStatus viWrite(ViSession vi, ViBuf buf, ViUInt32 count, ViPUInt32 retCount)
- 
- if constants.NOEQUIP:
-  returnValue = 0
- else:
-  returnValue = dll.viWrite(addr_tg5011a.session, wavedata, len(wavedata), byref(bytesWritten))
- 
- 
- if returnValue != 0:
-  print ("Could not write binary data to device. Error: ", returnValue)
-  return(returnValue)
-  print ("Bytes Written: ", bytesWritten)
-  print ("ReturnValue: ", returnValue, "\n")
-  #############################################
- addr_tg5011a.values_format = 0
- print(addr_tg5011a.visalib.write(addr_tg5011a.session,"\n"))
- addr_tg5011a.term_chars="\r\n"
- time.sleep(2)
- 
-#-----------------------------------------------------------------------------------------------------------------------#	
-# Purpose: TTi PL303-P PSU commands			        						                                                            #
-# Author: TJA														                                                                                #
-# Date: 21/08/2021													                                                                            #
-# Revision: A 														                                                                              #
-# Status: development												                                                                           	#
-#-----------------------------------------------------------------------------------------------------------------------#
-def init_pl303(addr_pl303):
- addr_pl303.clear()
- addr_pl303.term_chars="\r\n"
- RESET(addr_pl303)      
- vset_pl303(addr_pl303, 1, 0)    
- OPCQ(addr_pl303)     
- iset_pl303(addr_pl303, 1, 0)
- OPCQ(addr_pl303)
- allout_pl303(addr_pl303, "OFF")
- OPCQ(addr_pl303)
- return(ID(addr_pl303))
-#-----------------------------------------------------------------------------------------------------------------------#
-def allout_pl303(addr_pl303, state):
- if state == "ON":
-  addr_pl303.write("OPALL 1")
-  OPCQ(addr_pl303)
- elif state == "OFF":
-  addr_pl303.write("OPALL 0") 
-  OPCQ(addr_pl303)
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-def out_pl303(addr_pl303, state, source):
- if state == "ON":
-  addr_pl303.write("OP%s 1" %source)
-  OPCQ(addr_pl303)
- elif state == "OFF":
-  addr_pl303.write("OP%s 0" %source) 
-  OPCQ(addr_pl303)
- return(0) 
-#-----------------------------------------------------------------------------------------------------------------------# 
-def vset_pl303(addr_pl303, source, voltage):          
- addr_pl303.write("V%s %s" %(source, voltage))
- OPCQ(addr_pl303)
- return(0) 
-#-----------------------------------------------------------------------------------------------------------------------#  
-def iset_pl303(addr_pl303, source, current):          
- addr_pl303.write("I%s %s" %(source, current))
- OPCQ(addr_pl303)
- return(0)  
-#-----------------------------------------------------------------------------------------------------------------------#  
-def iread_pl303(addr_pl303, source):          
- ireadback = addr_pl303.ask("I%sO?" %source)
- #Convert string to float
- ireadback = str_strip(ireadback)	
- return(ireadback)
-#-----------------------------------------------------------------------------------------------------------------------# 
-def vread_pl303(addr_pl303, source):          
- vreadback = addr_pl303.ask("V%s?" %source)
- #Convert string to float
- vreadback = str_strip(vreadback)
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Function: equip												                                                                               	#
+# Purpose: test equipment driver library									                                                              #
+# Parameters: accepts and returns refer to the code								                                                     	#
+# Author: TJA														                                                                                #
+# Date: 16/12/2021													                                                                            #
+# Revision: A 														                                                                              #
+# Status: development												                                                                          	#
+#-----------------------------------------------------------------------------------------------------------------------#
+
+#imports
+import pyvisa
+import binascii
+import csv
+import sys
+import importlib # available changed from import imp - depricated
+import os
+import time
+import contextlib
+import threading
+import concurrent.futures
+import re
+import hashlib
+import json
+import numpy
+
+#set top level directory path
+dirpath = '/home/instrument/Desktop/'
+#append source directory
+sys.path.append (dirpath+'vlc_rig')
+
+import csvf
+import user
+#import macro
+
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Purpose: Agilent Technologies N9000A CXA Signal Analyser Commands                                                     #
+# Author: TJA													                                                                                 	#
+# Date: 28/08/2021	(last update): 28/08/2021													                                                 	#          
+# Revision: A 													                                                                                #
+# Status: development											                                                                          		#
+#-----------------------------------------------------------------------------------------------------------------------#
+def init_cxa(addr_cxa):
+ addr_cxa.clear()
+ addr_cxa.term_chars="\n"
+ RESET(addr_cxa)
+ WRITE(addr_cxa, ":DISP:ENAB ON")
+ WRITE(addr_cxa, ":INIT:CONT ON")
+ return(ID(addr_cxa))
+#-----------------------------------------------------------------------------------------------------------------------#
+def reflev_cxa(addr_cxa, reflev):
+ sent = WRITE(addr_cxa, ":DISP:WIND:TRAC:Y:RLEV %s" %reflev)
+ OPCQ(addr_cxa)
+ if sent:
+  SETTLE(addr_cxa)
+ return(0) 
+#-----------------------------------------------------------------------------------------------------------------------#
+def atten_cxa(addr_cxa,atten_mode,atten):
+ if atten_mode == "AUTO":
+  WRITE(addr_cxa, ":POW:ATT:AUTO ON")
+  OPCQ(addr_cxa)
+ elif atten_mode == "MAN":
+  WRITE(addr_cxa, ":POW:ATT:AUTO OFF")
+  OPCQ(addr_cxa)
+  WRITE(addr_cxa, ":POW:ATT %s" %atten)
+  OPCQ(addr_cxa)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def resbw_cxa(addr_cxa,resbw_mode,resbw):
+ if resbw_mode == "AUTO":
+  WRITE(addr_cxa, ":BAND:RES:AUTO ON")
+  OPCQ(addr_cxa)
+ elif resbw_mode == "MAN":
+  WRITE(addr_cxa, ":BAND:RES:AUTO OFF")
+  OPCQ(addr_cxa)
+  WRITE(addr_cxa, ":BAND:RES %s" %resbw)
+  OPCQ(addr_cxa)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def resbwrd_cxa(addr_cxa):
+ addr_cxa.write(":BAND:RES?")
+ return(str_strip(addr_cxa.read()))
+#-----------------------------------------------------------------------------------------------------------------------#
+def vidbw_cxa(addr_cxa,vidbw_mode,vidbw):
+ if vidbw_mode == "AUTO":
+  WRITE(addr_cxa, ":BAND:VID:AUTO ON")
+  OPCQ(addr_cxa)
+ elif vidbw_mode == "MAN":
+  WRITE(addr_cxa, ":BAND:VID:AUTO OFF")
+  OPCQ(addr_cxa)
+  WRITE(addr_cxa, ":BAND:VID %s" %vidbw)
+  OPCQ(addr_cxa)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def mrkrmode_cxa(addr_cxa,mrkr,mode):
+ if mode == "NORMAL":
+  WRITE(addr_cxa, ":CALC:MARK%s:STAT ON" %mrkr)
+  OPCQ(addr_cxa)
+  WRITE(addr_cxa, ":CALC:MARK%s:MODE POS" %mrkr)
+  OPCQ(addr_cxa)
+ elif mode == "DELTA":
+  WRITE(addr_cxa, ":CALC:MARK%s:STAT ON" %mrkr)
+  OPCQ(addr_cxa)
+  WRITE(addr_cxa, ":CALC:MARK%s:MODE DELT" %mrkr)
+  OPCQ(addr_cxa)
+ elif mode == "BAND":
+  WRITE(addr_cxa, ":CALC:MARK%s:STAT ON" %mrkr)
+  OPCQ(addr_cxa)
+  WRITE(addr_cxa, ":CALC:MARK%s:MODE BAND" %mrkr)
+  OPCQ(addr_cxa)
+ elif mode == "SPAN":
+  WRITE(addr_cxa, ":CALC:MARK%s:STAT ON" %mrkr)
+  OPCQ(addr_cxa)
+  WRITE(addr_cxa, ":CALC:MARK%s:MODE SPAN" %mrkr)
+  OPCQ(addr_cxa)
+ elif mode == "OFF":
+  WRITE(addr_cxa, ":CALC:MARK%s:STAT OFF" %mrkr)
+  OPCQ(addr_cxa)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def freqcs_cxa(addr_cxa, centfreq, spanfreq):
+ sent = WRITE(addr_cxa, ":FREQ:CENT %s" %centfreq)
+ OPCQ(addr_cxa)
+ sent = sent + WRITE(addr_cxa, ":FREQ:SPAN %s" %spanfreq)
+ OPCQ(addr_cxa)
+ if sent:
+  SETTLE(addr_cxa)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def freqss_cxa(addr_cxa, starfreq, stopfreq):
+ sent = WRITE(addr_cxa, ":FREQ:STAR %s" %starfreq)
+ OPCQ(addr_cxa)
+ sent = sent + WRITE(addr_cxa, ":FREQ:STOP %s" %stopfreq)
+ OPCQ(addr_cxa)
+ if sent:
+  SETTLE(addr_cxa)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def maxhold_cxa(addr_cxa, state):
+ # The held trace restarts with each :INIT:IMM (see single_cxa)
+ if state == "ON":
+  WRITE(addr_cxa, ":TRAC1:TYPE MAXH")
+  OPCQ(addr_cxa)
+ elif state == "OFF":
+  WRITE(addr_cxa, ":TRAC1:TYPE WRIT")
+  OPCQ(addr_cxa)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def trigout_cxa(addr_cxa, state):
+ # Trigger 1 output, "HSWP" is high while sweeping so the falling edge marks the end of each sweep
+ if state == "HSWP":
+  WRITE(addr_cxa, ":TRIG1:OUTP HSWP")
+ elif state == "OFF":
+  WRITE(addr_cxa, ":TRIG1:OUTP OFF")
+ OPCQ(addr_cxa)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def sweeptime_cxa(addr_cxa):
+ addr_cxa.write(":SWE:TIME?")
+ return(str_strip(addr_cxa.read()))
+#-----------------------------------------------------------------------------------------------------------------------#
+def cont_cxa(addr_cxa, state):
+ WRITE(addr_cxa, ":INIT:CONT %s" %state)
+ OPCQ(addr_cxa)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def single_cxa(addr_cxa, count, progress=None):
+ # Runs count sweeps (trace averages or holds) as one acquisition and returns when they are complete
+ WRITE(addr_cxa, ":AVER:COUN %s" %count)
+ return(ACQUIRE(addr_cxa, count, progress))
+#-----------------------------------------------------------------------------------------------------------------------# 
+def mrkrpksrch_cxa(addr_cxa,mrkr,mode):
+ if mode == "PEAK":
+  WRITE(addr_cxa, ":CALC:MARK%s:MAX" %mrkr)
+  OPCQ(addr_cxa)
+ elif mode == "NEXT":
+  WRITE(addr_cxa, ":CALC:MARK%s:MAX:NEXT" %mrkr)
+  OPCQ(addr_cxa)
+ elif mode == "LEFT":
+  WRITE(addr_cxa, ":CALC:MARK%s:MAX:LEFT" %mrkr)
+  OPCQ(addr_cxa)
+ elif mode == "RIGHT":
+  WRITE(addr_cxa, ":CALC:MARK%s:MAX:RIGH" %mrkr)
+  OPCQ(addr_cxa)
+ elif mode == "MIN":
+  WRITE(addr_cxa, ":CALC:MARK%s:MIN" %mrkr)
+  OPCQ(addr_cxa)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def mrkrxoffset_cxa(addr_cxa,mrkr,offset):
+ WRITE(addr_cxa, ":CALC:MARK%s:X %s" %(mrkr, offset))
+ OPCQ(addr_cxa)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def xmrkrval_cxa(addr_cxa,mrkr):
+ addr_cxa.write(":CALC:MARK%s:X?" %mrkr)
+ xval = addr_cxa.read()
+ #Convert string to float
+ xval = str_strip(xval)	
+ return(xval)
+#-----------------------------------------------------------------------------------------------------------------------#
+def ymrkrval_cxa(addr_cxa,mrkr):
+ addr_cxa.write(":CALC:MARK%s:Y?" %mrkr)
+ yval = addr_cxa.read()
+ #Convert string to float
+ yval = str_strip(yval)	
+ return(yval)
+#-----------------------------------------------------------------------------------------------------------------------#
+def mrkrvals_cxa(addr_cxa,mrkrs):
+ # X and Y of every marker in mrkrs read with one compound query, as a numpy array with one (x, y) row per marker
+ values = QUERYVALS(addr_cxa, [":CALC:MARK%s:%s?" %(mrkr, axis) for mrkr in mrkrs for axis in ("X", "Y")])
+ return(values.reshape(-1, 2))
+#-----------------------------------------------------------------------------------------------------------------------#
+def peaks_cxa(addr_cxa,trace,threshold,excursion):
+ # Every peak of the trace above threshold (dBm) standing excursion (dB) above its surroundings, read from the
+ # analyser's peak list in one transfer, as a numpy array with one (frequency, amplitude) row per peak, highest first.
+ # The peak list follows :FORM, ASCII keeps the frequencies exact (trace_cxa leaves the analyser in REAL,32)
+ WRITE(addr_cxa, ":FORM ASC")
+ addr_cxa.write(":CALC:DATA%s:PEAK? %s,%s,AMPL,ALL" %(trace, threshold, excursion))
+ values = numpy.array([float(value) for value in strin_strout(addr_cxa.read()).split(",")])
+ count = int(values[0])
+ return(values[1:1 + 2*count].reshape(-1, 2)[:, ::-1].copy())
+#-----------------------------------------------------------------------------------------------------------------------#
+def mrkrcenfreq_cxa(addr_cxa,mrkr):
+ WRITE(addr_cxa, "CALC:MARK%s:FUNC:CENT" %mrkr)	
+ OPCQ(addr_cxa)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def mrkrreflev_(addr_cxa,mrkr):
+ WRITE(addr_cxa, "CALC:MARK%s:FUNC:REF" %mrkr)	
+ OPCQ(addr_cxa)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def freqssrd_cxa(addr_cxa):
+ addr_cxa.write(":FREQ:STAR?;:FREQ:STOP?")
+ (freqstart,freqstop) = strin_strout(addr_cxa.read()).split(";")
+ return(float(freqstart),float(freqstop))
+#-----------------------------------------------------------------------------------------------------------------------#
+def readtrace_cxa(addr_cxa, trace, fd, notes, store=None):
+ (safstart,safstop)=freqssrd_cxa(addr_cxa)
+ tracedata = trace_cxa(addr_cxa, trace)
+ csvf.fappn_trace(fd, safstart, safstop, tracedata, notes)
+ if store is not None: # columnar store written in parallel with the captures file
+  store.append_trace(safstart, safstop, tracedata, notes)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def trace_cxa(addr_cxa, trace):
+ # Trace amplitudes as a numpy float32 array, transferred as a little endian REAL,32 binary block
+ WRITE(addr_cxa, ":FORM REAL,32")
+ WRITE(addr_cxa, ":FORM:BORD SWAP")
+ addr_cxa.write(":TRAC:DATA? TRACE%s" %trace)
+ return(BLOCKREAD(addr_cxa, "<f4"))
+#-----------------------------------------------------------------------------------------------------------------------#
+def average_cxa(addr_cxa,state,count,type,progress=None):
+ # "ON" runs one averaged acquisition and returns when the analyser reports it complete, then goes back to continuous
+ # sweep (see RESUME) where the average carries on from the acquired one
+ if state == "OFF":
+  WRITE(addr_cxa, ":AVER OFF")
+  OPCQ(addr_cxa)
+ elif state == "ON":
+  WRITE(addr_cxa, ":AVER ON")
+  OPCQ(addr_cxa)
+  WRITE(addr_cxa, ":AVER:COUN %s" %count)
+  OPCQ(addr_cxa)
+  WRITE(addr_cxa, ":AVER:TYPE %s" %type)
+  OPCQ(addr_cxa)
+  try:
+   ACQUIRE(addr_cxa, count, progress)
+  finally:
+   RESUME(addr_cxa)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def avghost_cxa(addr_cxa,trace,count,type,progress=None):
+ # Trace averaged on the host over count single sweeps, type "LOG" (dB) or "RMS" (power), see HOSTAVERAGE
+ return(HOSTAVERAGE(addr_cxa, count, lambda addr: trace_cxa(addr, trace), type, progress))
+
+
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Purpose: Agilent Technologies E4438C ESG Vector Signal Generator Commands                                             #
+# Author: TJA													                                                                                 	#
+# Date: 28/08/2021	(last update): 28/08/2021												                                                   	#          
+# Revision: A 													                                                                                #
+# Status: development											                                                                          		#
+#-----------------------------------------------------------------------------------------------------------------------#
+def init_esg(addr_esg):
+ addr_esg.clear()
+ addr_esg.term_chars="\n"
+ RESET(addr_esg)
+ return(ID(addr_esg))
+#-----------------------------------------------------------------------------------------------------------------------#
+def output_esg(addr_esg, state):
+ if state == "ON":
+  WRITE(addr_esg, "OUTP:STAT ON")
+  OPCQ(addr_esg)
+ elif state == "OFF":
+  WRITE(addr_esg, "OUTP:STAT OFF")
+  OPCQ(addr_esg)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def freq_esg(addr_esg, freq):
+ WRITE(addr_esg, "FREQ %s Hz" %freq)
+ OPCQ(addr_esg)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def lev_esg(addr_esg, level):
+ WRITE(addr_esg, "POW %s dBm" %level)
+ OPCQ(addr_esg)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def listsweep_esg(addr_esg, freq_list, level, trigger, dwell):
+ # Loads freq_list (Hz) into the list sweep at a fixed level (dBm). trigger selects how the sweep steps to the next
+ # point: "EXT" on the rear panel trigger input (e.g. the analyser trigger output at the end of each sweep),
+ # "BUS" on *TRG, or "IMM" after dwell seconds on each point
+ with batch(addr_esg, maxlen=8192): # the list itself can be several kB and is sent as one command
+  WRITE(addr_esg, ":INIT:CONT OFF")
+  WRITE(addr_esg, ":LIST:TYPE LIST")
+  WRITE(addr_esg, ":LIST:FREQ %s" %",".join(["%s" %freq for freq in freq_list]))
+  WRITE(addr_esg, ":POW:MODE FIX")
+  WRITE(addr_esg, ":POW %s dBm" %level)
+  WRITE(addr_esg, ":LIST:DWEL %s" %dwell)
+  WRITE(addr_esg, ":LIST:DIR UP")
+  WRITE(addr_esg, ":TRIG:SOUR IMM") # sweep starts as soon as it is armed
+  WRITE(addr_esg, ":LIST:TRIG:SOUR %s" %trigger)
+  WRITE(addr_esg, ":TRIG:EXT:SLOP NEG") # step on the falling edge, i.e. at the end of the analyser sweep
+  WRITE(addr_esg, ":FREQ:MODE LIST")
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def listarm_esg(addr_esg):
+ # Arms a single pass through the list, starting at the first point. The pass is an overlapped operation which only
+ # completes once the last point has been stepped through, so there is no operation complete wait here
+ WRITE(addr_esg, ":INIT")
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def listoff_esg(addr_esg):
+ # Returns to CW operation, the CW frequency and level must be set again afterwards
+ WRITE(addr_esg, ":FREQ:MODE CW")
+ OPCQ(addr_esg)
+ return(0)
+
+
+
+
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Purpose: Agilent Technologies DSO6014A DSO Scope Commands                                                             #
+# Author: TJA													                                                                                 	#
+# Date: 28/08/2021	(last update): 28/08/2021											                                                     	#          
+# Revision: A 													                                                                                #
+# Status: development											                                                                          		#
+#-----------------------------------------------------------------------------------------------------------------------#
+def init_dso(addr_dso):
+ addr_dso.clear()
+ addr_dso.term_chars="\n"
+ RESET(addr_dso)
+ return(ID(addr_dso))
+                     
+
+
+
+
+
+
+#--------LEGACY DRIVERS BELOW THIS LINE---------------------------------------------------------------------------------#
+
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Purpose: String stripping function used to remove characters returned by Prologix GPIB to IP adapter 	                #
+# Author: TJA													                                                                                 	#
+# Date: 28/08/2021												                                                                             	#          
+# Revision: A 													                                                                                #
+# Status: development											                                                                          		#
+#-----------------------------------------------------------------------------------------------------------------------#
+def str_strip(string_in):  
+ string_in=str(string_in)
+ if string_in.startswith("b") == True: # Indicates Prologix GPIB to IP interface in use
+  string_in = string_in.lstrip("b")
+  string_in = string_in.strip("'")
+  num_out = float(string_in) 
+ elif string_in.startswith("V") == True: # Indicated TTi PL303-P Volts looks like: "V1 18.00"
+  num_out = float(string_in[3:])
+ elif string_in.endswith("A") == True: # Indicated TTi PL303-P Amps looks like: "0.915A"
+  num_out = float(string_in[:-2])
+ else:
+  num_out = float(string_in)
+ return(num_out)
+#-----------------------------------------------------------------------------------------------------------------------#
+def strin_strout(string_in):  
+ string_in=str(string_in)
+ if string_in.startswith("b") == True: # Indicates Prologix GPIB to IP interface in use
+  string_in = string_in.lstrip("b")
+  string_in = string_in.strip("'")
+  string_out = string_in 
+ else:
+  string_out = string_in
+ return(string_out)                             
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Purpose: Standard commands									                                                         	                #
+# Author: TJA													                                                                                 	#
+# Date: 28/08/2021												                                                                             	#          
+# Revision: A 													                                                                                #
+# Status: development											                                                                          		#
+#-----------------------------------------------------------------------------------------------------------------------#
+def OPCQ(addr):
+ if addr in batch_queue: # deferred until the batch is sent
+  return(0)
+ if addr in state_cache:
+  if opc_pending.get(addr, True) == False: # every write since the last operation complete was elided
+   return(0)
+  opc_pending[addr] = False
+ mode = opc_mode.get(addr, "POLL")
+ if mode == "SRQ":
+  return(OPC_SRQ(addr))
+ elif mode == "QUERY":
+  return(OPC_QUERY(addr))
+ #addr.term_chars="\n"
+ time.sleep(0.1)
+ timestore = time.time()
+ #10 second time out
+ timeout = timestore + opc_timeout
+ response = 0
+ while True:
+  addr.write("*OPC?")
+  timecurrent = time.time()
+  response = float(addr.read())
+  if response != 0 or timecurrent > timeout:
+    timediff = timecurrent - timestore
+    if response != 0: 
+     #print("Exiting...Response:%s received from *OPC?" %response)
+     #print("Time taken %s" %timediff)
+     break 
+    elif timecurrent > timeout:
+     #print("Exiting...Timeout %s" %timediff)
+     break 
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+# Operation complete handling, selected per instrument with OPCMODE(addr, mode)
+# POLL  - legacy behaviour, fixed 0.1s sleep then *OPC? polling (default for every instrument)
+# QUERY - a single *OPC? which the instrument only answers once all pending operations are complete
+# SRQ   - *OPC sets the OPC bit of the ESR, *ESE/*SRE route it to a service request and the VISA
+#         service request event is waited on, so no polling traffic is generated while the instrument is busy
+opc_mode = {}
+opc_timeout = 10 # seconds
+#-----------------------------------------------------------------------------------------------------------------------#
+def OPCMODE(addr, mode):
+ if mode == "SRQ":
+  try:
+   addr.enable_event(pyvisa.constants.EventType.service_request, pyvisa.constants.EventMechanism.queue)
+  except (pyvisa.errors.VisaIOError, AttributeError, NotImplementedError):
+   # Interface cannot deliver service requests (e.g. raw socket), fall back to a blocking *OPC? query
+   mode = "QUERY"
+  else:
+   SRQARM(addr)
+ if mode not in ("POLL", "QUERY", "SRQ"):
+  raise ValueError("OPC mode must be POLL, QUERY or SRQ")
+ if mode != "SRQ" and opc_mode.get(addr) == "SRQ":
+  addr.write("*SRE 0")
+  addr.disable_event(pyvisa.constants.EventType.service_request, pyvisa.constants.EventMechanism.queue)
+ opc_mode[addr] = mode
+ return(mode)
+#-----------------------------------------------------------------------------------------------------------------------#
+def SRQARM(addr):
+ # OPC is bit 0 of the event status register, ESB (bit 5, value 32) of the status byte requests service
+ addr.write("*ESE 1;*SRE 32")
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def OPC_QUERY(addr):
+ addr.write("*OPC?")
+ addr.read()
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def OPC_SRQ(addr):
+ addr.discard_events(pyvisa.constants.EventType.service_request, pyvisa.constants.EventMechanism.queue)
+ addr.write("*OPC")
+ response = addr.wait_on_event(pyvisa.constants.EventType.service_request, int(opc_timeout*1000), capture_timeout=True)
+ # Reading the status byte clears the request, reading the ESR clears the OPC bit ready for the next *OPC
+ addr.read_stb()
+ addr.write("*ESR?")
+ addr.read()
+ if response.timed_out:
+  #print("Exiting...Timeout waiting for SRQ")
+  return(1)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+# Settling after a spectrum analyser setting change, selected per instrument with SETTLEMODE(addr, mode)
+# FIXED - legacy behaviour, a fixed sleep (default for every instrument)
+# SWEEP - the analyser is put in single sweep and one fresh sweep is triggered with :INIT:IMM;*OPC?, so the wait is
+#         exactly one sweep whatever the span, RBW and VBW. The sweep time is queried once and cached until a command
+#         changing it (sweep_coupling, matched on the cache key of every header, see CACHEKEY) is written with WRITE
+settle_mode = {}
+sweep_time = {}
+sweep_coupling = ("FREQ:SPAN", "FREQ:STAR", "FREQ:STOP", "BAND", "SWE:", "*RST", "*RCL", "SYST:PRES")
+#-----------------------------------------------------------------------------------------------------------------------#
+def SETTLEMODE(addr, mode):
+ if mode not in ("FIXED", "SWEEP"):
+  raise ValueError("Settle mode must be FIXED or SWEEP")
+ if mode == "FIXED" and settle_mode.get(addr) == "SWEEP": # back to continuous sweep
+  WRITE(addr, ":INIT:CONT ON")
+  OPCQ(addr)
+ settle_mode[addr] = mode
+ return(mode)
+#-----------------------------------------------------------------------------------------------------------------------#
+def SWEEPTIME(addr):
+ # Sweep time in seconds, queried from the analyser only when the configuration has changed
+ if addr not in sweep_time:
+  addr.write(":SWE:TIME?")
+  sweep_time[addr] = str_strip(addr.read())
+ return(sweep_time[addr])
+#-----------------------------------------------------------------------------------------------------------------------#
+def SETTLE(addr, delay=0.2):
+ # Waits until the analyser display reflects the current settings, delay is the FIXED mode sleep in seconds
+ if settle_mode.get(addr, "FIXED") == "FIXED":
+  time.sleep(delay)
+  return(0)
+ WRITE(addr, ":INIT:CONT OFF") # elided by the state cache when already in single sweep
+ timeout = addr.timeout
+ addr.timeout = int((SWEEPTIME(addr) + opc_timeout) * 1000)
+ try:
+  addr.write(":INIT:IMM;*OPC?")
+  addr.read()
+ finally:
+  addr.timeout = timeout
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def ACQUIRE(addr, count, progress=None):
+ # Runs one single sweep acquisition of count sweeps (averages or holds) and returns once the analyser reports it
+ # complete, 1 if it timed out. progress(done, count) is called about once a sweep with the number of sweeps done
+ # estimated from the sweep time, and with (count, count) on completion. The analyser is left in single sweep so the
+ # acquisition can be read, the caller puts it back in continuous sweep with RESUME once it is done with it
+ WRITE(addr, ":INIT:CONT OFF")
+ OPCQ(addr)
+ sweeptime = SWEEPTIME(addr)
+ timeout = (sweeptime + 0.1) * count + opc_timeout
+ if progress is None:
+  visa_timeout = addr.timeout
+  addr.timeout = int(timeout * 1000)
+  try:
+   addr.write(":INIT:IMM;*OPC?")
+   addr.read()
+  finally:
+   addr.timeout = visa_timeout
+  return(0)
+ interval = max(sweeptime, 0.05) # seconds between progress reports
+ srq = opc_mode.get(addr) == "SRQ"
+ if srq:
+  addr.discard_events(pyvisa.constants.EventType.service_request, pyvisa.constants.EventMechanism.queue)
+ else:
+  addr.write("*ESR?") # clears an OPC bit left over from an earlier *OPC
+  addr.read()
+ timestore = time.time()
+ addr.write(":INIT:IMM;*OPC")
+ while True:
+  if srq:
+   response = addr.wait_on_event(pyvisa.constants.EventType.service_request, int(interval*1000), capture_timeout=True)
+   complete = not response.timed_out
+   if complete:
+    addr.read_stb()
+    addr.write("*ESR?")
+    addr.read()
+  else:
+   time.sleep(interval)
+   addr.write("*ESR?")
+   complete = int(str_strip(addr.read())) & 1
+  elapsed = time.time() - timestore
+  if complete:
+   progress(count, count)
+   return(0)
+  if elapsed > timeout:
+   #print("Exiting...Timeout waiting for the acquisition")
+   return(1)
+  progress(min(int(elapsed / sweeptime), count - 1), count)
+#-----------------------------------------------------------------------------------------------------------------------#
+def RESUME(addr):
+ # Back to continuous sweep after a single sweep acquisition has been read, unless SETTLEMODE SWEEP keeps the analyser
+ # in single sweep
+ if settle_mode.get(addr, "FIXED") == "SWEEP":
+  return(0)
+ WRITE(addr, ":INIT:CONT ON")
+ OPCQ(addr)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def HOSTAVERAGE(addr, count, read, type="LOG", progress=None):
+ # Averages count fast single sweeps on the host with a running (Welford) mean, read(addr) returns the trace (or a
+ # single value) of a sweep in dB. Type "LOG" or "VID" averages the dB values, as the analyser does with log power
+ # averaging, any other type ("RMS", "POW") averages the power and returns it in dB. The analyser's own averaging is
+ # turned off. progress(done, count) is called after each sweep, the analyser goes back to continuous sweep at the end
+ WRITE(addr, ":AVER OFF")
+ OPCQ(addr)
+ mean = 0.0
+ try:
+  for done in range(1, count + 1):
+   ACQUIRE(addr, 1)
+   value = numpy.asarray(read(addr), dtype=numpy.float64)
+   if type not in ("LOG", "VID"):
+    value = numpy.power(10.0, value / 10)
+   mean = mean + (value - mean) / done
+   if progress is not None:
+    progress(done, count)
+ finally:
+  RESUME(addr)
+ if type not in ("LOG", "VID"):
+  mean = 10 * numpy.log10(mean)
+ return(mean)
+#-----------------------------------------------------------------------------------------------------------------------#
+# Command coalescing, commands written with WRITE inside "with batch(addr):" are queued and sent joined with ";"
+# in as few transport writes as the instrument input buffer allows, followed by a single operation complete
+batch_queue = {}
+batch_maxlen = 256 # bytes per transport write, conservative default for the instrument input buffers
+#-----------------------------------------------------------------------------------------------------------------------#
+# Write-elision state cache, enabled per instrument with CACHE(addr, "ON"). Setting commands written with WRITE are
+# remembered by SCPI header and are not resent while the instrument is known to already hold the same value
+state_cache = {}
+cache_stats = {}
+opc_pending = {}
+# Writing a header on the left makes the cached values of the headers on the right unknown, "#" stands for the
+# marker or trace number. Parent and child headers (e.g. POW:ATT and POW:ATT:AUTO) are always coupled.
+cache_coupling = {
+ "FREQ:CENT": ("FREQ:STAR", "FREQ:STOP"),
+ "FREQ:SPAN": ("FREQ:STAR", "FREQ:STOP"),
+ "FREQ:STAR": ("FREQ:CENT", "FREQ:SPAN"),
+ "FREQ:STOP": ("FREQ:CENT", "FREQ:SPAN"),
+ "CALC:MARK#:STAT": ("CALC:MARK#:X",),
+ "CALC:MARK#:MODE": ("CALC:MARK#:X",),
+ "CALC:MARK#:MAX": ("CALC:MARK#:X",),
+ "CALC:MARK#:MAX:NEXT": ("CALC:MARK#:X",),
+ "CALC:MARK#:MAX:LEFT": ("CALC:MARK#:X",),
+ "CALC:MARK#:MAX:RIGH": ("CALC:MARK#:X",),
+ "CALC:MARK#:MIN": ("CALC:MARK#:X",),
+ "CALC:MARK#:FUNC:CENT": ("FREQ:",),
+ "CALC:MARK#:FUNC:REF": ("DISP:WIND:TRAC:Y:RLEV",),
+}
+# Commands which change the whole instrument state
+cache_reset = ("*RST", "*RCL", "SYST:PRES")
+# Headers are cached under one key per SCPI node whichever way they are spelt (see CACHEKEY): mnemonics in short form,
+# the default suffix 1 and the optional root nodes dropped, the optional nodes below on the right dropped after the
+# path on the left, and the synonyms replaced, e.g. ":SOURce:FREQuency:CW" and "FREQ" are both "FREQ"
+cache_roots = ("SOUR", "SENS")
+cache_optional = {
+ "OUTP": ("STAT",),
+ "OUTP:MOD": ("STAT",),
+ "INIT": ("IMM",),
+ "FREQ": ("CW", "FIX"),
+ "POW": ("LEV", "IMM", "AMPL"),
+ "AVER": ("STAT",),
+ "DISP:WIND:TRAC:Y": ("SCAL",),
+}
+cache_synonyms = {"BWID": "BAND"}
+#-----------------------------------------------------------------------------------------------------------------------#
+def CACHE(addr, state):
+ if state == "ON":
+  state_cache.setdefault(addr, {})
+  cache_stats.setdefault(addr, {"hits": 0, "misses": 0})
+ elif state == "OFF":
+  state_cache.pop(addr, None)
+  opc_pending.pop(addr, None)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def DIRTY(addr, header=None):
+ # Mark the cached value of a header (and its children) or of every header as unknown, e.g. after front panel use
+ if header is None:
+  sweep_time.pop(addr, None)
+ cache = state_cache.get(addr)
+ if cache is not None:
+  if header is None:
+   cache.clear()
+  else:
+   header = CACHEKEY(header)
+   for key in list(cache):
+    if key == header or key.startswith(header + ":"):
+     del cache[key]
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def CACHESTATS(addr):
+ stats = cache_stats.get(addr, {"hits": 0, "misses": 0})
+ return(stats["hits"], stats["misses"])
+#-----------------------------------------------------------------------------------------------------------------------#
+def SAVESTATE(addr):
+ # What is known of the instrument's settings (state cache, sweep time), e.g. for the rig daemon to hand on to the
+ # next script using the instrument (see rigd.py)
+ state = {"sweep_time": sweep_time.get(addr), "state_cache": None}
+ if addr in state_cache:
+  state["state_cache"] = dict(state_cache[addr])
+ return(state)
+#-----------------------------------------------------------------------------------------------------------------------#
+def LOADSTATE(addr, state):
+ # Restores SAVESTATE, the cached settings only if the cache is on for addr (the OPC and settle modes are left as set)
+ if state.get("sweep_time") is not None:
+  sweep_time[addr] = state["sweep_time"]
+ if addr in state_cache and state.get("state_cache") is not None:
+  state_cache[addr] = dict(state["state_cache"])
+  opc_pending[addr] = False
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def CACHEKEY(header):
+ # Cache key of a header resolved to the root of the SCPI tree, e.g. "OUTPut:STATe" -> "OUTP",
+ # "SENSe:BANDwidth:RESolution" -> "BAND:RES", "CALC:MARKER1:X" -> "CALC:MARK:X". Common commands are returned as given
+ header = header.upper().lstrip(":")
+ if header.startswith("*"):
+  return(header)
+ query = "?" if header.endswith("?") else ""
+ nodes = []
+ for mnemonic in header.rstrip("?").split(":"):
+  (name, suffix) = re.fullmatch("(.*?)([0-9]*)", mnemonic).groups()
+  if len(name) > 4: # short form, the first four characters or three if the fourth is a vowel
+   name = name[:3] if name[3] in "AEIOU" else name[:4]
+  name = cache_synonyms.get(name, name)
+  if suffix == "1":
+   suffix = ""
+  if len(nodes) == 0 and name in cache_roots:
+   continue
+  if name in cache_optional.get(":".join(nodes), ()) and suffix == "":
+   continue
+  nodes.append(name + suffix)
+ return(":".join(nodes) + query)
+#-----------------------------------------------------------------------------------------------------------------------#
+def CACHEHEADERS(cmd):
+ # Cache keys (CACHEKEY) of the commands of a compound message resolved to the root of the SCPI tree, e.g.
+ # ":RFLV:UNITS DBM;TYPE PD" -> ["RFLV:UNITS", "RFLV:TYPE"]
+ headers = []
+ path = []
+ for command in cmd.split(";"):
+  fields = command.strip().split(None, 1)
+  if len(fields) == 0:
+   continue
+  header = fields[0].upper()
+  if header.startswith("*"):
+   headers.append(header)
+   continue
+  if not header.startswith(":") and path:
+   header = ":".join(path + [header])
+  header = header.lstrip(":")
+  path = header.split(":")[:-1]
+  headers.append(CACHEKEY(header))
+ return(headers)
+#-----------------------------------------------------------------------------------------------------------------------#
+def CACHEINVALIDATE(cache, header):
+ # Forgets the cached value of header (a cache key), its parents and children and the headers coupled to it. "#" in
+ # cache_coupling matches the marker or trace number, empty for the default 1
+ coupled = []
+ for (pattern, keys) in cache_coupling.items():
+  match = re.fullmatch(re.escape(pattern).replace("\\#", "([0-9]*)"), header)
+  if match is not None:
+   number = match.group(1) if match.groups() else ""
+   coupled.extend([key.replace("#", number) for key in keys])
+ for key in list(cache):
+  if key.startswith(header + ":") or header.startswith(key + ":") or key.startswith(tuple(coupled)):
+   del cache[key]
+ cache.pop(header, None)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def CACHEUPDATE(addr, cmd):
+ # Returns True if the instrument already holds the setting in cmd, otherwise records it and returns False
+ cache = state_cache[addr]
+ fields = cmd.strip().split(None, 1)
+ if len(fields) == 0:
+  return(False)
+ if ";" in cmd: # compound message, never elided, forget what each of its commands may have changed
+  cache_stats[addr]["misses"] = cache_stats[addr]["misses"] + 1
+  for header in CACHEHEADERS(cmd):
+   if header.startswith(cache_reset):
+    cache.clear()
+   elif not header.startswith("*") and not header.endswith("?"):
+    CACHEINVALIDATE(cache, header)
+  return(False)
+ header = CACHEKEY(fields[0])
+ if header.startswith(cache_reset):
+  cache.clear()
+  return(False)
+ if header.startswith("*") or header.endswith("?"):
+  return(False)
+ if len(fields) == 2:
+  value = fields[1].strip()
+  if cache.get(header) == value:
+   cache_stats[addr]["hits"] = cache_stats[addr]["hits"] + 1
+   return(True)
+ else:
+  value = None # an action such as a peak search, never elided
+ cache_stats[addr]["misses"] = cache_stats[addr]["misses"] + 1
+ CACHEINVALIDATE(cache, header)
+ if value is not None:
+  cache[header] = value
+ return(False)
+#-----------------------------------------------------------------------------------------------------------------------#
+def WRITE(addr, cmd):
+ # Returns 1 if the command was sent (or queued in a batch), 0 if it was elided by the state cache
+ if addr in state_cache:
+  if CACHEUPDATE(addr, cmd):
+   return(0)
+  opc_pending[addr] = True
+ if addr in sweep_time and any([header.startswith(sweep_coupling) for header in CACHEHEADERS(cmd)]):
+  del sweep_time[addr]
+ queue = batch_queue.get(addr)
+ if queue is not None:
+  queue.append(cmd)
+ else:
+  addr.write(cmd)
+ return(1)
+#-----------------------------------------------------------------------------------------------------------------------#
+@contextlib.contextmanager
+def batch(addr, maxlen=None, root=":"):
+ # root is prefixed to commands that do not already start at the root of the SCPI tree so the
+ # header path of the previous command in the compound message does not apply, use "" for non-SCPI instruments
+ if addr in batch_queue: # nested batch, commands join the outer batch
+  yield addr
+  return
+ batch_queue[addr] = []
+ try:
+  try:
+   yield addr
+  finally:
+   cmds = batch_queue.pop(addr) # queued commands are discarded if the batch body raises
+  for message in JOIN(cmds, maxlen or batch_maxlen, root):
+   addr.write(message)
+ except BaseException:
+  # the settings queued were recorded in the state cache when written but may never have reached the instrument
+  DIRTY(addr)
+  raise
+ if cmds:
+  OPCQ(addr)
+#-----------------------------------------------------------------------------------------------------------------------#
+def JOIN(cmds, maxlen, root):
+ messages = []
+ message = ""
+ for cmd in cmds:
+  if root != "" and not cmd.startswith((root, "*")):
+   cmd = root + cmd
+  if message == "":
+   message = cmd
+  elif len(message) + 1 + len(cmd) > maxlen:
+   messages.append(message)
+   message = cmd
+  else:
+   message = message + ";" + cmd
+ if message != "":
+  messages.append(message)
+ return(messages)
+#-----------------------------------------------------------------------------------------------------------------------#
+def BLOCKREAD(addr, dtype):
+ # Reads an IEEE 488.2 definite length block (#<n><length><data><LF>) in a single read of the data and wraps the
+ # receive buffer in a numpy array without copying it
+ header = addr.read_bytes(2)
+ if header[0:1] != b"#" or header[1:2] == b"0":
+  raise ValueError("Expected an IEEE 488.2 definite length block, received %s" %header)
+ length = int(addr.read_bytes(int(header[1:2])))
+ data = addr.read_bytes(length + 1) # data and the terminating line feed
+ return(numpy.frombuffer(data, dtype=dtype, count=length//numpy.dtype(dtype).itemsize))
+#-----------------------------------------------------------------------------------------------------------------------#
+def QUERYVALS(addr, queries):
+ # Sends the queries joined into as few compound messages as the input buffer allows (one round trip each) and
+ # returns the numeric replies as a numpy array
+ values = []
+ for message in JOIN(queries, batch_maxlen, ":"):
+  addr.write(message)
+  values.extend(strin_strout(addr.read()).split(";"))
+ return(numpy.array([float(value) for value in values]))
+#-----------------------------------------------------------------------------------------------------------------------#
+# Configuration snapshots, enabled per instrument with SNAPSHOTREGS(addr, registers). SNAPSHOT(addr, apply, args...)
+# runs apply(addr, args...) the first time and saves the instrument state it leaves in a save/recall register (*SAV n),
+# later calls with the same function and arguments recall it (*RCL n) in one command. A hash of each configuration
+# saved is recorded against the instrument's *IDN? reply in snapshot_path, so the registers are reused run after run
+# (only kept in memory if its directory does not exist). *RCL restores the whole saved state, not just the settings
+# apply writes, so snapshot configurations applied from a known state (e.g. after init) and set anything else
+# (frequency, level) afterwards. SNAPSHOTCLEAR(addr) forgets the registers, e.g. after a save from the front panel.
+snapshot_path = dirpath + 'vlc_rig/snapshots.json'
+snapshot_registers = {}
+snapshot_idn = {}
+snapshots = {"registry": None} # *IDN? reply -> register -> hash, function name, last use and state cache
+snapshot_lock = threading.RLock() # INITALL runs the init functions on their own threads
+#-----------------------------------------------------------------------------------------------------------------------#
+def SNAPSHOTREGS(addr, registers):
+ # Save/recall registers SNAPSHOT may use on the instrument (least recently used overwritten), e.g. range(1, 10),
+ # None to apply configurations command by command again
+ if registers is None:
+  snapshot_registers.pop(addr, None)
+ else:
+  snapshot_registers[addr] = [int(register) for register in registers]
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def SNAPSHOTCODE(code):
+ # Bytecode, names and constants of a function, those of the functions defined inside it included, so editing the
+ # function body changes the hash of its configurations
+ consts = [SNAPSHOTCODE(const) if hasattr(const, "co_code") else repr(const) for const in code.co_consts]
+ return([code.co_code.hex(), list(code.co_names), consts])
+#-----------------------------------------------------------------------------------------------------------------------#
+def SNAPSHOTHASH(apply, args, kwargs):
+ code = SNAPSHOTCODE(apply.__code__) if hasattr(apply, "__code__") else None
+ config = json.dumps([apply.__module__, apply.__name__, code, list(args), kwargs], sort_keys=True, default=repr)
+ return(hashlib.sha256(config.encode()).hexdigest())
+#-----------------------------------------------------------------------------------------------------------------------#
+def SNAPSHOTDB(addr):
+ # Registers saved on the instrument, loading the registry the first time
+ if addr not in snapshot_idn:
+  snapshot_idn[addr] = ID(addr)
+ with snapshot_lock:
+  if snapshots["registry"] is None:
+   registry = {}
+   if os.path.exists(snapshot_path):
+    with open(snapshot_path) as snapshot_file:
+     registry = json.load(snapshot_file)
+   snapshots["registry"] = registry
+  return(snapshots["registry"].setdefault(snapshot_idn[addr], {}))
+#-----------------------------------------------------------------------------------------------------------------------#
+def SNAPSHOTWRITE():
+ with snapshot_lock:
+  if os.path.isdir(os.path.dirname(snapshot_path)):
+   with open(snapshot_path + ".tmp", 'w') as snapshot_file:
+    json.dump(snapshots["registry"], snapshot_file, indent=1)
+   os.replace(snapshot_path + ".tmp", snapshot_path)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def SNAPSHOT(addr, apply, *args, **kwargs):
+ # Returns 1 if the configuration was recalled, 0 if it was applied (and saved if snapshots are enabled for addr)
+ registers = snapshot_registers.get(addr)
+ if not registers:
+  apply(addr, *args, **kwargs)
+  return(0)
+ saved = SNAPSHOTDB(addr)
+ digest = SNAPSHOTHASH(apply, args, kwargs)
+ # the registry is shared with the other instruments' threads, the lock is not held while talking to the instrument
+ with snapshot_lock:
+  recall = [register for register in registers if saved.get(str(register), {}).get("hash") == digest]
+  entry = saved.get(str(recall[0])) if recall else None
+ if entry is not None:
+  WRITE(addr, "*RCL %d" %recall[0])
+  OPCQ(addr)
+  # the cache holds what it held when the state was saved
+  if addr in state_cache and entry.get("state_cache") is not None:
+   state_cache[addr] = dict(entry["state_cache"])
+  with snapshot_lock:
+   entry["used"] = time.time()
+   SNAPSHOTWRITE()
+  return(1)
+ apply(addr, *args, **kwargs)
+ with snapshot_lock:
+  free = [register for register in registers if str(register) not in saved]
+  if free:
+   register = free[0]
+  else:
+   register = min(registers, key=lambda register: saved[str(register)]["used"])
+ WRITE(addr, "*SAV %d" %register)
+ OPCQ(addr)
+ with snapshot_lock:
+  saved[str(register)] = {"hash": digest, "name": apply.__name__, "used": time.time(),
+                          "state_cache": SAVESTATE(addr)["state_cache"]}
+  SNAPSHOTWRITE()
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def SNAPSHOTCLEAR(addr):
+ saved = SNAPSHOTDB(addr)
+ with snapshot_lock:
+  saved.clear()
+  SNAPSHOTWRITE()
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def RESET(addr):
+ time.sleep(0.25)
+ WRITE(addr, "*RST")
+ CLS(addr)
+ if opc_mode.get(addr) == "SRQ":
+  SRQARM(addr)
+ OPCQ(addr)
+ return(0) 
+#-----------------------------------------------------------------------------------------------------------------------#
+def ID(addr):
+ addr.write("*IDN?")
+ response = strin_strout(addr.read())
+ return(response)  
+#-----------------------------------------------------------------------------------------------------------------------#
+def INITALL(rm, rig, prepare=None):
+ # Opens and initialises every instrument of the rig concurrently, so start up takes as long as the slowest instrument
+ # rather than the sum of them. rig is a list of (name, resource string, init function), e.g.
+ #  ("spec_an", "TCPIP0::10.42.0.90::inst0::INSTR", init_cxa). prepare(name, addr) is called after the resource is
+ # opened and before the init function, e.g. to set OPCMODE and CACHE. Returns a dict of name to (addr, *IDN? reply,
+ # init time in s). If any instrument fails the others are closed and the first error is raised.
+ def bringup(name, resource, init):
+  timestore = time.perf_counter()
+  addr = rm.open_resource(resource)
+  try:
+   if prepare is not None:
+    prepare(name, addr)
+   idn = init(addr)
+  except BaseException:
+   addr.close()
+   raise
+  return(addr, idn, time.perf_counter() - timestore)
+
+ with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(rig), 1)) as pool:
+  futures = [(name, pool.submit(bringup, name, resource, init)) for (name, resource, init) in rig]
+  concurrent.futures.wait([future for (name, future) in futures])
+ errors = [future.exception() for (name, future) in futures if future.exception() is not None]
+ if errors:
+  for (name, future) in futures:
+   if future.exception() is None:
+    future.result()[0].close()
+  raise errors[0]
+ return({name: future.result() for (name, future) in futures})
+#-----------------------------------------------------------------------------------------------------------------------#
+def CLS(addr):
+ addr.write("*CLS")
+ time.sleep(1)
+ return(0) 
+#-----------------------------------------------------------------------------------------------------------------------#
+def DCL(addr):
+ addr.write("DCL")
+ return(0) 
+#-----------------------------------------------------------------------------------------------------------------------#
+def STBQ(addr):
+  addr.write("*STB?")
+  response = addr.read()
+  return(response) 
+ 
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Purpose: R&S FSP spectrum analyser commands									                                                         	#
+# Author: TJA													                                                                                 	#
+# Date: 21/08/2021												                                                                             	#
+# Revision: A 													                                                                                #
+# Status: development											                                                                          		#
+#-----------------------------------------------------------------------------------------------------------------------#
+def init_fsp(addr_fsp):
+ #addr_fsp.clear()
+ addr_fsp.term_chars="\n"
+ RESET(addr_fsp)
+ WRITE(addr_fsp, "SYSTem:DISPlay:UPDate ON")
+ return(ID(addr_fsp))
+#-----------------------------------------------------------------------------------------------------------------------#
+def freqss_fsp(addr_fsp, starfreq, stopfreq):
+ sent = WRITE(addr_fsp, ":FREQ:STAR %s" %starfreq)
+ OPCQ(addr_fsp)
+ sent = sent + WRITE(addr_fsp, ":FREQ:STOP %s" %stopfreq)
+ OPCQ(addr_fsp)
+ if sent:
+  SETTLE(addr_fsp)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def freqssrd_fsp(addr_fsp):
+ addr_fsp.write(":FREQ:STAR?;:FREQ:STOP?")
+ (freqstart,freqstop) = strin_strout(addr_fsp.read()).split(";")
+ return(float(freqstart),float(freqstop))
+#-----------------------------------------------------------------------------------------------------------------------#
+def freqcs_fsp(addr_fsp, centfreq, spanfreq):
+ sent = WRITE(addr_fsp, ":FREQ:CENT %s" %centfreq)
+ OPCQ(addr_fsp)
+ sent = sent + WRITE(addr_fsp, ":FREQ:SPAN %s" %spanfreq)
+ OPCQ(addr_fsp)
+ if sent:
+  SETTLE(addr_fsp)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def freqspan_fsp(addr_fsp, spanfreq):
+ WRITE(addr_fsp, ":FREQ:SPAN %s" %spanfreq)
+ OPCQ(addr_fsp)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def reflev_fsp(addr_fsp, reflev):
+ sent = WRITE(addr_fsp, ":DISP:WIND:TRAC:Y:RLEV %s" %reflev)
+ OPCQ(addr_fsp)
+ if sent:
+  SETTLE(addr_fsp)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------# 
+def reflevrd_fsp(addr_fsp):
+ addr_fsp.write(":DISP:WIND:TRAC:Y:RLEV?")
+ response = str_strip(addr_fsp.read())
+ return(response) 
+#-----------------------------------------------------------------------------------------------------------------------#
+def atten_fsp(addr_fsp,atten_mode,atten):
+ if atten_mode == "AUTO":
+  WRITE(addr_fsp, ":POW:ATT:AUTO ON")
+  OPCQ(addr_fsp)
+ elif atten_mode == "MAN":
+  WRITE(addr_fsp, ":POW:ATT:AUTO OFF")
+  OPCQ(addr_fsp)
+  WRITE(addr_fsp, ":POW:ATT %s" %atten)
+  OPCQ(addr_fsp)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def preamp_fsp(addr_fsp,preamp_mode):
+ if preamp_mode == "OFF":
+  WRITE(addr_fsp, ":POW:GAIN OFF")
+  OPCQ(addr_fsp)
+ elif preamp_mode == "ON":
+  WRITE(addr_fsp, ":POW:GAIN ON")
+  OPCQ(addr_fsp)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def resbw_fsp(addr_fsp,resbw_mode,resbw):
+ if resbw_mode == "AUTO":
+  WRITE(addr_fsp, ":BAND:RES:AUTO ON")
+  OPCQ(addr_fsp)
+ elif resbw_mode == "MAN":
+  WRITE(addr_fsp, ":BAND:RES:AUTO OFF")
+  OPCQ(addr_fsp)
+  WRITE(addr_fsp, ":BAND:RES %s" %resbw)
+  OPCQ(addr_fsp)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def resbwrd_fsp(addr_fsp):
+ addr_fsp.write(":BAND:RES?")
+ return(str_strip(addr_fsp.read()))
+#-----------------------------------------------------------------------------------------------------------------------#
+def vidbw_fsp(addr_fsp,vidbw_mode,vidbw):
+ if vidbw_mode == "AUTO":
+  WRITE(addr_fsp, ":BAND:VID:AUTO ON")
+  OPCQ(addr_fsp)
+ elif vidbw_mode == "MAN":
+  WRITE(addr_fsp, ":BAND:VID:AUTO OFF")
+  OPCQ(addr_fsp)
+  WRITE(addr_fsp, ":BAND:VID %s" %vidbw)
+  OPCQ(addr_fsp)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def swpmode_fsp(addr_fsp,swp_mode):
+ if swp_mode == "CONT":
+  WRITE(addr_fsp, ":INIT:CONT ON")
+  OPCQ(addr_fsp)
+ elif swp_mode == "SINGLE":
+  WRITE(addr_fsp, ":INIT:CONT OFF")
+  OPCQ(addr_fsp)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def average_fsp(addr_fsp,state,count,type,progress=None):
+ # "ON" runs one averaged acquisition and returns when the analyser reports it complete, then goes back to continuous
+ # sweep (see RESUME) where the average carries on from the acquired one
+ if state == "OFF":
+  WRITE(addr_fsp, ":AVER OFF")
+  OPCQ(addr_fsp)
+ elif state == "ON":
+  WRITE(addr_fsp, ":AVER ON")
+  OPCQ(addr_fsp)
+  WRITE(addr_fsp, ":AVER:COUN %s" %count)
+  OPCQ(addr_fsp)
+  WRITE(addr_fsp, ":AVER:TYPE %s" %type)
+  OPCQ(addr_fsp)
+  try:
+   ACQUIRE(addr_fsp, count, progress)
+  finally:
+   RESUME(addr_fsp)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def avghost_fsp(addr_fsp,trace,count,type,progress=None):
+ # Trace averaged on the host over count single sweeps, type "VID" (dB) or "POW" (power), see HOSTAVERAGE
+ return(HOSTAVERAGE(addr_fsp, count, lambda addr: trace_fsp(addr, trace), type, progress))
+#-----------------------------------------------------------------------------------------------------------------------#
+def mrkrmode_fsp(addr_fsp,mrkr,mode):
+ if mode == "NORMAL":
+  WRITE(addr_fsp, ":CALC:MARK%s:STAT ON" %mrkr)
+  OPCQ(addr_fsp)
+  WRITE(addr_fsp, ":CALC:MARK%s:MODE POS" %mrkr)
+  OPCQ(addr_fsp)
+ elif mode == "DELTA":
+  WRITE(addr_fsp, ":CALC:MARK%s:STAT ON" %mrkr)
+  OPCQ(addr_fsp)
+  WRITE(addr_fsp, ":CALC:MARK%s:MODE DELT" %mrkr)
+  OPCQ(addr_fsp)
+ elif mode == "BAND":
+  WRITE(addr_fsp, ":CALC:MARK%s:STAT ON" %mrkr)
+  OPCQ(addr_fsp)
+  WRITE(addr_fsp, ":CALC:MARK%s:MODE BAND" %mrkr)
+  OPCQ(addr_fsp)
+ elif mode == "SPAN":
+  WRITE(addr_fsp, ":CALC:MARK%s:STAT ON" %mrkr)
+  OPCQ(addr_fsp)
+  WRITE(addr_fsp, ":CALC:MARK%s:MODE SPAN" %mrkr)
+  OPCQ(addr_fsp)
+ elif mode == "OFF":
+  WRITE(addr_fsp, ":CALC:MARK%s:STAT OFF" %mrkr)
+  OPCQ(addr_fsp)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def mrknoise_fsp(addr_fsp,mrkr,state):
+ WRITE(addr_fsp, ":CALC:MARK%s:FUNC:NOIS:STAT %s" %(mrkr,state))
+ OPCQ(addr_fsp)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------# 
+def mrknoiserd_fsp(addr_fsp,mrkr):
+ addr_fsp.write(":CALC:MARK%s:FUNC:NOIS:RES?" %mrkr)
+ xnoiseval = addr_fsp.read()
+ #Convert string to float
+ xnoiseval = str_strip(xnoiseval)
+ return(xnoiseval) 
+#-----------------------------------------------------------------------------------------------------------------------#
+def mrkrpksrch_fsp(addr_fsp,mrkr,mode):
+ if mode == "PEAK":
+  WRITE(addr_fsp, ":CALC:MARK%s:MAX" %mrkr)
+  OPCQ(addr_fsp)
+ elif mode == "NEXT":
+  WRITE(addr_fsp, ":CALC:MARK%s:MAX:NEXT" %mrkr)
+  OPCQ(addr_fsp)
+ elif mode == "LEFT":
+  WRITE(addr_fsp, ":CALC:MARK%s:MAX:LEFT" %mrkr)
+  OPCQ(addr_fsp)
+ elif mode == "RIGHT":
+  WRITE(addr_fsp, ":CALC:MARK%s:MAX:RIGH" %mrkr)
+  OPCQ(addr_fsp)
+ elif mode == "MIN":
+  WRITE(addr_fsp, ":CALC:MARK%s:MIN" %mrkr)
+  OPCQ(addr_fsp)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def mrkrxoffset_fsp(addr_fsp,mrkr,offset):
+ WRITE(addr_fsp, ":CALC:MARK%s:X %s" %(mrkr, offset))
+ OPCQ(addr_fsp)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def xmrkrval_fsp(addr_fsp,mrkr):
+ addr_fsp.write(":CALC:MARK%s:X?" %mrkr)
+ xval = addr_fsp.read()
+ #Convert string to float
+ xval = str_strip(xval)	
+ return(xval)
+#-----------------------------------------------------------------------------------------------------------------------#
+def ymrkrval_fsp(addr_fsp,mrkr):
+ addr_fsp.write(":CALC:MARK%s:Y?" %mrkr)
+ yval = addr_fsp.read()
+ #Convert string to float
+ yval = str_strip(yval)	
+ return(yval)
+#-----------------------------------------------------------------------------------------------------------------------#
+def mrkrvals_fsp(addr_fsp,mrkrs):
+ # X and Y of every marker in mrkrs read with one compound query, as a numpy array with one (x, y) row per marker
+ values = QUERYVALS(addr_fsp, [":CALC:MARK%s:%s?" %(mrkr, axis) for mrkr in mrkrs for axis in ("X", "Y")])
+ return(values.reshape(-1, 2))
+#-----------------------------------------------------------------------------------------------------------------------#
+def peaks_fsp(addr_fsp,threshold,excursion,count):
+ # Up to count peaks above threshold (dBm) standing excursion (dB) above their surroundings, found with the fixed
+ # peak search of marker 1 and read in one transfer, as a numpy array with one (frequency, amplitude) row per peak,
+ # highest first. The threshold line is left on, so it also limits the marker peak searches
+ WRITE(addr_fsp, ":CALC:MARK1:STAT ON")
+ WRITE(addr_fsp, ":CALC:MARK:PEXC %s" %excursion)
+ WRITE(addr_fsp, ":CALC:THR %s" %threshold)
+ WRITE(addr_fsp, ":CALC:THR:STAT ON")
+ WRITE(addr_fsp, ":CALC:MARK:FUNC:FPE:SORT Y")
+ OPCQ(addr_fsp)
+ addr_fsp.write(":CALC:MARK:FUNC:FPE %s;*WAI;:CALC:MARK:FUNC:FPE:COUN?;:CALC:MARK:FUNC:FPE:X?;:CALC:MARK:FUNC:FPE:Y?" %count)
+ replies = strin_strout(addr_fsp.read()).split(";")
+ found = int(float(replies[0]))
+ if found == 0:
+  return(numpy.zeros((0, 2)))
+ xvals = [float(value) for value in replies[1].split(",")][:found]
+ yvals = [float(value) for value in replies[2].split(",")][:found]
+ return(numpy.column_stack((xvals, yvals)))
+#-----------------------------------------------------------------------------------------------------------------------#
+def mrkrcenfreq_fsp(addr_fsp,mrkr):
+ WRITE(addr_fsp, "CALC:MARK%s:FUNC:CENT" %mrkr)	
+ OPCQ(addr_fsp)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def mrkrreflev_fsp(addr_fsp,mrkr):
+ WRITE(addr_fsp, "CALC:MARK%s:FUNC:REF" %mrkr)	
+ OPCQ(addr_fsp)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def maxhold_fsp(addr_fsp, state):
+  if state == "ON":
+   WRITE(addr_fsp, ":DISP:WIND:TRAC1:MODE WRIT")
+   OPCQ(addr_fsp)
+   WRITE(addr_fsp, ":DISP:WIND:TRAC1:MODE MAXH")
+   OPCQ(addr_fsp)
+  if state == "OFF":
+   WRITE(addr_fsp, ":DISP:WIND:TRAC1:MODE WRIT")
+   OPCQ(addr_fsp)  
+  return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def view_fsp(addr_fsp, state):
+  if state == "ON":
+   WRITE(addr_fsp, ":DISP:WIND:TRAC1:MODE WRIT")
+   OPCQ(addr_fsp)
+   WRITE(addr_fsp, ":DISP:WIND:TRAC1:MODE VIEW")
+   OPCQ(addr_fsp)
+  if state == "OFF":
+   WRITE(addr_fsp, ":DISP:WIND:TRAC1:MODE WRIT")
+   OPCQ(addr_fsp)  
+  return(0)  
+#-----------------------------------------------------------------------------------------------------------------------#
+def readtrace_fsp(addr_fsp, trace, fd, notes, store=None):
+ (safstart,safstop)=freqssrd_fsp(addr_fsp)
+ tracedata = trace_fsp(addr_fsp, trace)
+ csvf.fappn_trace(fd, safstart, safstop, tracedata, notes)
+ if store is not None: # columnar store written in parallel with the captures file
+  store.append_trace(safstart, safstop, tracedata, notes)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def trace_fsp(addr_fsp, trace):
+ # Trace amplitudes as a numpy float32 array, transferred as a little endian REAL,32 binary block
+ WRITE(addr_fsp, ":FORM REAL,32")
+ WRITE(addr_fsp, ":FORM:BORD SWAP")
+ addr_fsp.write(":TRAC? TRACE%s" %trace)
+ return(BLOCKREAD(addr_fsp, "<f4"))
+#-----------------------------------------------------------------------------------------------------------------------#
+#UNTESTED
+def cfgchanpwr_fsp(addr_fsp,state,bw,avgstate,count):
+ if state == "ON":
+  WRITE(addr_fsp, "INIT:CHP")
+  OPCQ(addr_fsp)
+  WRITE(addr_fsp, "CHP:BAND:INT %s" %bw)
+  OPCQ(addr_fsp)
+  WRITE(addr_fsp, "CHP:AVER:STAT %s" %avgstate)
+  OPCQ(addr_fsp)
+  WRITE(addr_fsp, "CHP:AVER:COUN %s" %count)
+  OPCQ(addr_fsp)
+  WRITE(addr_fsp, "CHP:AVER:TCON REP")
+  OPCQ(addr_fsp)
+ elif state == "OFF":
+  WRITE(addr_fsp, "CONF:SAN")
+  OPCQ(addr_fsp)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+#UNTESTED
+def chanpwr_fsp(addr_fsp,wait):
+ WRITE(addr_fsp, "INIT:CHP")
+ time.sleep(wait)
+ addr_fsp.write("FETC:CHP?")
+ chanpwr = addr_fsp.read()
+ #Convert string to float
+ chanpwr = str_strip(chanpwr)	
+ return(chanpwr)
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Purpose: Agilent E4433 commands									                                                                  		#
+# Author: TJA														                                                                                #
+# Date: 15/08/2021												                                                                            	#
+# Revision: A 													                                                                              	#
+# Status: development												                                                                          	#
+#-----------------------------------------------------------------------------------------------------------------------#
+def init_4433(addr_4433):
+ #addr_4433.clear()
+ addr_4433.term_chars="\n"
+ RESET(addr_4433)
+ SNAPSHOT(addr_4433, defaults_4433)
+ return(ID(addr_4433))
+#-----------------------------------------------------------------------------------------------------------------------#
+def defaults_4433(addr_4433):
+ with batch(addr_4433):
+  WRITE(addr_4433, "OUTP:STAT OFF")
+  WRITE(addr_4433, "POW:OFFS 0 dB")
+  WRITE(addr_4433, "FREQ 100000000 Hz")
+  WRITE(addr_4433, "POW -143 dBm")
+  WRITE(addr_4433, "FM1:STAT OFF")
+  WRITE(addr_4433, "FM1:SOUR INT")
+  WRITE(addr_4433, "FM1 0 Hz")
+  WRITE(addr_4433, "FM1:INT:FREQ 1000 Hz")
+  WRITE(addr_4433, "FM2:STAT OFF")
+  WRITE(addr_4433, "FM2:SOUR INT")
+  WRITE(addr_4433, "FM2 0 Hz")
+  WRITE(addr_4433, "FM2:INT:FREQ 1000 Hz")
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def output_4433(addr_4433, state):
+ if state == "ON":
+  WRITE(addr_4433, "OUTP:STAT ON")
+  OPCQ(addr_4433)
+ elif state == "OFF":
+  WRITE(addr_4433, "OUTP:STAT OFF")
+  OPCQ(addr_4433)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def offset_4433(addr_4433, offset):
+ WRITE(addr_4433, "POW:OFFS %s dB" %offset)
+ OPCQ(addr_4433)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def set_4433(addr_4433, freq, level):
+ with batch(addr_4433):
+  WRITE(addr_4433, "FREQ %s Hz" %freq)
+  WRITE(addr_4433, "POW %s dBm" %level)
+  WRITE(addr_4433, "OUTP:STAT ON")
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def freq_4433(addr_4433, freq):
+ WRITE(addr_4433, "FREQ %s Hz" %freq)
+ OPCQ(addr_4433)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def lev_4433(addr_4433, level):
+ WRITE(addr_4433, "POW %s dBm" %level)
+ OPCQ(addr_4433)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def fm_4433(addr_4433, state, source, tonefreq, dev):
+ with batch(addr_4433):
+  if state == "ON":
+   WRITE(addr_4433, "FM%s:STAT ON" %source)
+   WRITE(addr_4433, "FM%s:SOUR INT" %source)
+   WRITE(addr_4433, "FM%s %s Hz" %(source,dev))
+   WRITE(addr_4433, "FM%s:INT:FREQ %s Hz" %(source,tonefreq))
+  elif state == "OFF":
+   WRITE(addr_4433, "FM%s:STAT OFF" %source)
+ return(0)      
+#-----------------------------------------------------------------------------------------------------------------------#
+def am_4433(addr_4433, state, modfreq, modlev):
+ with batch(addr_4433):
+  if state == "ON":
+   WRITE(addr_4433, "AM:STAT ON")
+   WRITE(addr_4433, "AM:SOUR INT")
+   WRITE(addr_4433, "AM:DEPT %s PCT" %modlev)
+   WRITE(addr_4433, "AM:INT:FREQ %s Hz" %modfreq)
+  elif state == "OFF":
+   WRITE(addr_4433, "AM:STAT OFF")
+ return(0)
+
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Purpose: marconi 2024 commands										                                                                  	#
+# Author: TJA														                                                                                #
+# Date: 15/08/2021													                                                                            #
+# Revision: A 													                                                                              	#
+# Status: development													                                                                          #
+#-----------------------------------------------------------------------------------------------------------------------#
+def init_2024(addr_2024):
+ #addr_2024.clear()
+ addr_2024.term_chars="\n"
+ RESET(addr_2024)
+ SNAPSHOT(addr_2024, defaults_2024)
+ return(ID(addr_2024))
+#-----------------------------------------------------------------------------------------------------------------------#
+def defaults_2024(addr_2024):
+ with batch(addr_2024):
+  WRITE(addr_2024, ":OUTPUT:DISABLE")
+  WRITE(addr_2024, ":CFRQ:VALUE 100000000HZ;INC 1KHZ")
+  WRITE(addr_2024, ":RFLV:UNITS DBM;TYPE PD;VALUE -140;INC 0.5;OFF")
+  WRITE(addr_2024, ":RFLV:OFFS:VALUE 0;DISABLE")
+  WRITE(addr_2024, ":MODE AM,FM")
+  WRITE(addr_2024, ":MOD:OFF")
+  WRITE(addr_2024, ":FM1:DEVN 0KHZ;INC 1KHZ;INT;OFF")
+  WRITE(addr_2024, ":FM1:MODF:VALUE 1.0HZ;SIN")
+  WRITE(addr_2024, ":FM2:DEVN 0KHZ;INC 1KHZ;INT;OFF")
+  WRITE(addr_2024, ":FM2:MODF:VALUE 1.0HZ;SIN")
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def output_2024(addr_2024, state):
+ if state == "ON":
+  WRITE(addr_2024, ":OUTPUT:ENABLE")
+  OPCQ(addr_2024)
+ elif state == "OFF":
+  WRITE(addr_2024, ":OUTPUT:DISABLE")
+  OPCQ(addr_2024)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def set_2024(addr_2024, freq, level):
+ with batch(addr_2024):
+  WRITE(addr_2024, ":CFRQ:VALUE %sHZ;INC 1KHZ" %freq)
+  WRITE(addr_2024, ":RFLV:UNITS DBM;TYPE PD;VALUE %s;INC 0.5;ON" %level)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def freq_2024(addr_2024, freq):
+ WRITE(addr_2024, ":CFRQ:VALUE %sHZ;INC 1KHZ" %freq)
+ OPCQ(addr_2024)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def lev_2024(addr_2024, level):
+ WRITE(addr_2024, ":RFLV:UNITS DBM;TYPE PD;VALUE %s;INC 0.5;ON" %level)
+ OPCQ(addr_2024)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def fm_2024(addr_2024, state, source, tonefreq, dev):
+ with batch(addr_2024):
+  if state == "ON":
+   WRITE(addr_2024, ":MODE FM")
+   WRITE(addr_2024, ":MOD:ON")
+   WRITE(addr_2024, ":FM%s:DEVN %sHZ;INC 1KHZ;INT;ON" %(source,dev))  
+   WRITE(addr_2024, ":FM%s:MODF:VALUE %sHZ;SIN" %(source,tonefreq))
+  elif state == "OFF":
+   WRITE(addr_2024, ":MODE AM,FM")
+   WRITE(addr_2024, ":MOD:OFF")
+   WRITE(addr_2024, ":FM%s:DEVN 0KHZ;INC 1KHZ;INT;OFF" %source)  
+   WRITE(addr_2024, ":FM%s:MODF:VALUE 1.0HZ;SIN" %source)
+ return(0)      
+#-----------------------------------------------------------------------------------------------------------------------#
+def am_2024(addr_2024, state, source, modfreq, mdepth):
+ with batch(addr_2024):
+  if state == "ON":
+   WRITE(addr_2024, ":MODE AM")
+   WRITE(addr_2024, ":MOD:ON")
+   WRITE(addr_2024, ":AM%s:DEPTH %sPCT;INT;ON" %(source,mdepth))  
+   WRITE(addr_2024, ":AM%s:MODF:VALUE %sKHZ;SIN" %(source,modfreq))
+  if state == "OFF":
+   WRITE(addr_2024, ":MODE AM,FM")
+   WRITE(addr_2024, ":MOD:OFF")
+   WRITE(addr_2024, ":AM%s:DEPTH 25PCT;INT;OFF" %source)  
+   WRITE(addr_2024, ":AM%s:MODF:VALUE 1KHZ;SIN" %source) 
+ return(0)
+
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Purpose: model 8x5-M signal generator commands									                                                      #
+# Author: TJA														                                                                                #
+# Date: 19/08/2021													                                                                            #
+# Revision: A 														                                                                              #
+# Status: development												                                                                           	#
+#-----------------------------------------------------------------------------------------------------------------------#
+def init_8x5m(addr_8x5m):
+ addr_8x5m.clear()
+ addr_8x5m.term_chars="\n"  
+ RESET(addr_8x5m)
+ return(ID(addr_8x5m))
+#-----------------------------------------------------------------------------------------------------------------------#
+def output_8x5m(addr_8x5m, state):
+ if state == "ON":
+  WRITE(addr_8x5m, "OUTP:STAT ON")
+  OPCQ(addr_8x5m)
+ elif state == "OFF":
+  WRITE(addr_8x5m, "OUTP:STAT OFF")
+  OPCQ(addr_8x5m)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def set_8x5m(addr_8x5m, freq, level):
+ WRITE(addr_8x5m, "SOUR:FREQ:CW %s Hz" %freq)
+ OPCQ(addr_8x5m)
+ WRITE(addr_8x5m, "SOUR:POW:ATT:AUTO ON")
+ OPCQ(addr_8x5m)
+ WRITE(addr_8x5m, "SOUR:POW:LEV %s dBm" %level)
+ OPCQ(addr_8x5m)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def freq_8x5m(addr_8x5m, freq):
+ WRITE(addr_8x5m, "SOUR:FREQ:CW %s Hz" %freq)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def lev_8x5m(addr_8x5m, level):
+ WRITE(addr_8x5m, "SOUR:POW:ATT:AUTO ON")
+ OPCQ(addr_8x5m)
+ WRITE(addr_8x5m, "SOUR:POW:LEV %s dBm" %level)
+ OPCQ(addr_8x5m)
+ return(0)
+
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Purpose: R&S SFC-U Compact Modulator commands			        						                                                #
+# Author: TJA														                                                                                #
+# Date: 17/09/2021													                                                                            #
+# Revision: A 														                                                                              #
+# Status: development												                                                                           	#
+#-----------------------------------------------------------------------------------------------------------------------#
+def init_sfc(addr_sfc):
+ addr_sfc.open()
+ addr_sfc.clear()
+ addr_sfc.term_chars="\n"  
+ RESET(addr_sfc)            
+ return(ID(addr_sfc))
+#-----------------------------------------------------------------------------------------------------------------------#
+def freq_sfc(addr_sfc, freq):
+ WRITE(addr_sfc, "SOUR:FREQ:ACTual:CENTer %s HZ" %freq)
+ OPCQ(addr_sfc)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------# 
+def lev_sfc(addr_sfc, lev):
+ WRITE(addr_sfc, "SOURce:POWer %s dBm" %lev)
+ OPCQ(addr_sfc)
+ return(0) 
+#-----------------------------------------------------------------------------------------------------------------------# 
+def set_sfc(addr_sfc, freq, lev):
+ with batch(addr_sfc):
+  WRITE(addr_sfc, "SOUR:FREQ:ACTual:CENTer %s HZ" %freq)
+  WRITE(addr_sfc, "SOURce:POWer %s dBm" %lev)
+ return(0) 
+#-----------------------------------------------------------------------------------------------------------------------# 
+def out_sfc(addr_sfc, state):
+ WRITE(addr_sfc, "OUTPut:STATe %s" %state)
+ OPCQ(addr_sfc)
+ return(0)  
+#-----------------------------------------------------------------------------------------------------------------------#
+def mod_sfc(addr_sfc, state):
+ # Modulation ON or OFF. Modulation OFF provides a CW output
+ WRITE(addr_sfc, "SOURce:MODulator:STATe %s" %state)
+ OPCQ(addr_sfc)
+ addr_sfc.write("SOURce:MODulator:STAT?")
+ response = addr_sfc.read()
+ return(response) 
+#-----------------------------------------------------------------------------------------------------------------------#
+def specpol_sfc(addr_sfc, pol):
+ # Set IQ polarity NORM = Normal, INV = Inverted
+ WRITE(addr_sfc, "SOUR:DM:POL %s" %pol)
+ OPCQ(addr_sfc)
+ addr_sfc.write("SOUR:DM:POL?")
+ response = addr_sfc.read()
+ return(response)
+#-----------------------------------------------------------------------------------------------------------------------#
+'''
+Modulation Settings
+
+TRANsmission commands available/not available in this driver
+DVBC............Available
+DVBS............Available
+DVBT............Available
+VSB.............Available
+J83B............Available
+ISDBt...........Available
+DTMB............Available
+DVS2............Available
+DIRectv.........Available
+TDMB............Available
+MEDiaflo.... ...Available
+CMMB............Available
+T2DVb...........Available
+ATSM............Available
+'''
+def trans_sfc(addr_sfc, trans):
+ if trans == "DVBS":
+  WRITE(addr_sfc, "SOURce:DM:TRANsmission DVBS")
+ if trans == "DVBS2":
+  WRITE(addr_sfc, "SOURce:DM:TRANsmission DVS2")
+ if trans == "DIRECTV":
+  WRITE(addr_sfc, "SOURce:DM:TRANsmission DIRectv")
+ if trans == "DVBC": 
+  WRITE(addr_sfc, "SOURce:DM:TRANsmission DVBC")
+ if trans == "DVBC2": 
+  WRITE(addr_sfc, "SOURce:DM:TRANsmission C2DVb") 
+ if trans == "DVBT": 
+  WRITE(addr_sfc, "SOURce:DM:TRANsmission DVBT") 
+ if trans == "DVBT2": 
+  WRITE(addr_sfc, "SOURce:DM:TRANsmission T2DVb") 
+ if trans == "J83B": 
+  WRITE(addr_sfc, "SOURce:DM:TRANsmission J83B")   
+ if trans == "VSB": 
+  WRITE(addr_sfc, "SOURce:DM:TRANsmission VSB") 
+ if trans == "ISDBT": 
+  WRITE(addr_sfc, "SOURce:DM:TRANsmission ISDBt") 
+ if trans == "DTMB": 
+  WRITE(addr_sfc, "SOURce:DM:TRANsmission DTMB")   
+ if trans == "TDMB": 
+  WRITE(addr_sfc, "SOURce:DM:TRANsmission TDMB")      
+ if trans == "MEDIAFLO": 
+  WRITE(addr_sfc, "SOURce:DM:TRANsmission MEDiaflo")
+ if trans == "CMMB": 
+  WRITE(addr_sfc, "SOURce:DM:TRANsmission CMMB") 
+ if trans == "ATSM": 
+  WRITE(addr_sfc, "SOURce:DM:TRANsmission ATSM") 
+ OPCQ(addr_sfc)
+ addr_sfc.write("SOURce:DM:TRANsmission:STAN?") 
+ response = addr_sfc.read()
+ return(response)
+ 
+#-----------------------------------------------------------------------------------------------------------------------#
+def dvbs_sfc(addr_sfc, constel, input, payload, sequence, coderate, rolloff, source, stuffing, symbolrate, testsignal, tspackets, reedsolomon, special):
+
+ #example: dvbs_sfc(addr_sfc, "QPSK", "ASI1", "PRBS", "P23_1", "R2_3", 0.25, "TESTsignal", "OFF", "27.5000e6", "TTSP", "H184", "ON", "OFF")
+ #recalled in one command once saved: SNAPSHOT(addr_sfc, dvbs_sfc, "QPSK", "ASI1", ...) after SNAPSHOTREGS(addr_sfc, range(1, 10))
+ 
+ # SFC-U Modulation Screen
+ # Transmission DVBS 
+ print("Transmission: %s" %trans_sfc(addr_sfc, "DVBS"))
+ #Spectrum NORMAL
+ print("Spectrum: %s" %specpol_sfc(addr_sfc, "NORM"))
+ #Turn Modulation ON
+ print("Modulation: %s" %mod_sfc(addr_sfc, "ON"))
+ 
+ with batch(addr_sfc):
+  # SFC-U Input Signal Screen
+  # Source EXTernal(default),TSPLayer,TESTsignal
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS:SOUR %s" %source)
+  print("Input source: %s" %source)
+  # ASI Input ASI1 or ASI2
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS:INPut %s" %input)
+  print("ASI Input: %s" %input)  
+  # Stuffing ON/OFF
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS:STUF %s" %stuffing)
+  print("stuffing: %s" %stuffing)
+  # Test signal TS packet = TTSP, PRBS before conv. = PBEC
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS:SOUR %s" %testsignal)
+  print("Test signal: %s" %testsignal)
+ 
+  # SFC-U Coding Screen
+  # Symbol Rate range 0.100000e6 S/s to 45.000000e6 S/s   default 27.5000e6 S/s
+  # Example SOURce:IQCoder:DVBS:SYMBols:RATE 22.5000e6  
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS:SYMBols:RATE %s" %symbolrate)
+  print("Symbol rate %s" %symbolrate)
+  # Constellation QPSK = S4, 8PSK = S8, 16QAM = S16
+  if constel == "QPSK":
+   WRITE(addr_sfc, "SOURce:IQCoder:DVBS:CONS S4")
+  if constel == "8PSK":
+   WRITE(addr_sfc, "SOURce:IQCoder:DVBS:CONS S8") 
+  if constel == "16QAM":
+   WRITE(addr_sfc, "SOURce:IQCoder:DVBS:CONS S16")  
+  print("Constellation: %s" %constel)  
+  # Roll off 0.2, 0.25, 0.35
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS:ROLL %s" %rolloff)
+  print("Roll off: %s" %rolloff)
+  # Code Rate 1/2 = R1_2, 2/3 = R2_3, 3/4 = R3_4, 5/6 = R5_6, 7/8 = R7_8, 8/9 = R8_9
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS:RATE %s" %coderate)
+  print("Code rate: %s" %coderate)
+ 
+  # SFC-U Special Screen 
+  # Special Settings ON/OFF 
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS:SPECial:SETT:STAT %s" %special)
+  print("Special settings: %s" %special)
+  # Reed Solomon ON/OFF 
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS:SPECial:REED %s" %reedsolomon)
+  print("Reed Solomon: %s" %reedsolomon)
+ 
+  # SFC-U Settings Screen 
+  # TS Packets Head / 184 payload = H184, Sync / 187 payload = S187 
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS:TSP %s" %tspackets)
+  print("Test TS packet: %s" %tspackets)
+  # Payload PRBS = PRBS, Hex 00 = H00, Hex FF = HFF 
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS:PAYL %s" %payload)
+  print("Payload Test: %s" %payload) 
+  # PRBS 2^23 - 1 (ITU-T O.151) = P23_1, 2^15 - 1 (ITU-T O.151) = P15_1
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS:PRBS:SEQ %s" %sequence)
+  print("PRBS sequence: %s" %sequence)  
+
+ return(0)
+
+#-----------------------------------------------------------------------------------------------------------------------# 
+#DVB-S2 Settings
+def dvbs2_sfc(addr_sfc, constel, input, fecframe, payload, pilots, sequence, coderate, rolloff, source, stuffing, symbolrate, testsignal, tspackets):
+
+#example: dvbs2_sfc(addr_sfc, "QPSK", "ASI1", "NORM", "PRBS", "ON", "P23_1", "R2_3", 0.25, "TESTsignal", "OFF", "27.5000e6", "TTSP", "H184")
+#recalled in one command once saved: SNAPSHOT(addr_sfc, dvbs2_sfc, "QPSK", "ASI1", ...) as for dvbs_sfc
+
+ # SFC-U Modulation Screen
+ # Transmission DVBS 
+ print("Transmission: %s" %trans_sfc(addr_sfc, "DVBS2"))
+ #Spectrum NORMAL
+ print("Spectrum: %s" %specpol_sfc(addr_sfc, "NORM"))
+ #Turn Modulation ON
+ print("Modulation: %s" %mod_sfc(addr_sfc, "ON"))
+
+ with batch(addr_sfc):
+  # SFC-U Input Signal Screen
+  # Source EXTernal(default),TSPLayer,TESTsignal
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS2:SOUR %s" %source)
+  print("Input source: %s" %source)
+  # ASI Input ASI1 or ASI2
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS2:INPut %s" %input)
+  print("ASI Input: %s" %input)  
+  # Stuffing ON/OFF
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS2:STUF %s" %stuffing)
+  print("stuffing: %s" %stuffing)
+  # Test signal TS packet = TTSP, PRBS before conv. = PBEC
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS2:SOUR %s" %testsignal)
+  print("Test signal: %s" %testsignal)
+
+  # SFC-U Coding Screen
+  # Symbol Rate range 0.100000e6 S/s to 45.000000e6 S/s   default 20.0000e6 S/s
+  # Example SOURce:IQCoder:DVBS2:SYMBols:RATE 22.5000e6  
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS2:SYMBols:RATE %s" %symbolrate)
+  print("Symbol rate %s" %symbolrate)
+  # Constellation QPSK = S4, 8PSK = S8, 16APSK = A16, 32APSK = A32
+  if constel == "QPSK":
+   WRITE(addr_sfc, "SOURce:IQCoder:DVBS2:CONStel S4")
+  if constel == "8PSK":
+   WRITE(addr_sfc, "SOURce:IQCoder:DVBS2:CONStel S8") 
+  if constel == "16APSK":
+   WRITE(addr_sfc, "SOURce:IQCoder:DVBS2:CONStel A16") 
+  if constel == "32APSK":
+   WRITE(addr_sfc, "SOURce:IQCoder:DVBS2:CONStel A32")   
+  print("Constellation: %s" %constel)  
+  # FEC Frame Normal = NORM, Short = SHOR
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS2:FECFrame %s" %fecframe)
+  print("FECFrame: %s" %fecframe)
+  # Pilots ON/OFF 
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS2:PILots %s" %pilots) 
+  print("Pilots: %s" %pilots)
+  # Roll off 0.15, 0.2, 0.25, 0.35
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS2:ROLLoff %s" %rolloff)
+  print("Roll off: %s" %rolloff)
+  # Code Rate 1/4 = R1_4, 1/3 = R1_3, 2/5 = R2_5, 1/2 = R1_2,3/5 = R3_5, 2/3 = R2_3, 
+  # 3/4 = R3_4, 4/5 = R4_5, 5/6 = R5_6, 6/7 = R6_7, 7/8 = R7_8, 8/9 = R8_9, 9/10 = R9_10
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS2:RATE %s" %coderate)
+  print("Code rate: %s" %coderate)
+
+  # SFC-U Settings Screen 
+  # TS Packets Head / 184 payload = H184, Sync / 187 payload = S187 
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS:TSP %s" %tspackets)
+  print("Test TS packet: %s" %tspackets)
+  # Payload PRBS = PRBS, Hex 00 = H00, Hex FF = HFF 
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS2:PAYL %s" %payload)
+  print("Payload Test: %s" %payload) 
+  # PRBS 2^23 - 1 (ITU-T O.151) = P23_1, 2^15 - 1 (ITU-T O.151) = P15_1
+  WRITE(addr_sfc, "SOURce:IQCoder:DVBS:PRBS:SEQ %s" %sequence)
+  print("PRBS sequence: %s" %sequence) 
+
+ #Turn Modulation ON
+ mod_sfc(addr_sfc, "ON")
+
+ return(0)
+
+#-----------------------------------------------------------------------------------------------------------------------#
+def cnadd_sfc(addr_sfc, state, cn):
+ with batch(addr_sfc):
+  WRITE(addr_sfc, "SOURce:NOISe:MODE AWGN")
+  WRITE(addr_sfc, "SOURce:NOISe:COUPling %s" %state)
+ 
+  if state == "ON":
+   WRITE(addr_sfc, "SOURce:NOISe:STATe ADD")
+   WRITE(addr_sfc, "SOURce:NOISe:AWGN ON")
+  elif state == "OFF":
+   WRITE(addr_sfc, "SOURce:NOISe:STATe OFF")
+   WRITE(addr_sfc, "SOURce:NOISe:AWGN OFF")
+  
+  WRITE(addr_sfc, "SOURce:NOISe:CN %s" %cn)
+ return(0) 
+ 
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Purpose: TTi TG5011A Arb generator commands			        						                                                  #
+# Author: TJA														                                                                                #
+# Date: 21/08/2021													                                                                            #
+# Revision: A 														                                                                              #
+# Status: development												                                                                           	#
+#-----------------------------------------------------------------------------------------------------------------------#
+def init_tg5011a(addr_tg5011a):
+ addr_tg5011a.clear()
+ addr_tg5011a.term_chars="\r\n"
+ RESET(addr_tg5011a)
+ return(ID(addr_tg5011a))
+#-----------------------------------------------------------------------------------------------------------------------#
+def configarb_tg5011a(addr_tg5011a, arbnumber):
+  #print(addr_tg5011a.ask("ARB1DEF?"))
+  with batch(addr_tg5011a, root=""):
+   WRITE(addr_tg5011a, "ARBLOAD ARB%s" %arbnumber)
+   #Set frequency (For a command with four bytes this is 1/(9bits*4words*1.5ms)=18.51851851851852 Hz )
+   WRITE(addr_tg5011a, "FREQ 18.518518518")
+   #Select Burst
+   #Set Burst type to multiple (1)
+   WRITE(addr_tg5011a, "BSTCOUNT 1")
+   WRITE(addr_tg5011a, "BSTPHASE 0")
+   WRITE(addr_tg5011a, "BST NCYC")
+   #Select Trigger
+   #Set trigger to manual
+   WRITE(addr_tg5011a, "TRGSRC MAN")
+   #Turn generator output on
+   WRITE(addr_tg5011a, "OUTPUT ON")
+  return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def readwav_tg5011a(addr_tg5011a, filename, arbnumber):
+  addr_tg5011a.write("ARB%s?" %arbnumber)
+  OPCQ(addr_tg5011a)
+  #fetch first two characters 
+  addr_tg5011a.term_chars=None
+  headervalue = addr_tg5011a.visalib.read(addr_tg5011a.session, 2)
+  #check first is # (hex 23)
+  #if it is, second character defines the number of bytes to follow. Fetch this number.
+  numberofbytes = addr_tg5011a.visalib.read(addr_tg5011a.session, int(chr((headervalue[1]))))
+  f = open(filename, 'wb')
+  f.write(addr_tg5011a.read(int(numberofbytes))) 
+  addr_tg5011a.term_chars="\r\n"
+#-----------------------------------------------------------------------------------------------------------------------#
+def trigger_tg5011a(addr_tg5011a):
+  WRITE(addr_tg5011a, "*TRG")
+  WRITE(addr_tg5011a, "*CLS")
+  return(0) 
+#-----------------------------------------------------------------------------------------------------------------------#
+def writewav_tg5011a(addr_tg5011a, filename, arbnumber):
+ WRITE(addr_tg5011a, "ARBDEF ARB%s,PORT%s,ON" %(arbnumber,arbnumber))
+ OPCQ(addr_tg5011a)
+ #load data from file
+ #f = open('C:\data\Perl\PCB_Sim\waveform.wfm', 'rb')
+ f = open(filename, 'rb')
+ wavedata=f.read()
+ #strip existing header
+ #add new header (#...)
+ #calculate how many bytes in wavedata
+ lengthofwave=len(wavedata)
+ # for i in (str(lengthofwave)):
+ # headerdata.append(ord(i))
+ # "#"+str(len(str(lengthofwave)))+str(lengthofwave)
+ # convert header data to ascii numbers
+ # headerdata_ascii=""
+ # for i,c in enumerate(headerdata):
+ # headerdata_ascii=headerdata_ascii + str(ord(headerdata[i]))
+ # headerdata_ascii=bytearray(headerdata)
+ headerdata="#"
+ headerdata+=str(len(str(lengthofwave)))
+ headerdata+=str(lengthofwave)
+ #write to generator
+ addr_tg5011a.term_chars=""
+ addr_tg5011a.send_end=False
+ 
+ count = addr_tg5011a.visalib.write(addr_tg5011a.session, "ARB%s " %arbnumber)
+ 
+ count = addr_tg5011a.visalib.write(addr_tg5011a.session, headerdata)
+ 
+ addr_tg5011a.values_format = 5
+ 
+ #############################################
+ #  Write binary to device using visa32.dll  #
+ #############################################
+ #bufferToWrite = "*IDN?" #*IDN? typically tells devices to return identification
+ #bytesToWrite = len(bufferToWrite) + 1
+ bytesWritten = c_int(0) 
+ #Function Prototype: ViStatus viWrite(ViSession vi, ViBuf buf, ViUInt32 count, ViPUInt32 retCount)
+ 
+ if constants.NOEQUIP:
+  returnValue = 0
+ else:
+  returnValue = dll.viWrite(addr_tg5011a.session, wavedata, len(wavedata), byref(bytesWritten))
+ 
+ 
+ if returnValue != 0:
+  print ("Could not write binary data to device. Error: ", returnValue)
+  return(returnValue)
+  print ("Bytes Written: ", bytesWritten)
+  print ("ReturnValue: ", returnValue, "\n")
+  #############################################
+ addr_tg5011a.values_format = 0
+ print(addr_tg5011a.visalib.write(addr_tg5011a.session,"\n"))
+ addr_tg5011a.term_chars="\r\n"
+ time.sleep(2)
+ 
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Purpose: TTi PL303-P PSU commands			        						                                                            #
+# Author: TJA														                                                                                #
+# Date: 21/08/2021													                                                                            #
+# Revision: A 														                                                                              #
+# Status: development												                                                                           	#
+#-----------------------------------------------------------------------------------------------------------------------#
+def init_pl303(addr_pl303):
+ addr_pl303.clear()
+ addr_pl303.term_chars="\r\n"
+ RESET(addr_pl303)      
+ vset_pl303(addr_pl303, 1, 0)    
+ OPCQ(addr_pl303)     
+ iset_pl303(addr_pl303, 1, 0)
+ OPCQ(addr_pl303)
+ allout_pl303(addr_pl303, "OFF")
+ OPCQ(addr_pl303)
+ return(ID(addr_pl303))
+#-----------------------------------------------------------------------------------------------------------------------#
+def allout_pl303(addr_pl303, state):
+ if state == "ON":
+  WRITE(addr_pl303, "OPALL 1")
+  OPCQ(addr_pl303)
+ elif state == "OFF":
+  WRITE(addr_pl303, "OPALL 0") 
+  OPCQ(addr_pl303)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def out_pl303(addr_pl303, state, source):
+ if state == "ON":
+  WRITE(addr_pl303, "OP%s 1" %source)
+  OPCQ(addr_pl303)
+ elif state == "OFF":
+  WRITE(addr_pl303, "OP%s 0" %source) 
+  OPCQ(addr_pl303)
+ return(0) 
+#-----------------------------------------------------------------------------------------------------------------------# 
+def vset_pl303(addr_pl303, source, voltage):          
+ WRITE(addr_pl303, "V%s %s" %(source, voltage))
+ OPCQ(addr_pl303)
+ return(0) 
+#-----------------------------------------------------------------------------------------------------------------------#  
+def iset_pl303(addr_pl303, source, current):          
+ WRITE(addr_pl303, "I%s %s" %(source, current))
+ OPCQ(addr_pl303)
+ return(0)  
+#-----------------------------------------------------------------------------------------------------------------------#  
+def iread_pl303(addr_pl303, source):          
+ ireadback = addr_pl303.ask("I%sO?" %source)
+ #Convert string to float
+ ireadback = str_strip(ireadback)	
+ return(ireadback)
+#-----------------------------------------------------------------------------------------------------------------------# 
+def vread_pl303(addr_pl303, source):          
+ vreadback = addr_pl303.ask("V%s?" %source)
+ #Convert string to float
+ vreadback = str_strip(vreadback)
  return(vreadback)
\ No newline at end of file
@@ -0,0 +1,86 @@
+#-----------------------------------------------------------------------------------------------------------------------#
+# Function: equip_aio                                                                                                   #
+# Purpose: asyncio counterpart of the equip driver library                                                              #
+# Parameters: accepts and returns refer to the code                                                                     #
+# Author: TJA                                                                                                           #
+# Date: 17/10/2026                                                                                                      #
+# Revision: A                                                                                                           #
+# Status: development                                                                                                   #
+#-----------------------------------------------------------------------------------------------------------------------#
+# Every instrument gets its own single worker thread, so commands to one instrument run strictly in order (the VISA
+# session is never used from two threads at once) while different instruments are talked to at the same time, e.g.
+#
+#  (voltage, current, level) = await asyncio.gather(equip_aio.vread_pl303(addr_psu, 1),
+#                                                   equip_aio.iread_pl303(addr_psu, 1),
+#                                                   equip_aio.ymrkrval_cxa(addr_spec_an, 1))
+#
+# The async functions take the same arguments and return the same values as the equip functions of the same name.
+# Functions not wrapped here can be run on an instrument's thread with CALL(addr, equip.function, args...).
+# Functions writing to a results file or column store should not be gathered with other writers of the same file.
+#-----------------------------------------------------------------------------------------------------------------------#
+
+#imports
+import asyncio
+import concurrent.futures
+import functools
+
+import equip
+
+#instrument families wrapped as async functions
+wrapped_families = ("_cxa", "_esg", "_dso", "_pl303", "_fsp")
+
+#one single thread executor per instrument
+executors = {}
+
+#-----------------------------------------------------------------------------------------------------------------------#
+# Purpose: Primitives                                                                                                   #
+#-----------------------------------------------------------------------------------------------------------------------#
+def EXECUTOR(addr):
+ if addr not in executors:
+  executors[addr] = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="equip_aio")
+ return(executors[addr])
+#-----------------------------------------------------------------------------------------------------------------------#
+async def CALL(addr, func, *args, **kwargs):
+ # Runs func(addr, *args, **kwargs) on the instrument's thread
+ loop = asyncio.get_running_loop()
+ return(await loop.run_in_executor(EXECUTOR(addr), functools.partial(func, addr, *args, **kwargs)))
+#-----------------------------------------------------------------------------------------------------------------------#
+async def WRITE(addr, cmd):
+ return(await CALL(addr, equip.WRITE, cmd))
+#-----------------------------------------------------------------------------------------------------------------------#
+def query(addr, cmd):
+ addr.write(cmd)
+ return(addr.read())
+#-----------------------------------------------------------------------------------------------------------------------#
+async def QUERY(addr, cmd):
+ # Write and read run back to back on the instrument's thread so no other command can get between them
+ return(await CALL(addr, query, cmd))
+#-----------------------------------------------------------------------------------------------------------------------#
+async def OPCQ(addr):
+ return(await CALL(addr, equip.OPCQ))
+#-----------------------------------------------------------------------------------------------------------------------#
+async def RESET(addr):
+ return(await CALL(addr, equip.RESET))
+#-----------------------------------------------------------------------------------------------------------------------#
+async def ID(addr):
+ return(await CALL(addr, equip.ID))
+#-----------------------------------------------------------------------------------------------------------------------#
+def CLOSE(addr):
+ # Stops the instrument's thread once its queued commands have run, call before addr.close()
+ executor = executors.pop(addr, None)
+ if executor is not None:
+  executor.shutdown(wait=True)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def WRAP(func):
+ @functools.wraps(func)
+ async def wrapper(addr, *args, **kwargs):
+  return(await CALL(addr, func, *args, **kwargs))
+ return(wrapper)
+#-----------------------------------------------------------------------------------------------------------------------#
+# Purpose: CXA, ESG, DSO, PL303 and FSP commands, e.g. equip_aio.freqcs_cxa(addr_cxa, centfreq, spanfreq)               #
+#-----------------------------------------------------------------------------------------------------------------------#
+for name in dir(equip):
+ if name.endswith(wrapped_families) and callable(getattr(equip, name)):
+  globals()[name] = WRAP(getattr(equip, name))
+#-----------------------------------------------------------------------------------------------------------------------#
@@ -1,28 +1,42 @@
 import binascii
 import datetime
 import logging
+import selectors
 import socket
+import threading
 import time
+import weakref
 from ipaddress import ip_address
 
 
-class PSU72:
-    def __init__(self, address: str, logger: logging.Logger = None):
-        self.logger = logger if logger is not None else self.__get_logger()
+class PSU72Transport:
+    """Shared UDP socket for any number of PSU72 supplies
 
-        try:
-            ip_address(address)
-        except ValueError as error:
-            self.logger.warning("%s is not a valid IP address", address)
-            raise ValueError("Please use a valid IP address") from error
-        else:
-            self._ipaddress = address
+    The supplies all talk to the same UDP port, so only one socket per local
+    port can exist in a process. The transport owns that socket and sends
+    datagrams to, and dispatches replies from, each supply by its IP address.
+    Queries to different supplies are sent together and their replies
+    collected as they arrive, so reading every supply takes one round trip.
+    Only one query per supply is in flight at a time, since the replies carry
+    nothing to match them to the command other than their order.
 
-        # ! This might be hard-coded in the instrument firmware. No reason to
-        # ! change it unless something else is using the same port on the
-        # ! controlling PC.
+    `PSU72` instances use `PSU72Transport.shared(local_port)` unless given a
+    transport explicitly, so supplies created with the same local port share
+    one socket, which is closed once the last of them is deleted.
+    """
+
+    _shared = weakref.WeakValueDictionary()
+
+    def __init__(self, local_port: int = 18190, logger: logging.Logger = None):
+        self.logger = logger if logger is not None else logging.getLogger("PSU")
+
+        # ! The remote port might be hard-coded in the instrument firmware.
+        # ! No reason to change the local one unless something else is using
+        # ! the same port on the controlling PC.
         self._udp_port = 18190
+        self._local_port = local_port
         self._buf_size = 1024
+        self._lock = threading.Lock()
 
         try:
             self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -33,7 +47,7 @@ class PSU72:
             self.logger.info("Successfully created UDP socket")
 
         try:
-            self._sock.bind(('0.0.0.0', self._udp_port))
+            self._sock.bind(('0.0.0.0', self._local_port))
         except socket.error as err:
             self.logger.critical(f"Error binding socket: {err}")
             raise RuntimeError("Could not bind socket - port in use?")
@@ -41,26 +55,183 @@ class PSU72:
             self.logger.info("Successfully bound socket to UDP port")
 
         self._sock.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._sock, selectors.EVENT_READ)
+
+    def __del__(self):
+        self.logger.info("Closing shared PSU UDP socket")
+        self._selector.close()
+        self._sock.close()
+
+    @classmethod
+    def shared(
+        cls, local_port: int = 18190, logger: logging.Logger = None
+    ) -> "PSU72Transport":
+        """Returns the transport bound to `local_port`, creating it if needed
+
+        Args:
+            local_port: Local UDP port to bind
+            logger: Used only if a new transport is created
+
+        Returns:
+            The `PSU72Transport` for the port
+
+        Raises:
+            RuntimeError: If the socket cannot be created or bound
+        """
+        transport = cls._shared.get(local_port)
+        if transport is None:
+            transport = cls(local_port, logger)
+            cls._shared[local_port] = transport
+        return transport
+
+    def send(self, address: str, cmd: bytes):
+        """Sends a command which has no reply, e.g. a setter"""
+        self._sock.sendto(cmd, (address, self._udp_port))
+
+    def _drain(self):
+        """Discards any datagrams already waiting on the socket
+
+        Late replies to earlier, timed out queries would otherwise be taken
+        as the reply to the next query.
+        """
+        while True:
+            try:
+                self._sock.recv(self._buf_size)
+            except (BlockingIOError, ConnectionRefusedError):
+                return
+
+    def query(
+        self,
+        address: str,
+        cmd: bytes,
+        parse=bytes,
+        timeout: float = 0.5,
+        retries: int = 2,
+    ):
+        """Sends a query to one supply and waits for its reply
+
+        See `query_many` for the arguments and exceptions.
+        """
+        return self.query_many([(address, cmd, parse)], timeout, retries)[0]
+
+    def query_many(self, requests: list, timeout: float = 0.5, retries: int = 2):
+        """Sends queries to several supplies at once and waits for the replies
+
+        The socket is watched with a selector, so the call returns as soon as
+        the last reply arrives instead of after a fixed delay. Replies are
+        matched to the queries by source address. Replies which cannot be
+        parsed as the expected type are taken to belong to an earlier command
+        and are skipped. Queries without a valid reply within `timeout` are
+        sent again, up to `retries` times.
+
+        Args:
+            requests: List of (address, cmd, parse) tuples, at most one per
+                address. `cmd` is the query including the terminating newline
+                and `parse` converts the raw reply into the returned value,
+                raising `ValueError` if the reply does not fit the query
+            timeout: Time to wait for the replies on each attempt, seconds
+            retries: Number of times unanswered queries are resent
+
+        Returns:
+            The parsed replies, in the order of `requests`
+
+        Raises:
+            ValueError: If an address appears more than once in `requests`
+            RuntimeError: If any supply gives no valid reply after all retries
+        """
+        outstanding = {address: index for index, (address, _, _) in enumerate(requests)}
+        if len(outstanding) != len(requests):
+            raise ValueError("Only one query per PSU can be outstanding")
+        results = {}
+
+        with self._lock:
+            self._drain()
+            for attempt in range(retries + 1):
+                if attempt > 0:
+                    self.logger.warning(
+                        f"No reply from {', '.join(outstanding)}, retrying"
+                    )
+                for address, index in outstanding.items():
+                    self.send(address, requests[index][1])
+
+                deadline = time.monotonic() + timeout
+                while outstanding and (remaining := deadline - time.monotonic()) > 0:
+                    if not self._selector.select(remaining):
+                        break
+                    try:
+                        response, (address, _) = self._sock.recvfrom(self._buf_size)
+                    except (BlockingIOError, ConnectionRefusedError):
+                        continue
+
+                    index = outstanding.get(address)
+                    if index is None:
+                        self.logger.warning(
+                            f"Discarding unexpected reply {response!r} from {address}"
+                        )
+                        continue
+                    try:
+                        results[index] = requests[index][2](response)
+                    except ValueError:
+                        self.logger.warning(
+                            f"Discarding unexpected reply {response!r} to "
+                            f"{requests[index][1]!r} from {address}"
+                        )
+                    else:
+                        del outstanding[address]
+
+                if not outstanding:
+                    return [results[index] for index in range(len(requests))]
+
+        self.logger.critical(f"No reply from PSU at {', '.join(outstanding)}")
+        raise RuntimeError("No response from PSU - check if on?")
+
+
+class PSU72:
+    def __init__(
+        self,
+        address: str,
+        logger: logging.Logger = None,
+        timeout: float = 0.5,
+        retries: int = 2,
+        transport: PSU72Transport = None,
+        local_port: int = 18190,
+    ):
+        self.logger = logger if logger is not None else self.__get_logger()
 
         try:
-            self._sock.connect((self._ipaddress, self._udp_port))
-        except socket.error as err:
-            self.logger.critical(f"Error connecting to remote: {err}")
-            raise RuntimeError("Could not connect to PSU - check if on?")
+            ip_address(address)
+        except ValueError as error:
+            self.logger.warning("%s is not a valid IP address", address)
+            raise ValueError("Please use a valid IP address") from error
         else:
-            self.logger.info("Successfully connected to remote PSU")
+            self._ipaddress = address
+
+        # * Supplies in the same process share one socket per local port
+        if transport is None:
+            transport = PSU72Transport.shared(local_port, self.logger)
+        self._transport = transport
 
         # * Lock the front panel while PSU is remotely controlled
-        self._sock.send(b'LOCK1\n')
+        self._send(b'LOCK1\n')
 
-        # * 100 ms delay between sending a command and receiving the response
-        self._recv_delay = 0.1
+        # * Queries wait for the reply for up to `timeout` seconds and are
+        # * resent up to `retries` times if the datagram or reply is lost
+        self._timeout = timeout
+        self._retries = retries
 
     def __del__(self):
         self.logger.info("Closing UDP connection to remote PSU")
-        self._sock.send(b'LOCK0\n')
-        self._sock.shutdown(socket.SHUT_RDWR)
-        self._sock.close()
+        self._send(b'LOCK0\n')
+
+    def _send(self, cmd: bytes):
+        self._transport.send(self._ipaddress, cmd)
+
+    def _query(self, cmd: bytes, parse=bytes):
+        """Sends a query and waits for the reply, see `PSU72Transport.query_many`"""
+        return self._transport.query(
+            self._ipaddress, cmd, parse, self._timeout, self._retries
+        )
 
     def __get_logger(self) -> logging.Logger:
         """Sets up a `Logger` object for diagnostic and debug
@@ -113,21 +284,16 @@ class PSU72:
     @property
     def identity(self):
         cmd = b'*IDN?\n'
-        self._sock.send(cmd)
-        time.sleep(self._recv_delay)
-        response = self._sock.recv(self._buf_size)
+        response = self._query(cmd, lambda reply: reply.strip().decode())
 
-        return response.strip().decode()
+        return response
 
     @property
     def status(self):
         cmd = b'STATUS?\n'
-        self._sock.send(cmd)
-        time.sleep(self._recv_delay)
-        response = self._sock.recv(self._buf_size)
-
-        response = binascii.hexlify(response[:-1])
-        response = int(response, base=16)
+        response = self._query(
+            cmd, lambda reply: int(binascii.hexlify(reply[:-1]), base=16)
+        )
 
         if response & 0b1:
             print("Channel 1 set to Constant Voltage (CV)")
@@ -165,7 +331,7 @@ class PSU72:
     def tracking(self, new_state: int):
         if 0 <= new_state <= 2:
             cmd = f'TRACK{new_state}\n'
-            self._sock.send(cmd.encode())
+            self._send(cmd.encode())
         else:
             raise ValueError(
                 "Tracking state must be 0 (independent), 1 (series), or "
@@ -182,7 +348,7 @@ class PSU72:
             cmd = b'OUT1:1\n'
         else:
             cmd = b'OUT1:0\n'
-        self._sock.send(cmd)
+        self._send(cmd)
         self.logger.info(f"Channel 1 output set to {new_state}")
 
     @property
@@ -195,17 +361,13 @@ class PSU72:
             cmd = b'OUT2:1\n'
         else:
             cmd = b'OUT2:0\n'
-        self._sock.send(cmd)
+        self._send(cmd)
         self.logger.info(f"Channel 2 output set to {new_state}")
 
     @property
     def ch1_voltage(self) -> float:
         cmd = b'VSET1?\n'
-        self._sock.send(cmd)
-        time.sleep(self._recv_delay)
-        response = self._sock.recv(self._buf_size)
-
-        voltage = float(response.strip())
+        voltage = self._query(cmd, float)
         self.logger.info(f"Channel 1 voltage is set to {voltage} V")
 
         return voltage
@@ -213,18 +375,14 @@ class PSU72:
     @ch1_voltage.setter
     def ch1_voltage(self, new_voltage: float):
         cmd = f'VSET1:{new_voltage}\n'
-        self._sock.send(cmd.encode())
+        self._send(cmd.encode())
 
         self.logger.info(f"Channel 1 voltage set to {new_voltage} V")
 
     @property
     def ch2_voltage(self) -> float:
         cmd = b'VSET2?\n'
-        self._sock.send(cmd)
-        time.sleep(self._recv_delay)
-        response = self._sock.recv(self._buf_size)
-
-        voltage = float(response.strip())
+        voltage = self._query(cmd, float)
         self.logger.info(f"Channel 2 voltage is set to {voltage} V")
 
         return voltage
@@ -232,18 +390,14 @@ class PSU72:
     @ch2_voltage.setter
     def ch2_voltage(self, new_voltage: float):
         cmd = f'VSET2:{new_voltage}\n'
-        self._sock.send(cmd.encode())
+        self._send(cmd.encode())
 
         self.logger.info(f"Channel 2 voltage set to {new_voltage} V")
 
     @property
     def ch1_current(self) -> float:
         cmd = b'ISET1?\n'
-        self._sock.send(cmd)
-        time.sleep(self._recv_delay)
-        response = self._sock.recv(self._buf_size)
-
-        current = float(response.strip())
+        current = self._query(cmd, float)
         self.logger.info(f"Channel 1 current is set to {current} A")
 
         return current
@@ -251,18 +405,14 @@ class PSU72:
     @ch1_current.setter
     def ch1_current(self, new_current: float):
         cmd = f'ISET1:{new_current}\n'
-        self._sock.send(cmd.encode())
+        self._send(cmd.encode())
 
         self.logger.info(f"Channel 1 current set to {new_current} A")
 
     @property
     def ch2_current(self) -> float:
         cmd = b'ISET2?\n'
-        self._sock.send(cmd)
-        time.sleep(self._recv_delay)
-        response = self._sock.recv(self._buf_size)
-
-        current = float(response.strip())
+        current = self._query(cmd, float)
         self.logger.info(f"Channel 2 current is set to {current} A")
 
         return current
@@ -270,18 +420,14 @@ class PSU72:
     @ch2_current.setter
     def ch2_current(self, new_current: float):
         cmd = f'ISET2:{new_current}\n'
-        self._sock.send(cmd.encode())
+        self._send(cmd.encode())
 
         self.logger.info(f"Channel 2 current set to {new_current} A")
 
     @property
     def ch1_out_voltage(self) -> float:
         cmd = b'VOUT1?\n'
-        self._sock.send(cmd)
-        time.sleep(self._recv_delay)
-        response = self._sock.recv(self._buf_size)
-
-        out_voltage = float(response.strip())
+        out_voltage = self._query(cmd, float)
         self.logger.info(f"Channel 1 actual output voltage is {out_voltage} V")
 
         return out_voltage
@@ -289,11 +435,7 @@ class PSU72:
     @property
     def ch2_out_voltage(self) -> float:
         cmd = b'VOUT2?\n'
-        self._sock.send(cmd)
-        time.sleep(self._recv_delay)
-        response = self._sock.recv(self._buf_size)
-
-        out_voltage = float(response.strip())
+        out_voltage = self._query(cmd, float)
         self.logger.info(f"Channel 2 actual output voltage is {out_voltage} V")
 
         return out_voltage
@@ -301,11 +443,7 @@ class PSU72:
     @property
     def ch1_out_current(self) -> float:
         cmd = b'IOUT1?\n'
-        self._sock.send(cmd)
-        time.sleep(self._recv_delay)
-        response = self._sock.recv(self._buf_size)
-
-        out_current = float(response.strip())
+        out_current = self._query(cmd, float)
         self.logger.info(f"Channel 1 actual output current is {out_current} A")
 
         return out_current
@@ -313,11 +451,42 @@ class PSU72:
     @property
     def ch2_out_current(self) -> float:
         cmd = b'IOUT2?\n'
-        self._sock.send(cmd)
-        time.sleep(self._recv_delay)
-        response = self._sock.recv(self._buf_size)
-
-        out_current = float(response.strip())
+        out_current = self._query(cmd, float)
         self.logger.info(f"Channel 2 actual output current is {out_current} A")
 
         return out_current
+
+
+def read_all_outputs(psus: list) -> list:
+    """Reads the output voltage and current of both channels of every supply
+
+    Each quantity is queried on all the supplies at once, so the time taken
+    does not grow with the number of supplies.
+
+    Args:
+        psus: `PSU72` instances, all sharing the same transport
+
+    Returns:
+        A list with a (ch1 voltage, ch1 current, ch2 voltage, ch2 current)
+        tuple for each supply, in the order of `psus`
+
+    Raises:
+        ValueError: If the supplies do not share one transport
+        RuntimeError: If a supply does not respond
+    """
+    if not psus:
+        return []
+    transport = psus[0]._transport
+    if any(psu._transport is not transport for psu in psus):
+        raise ValueError("All supplies must share the same transport")
+
+    readings = [
+        transport.query_many(
+            [(psu._ipaddress, cmd, float) for psu in psus],
+            max(psu._timeout for psu in psus),
+            max(psu._retries for psu in psus),
+        )
+        for cmd in (b'VOUT1?\n', b'IOUT1?\n', b'VOUT2?\n', b'IOUT2?\n')
+    ]
+
+    return list(zip(*readings))
@@ -0,0 +1,1075 @@
+"""Simulated instruments for running the rig code without the lab hardware
+
+Provides a stand-in for `pyvisa.ResourceManager` whose resources understand
+the SCPI subset used by `equip.py`, `macro.py` and the classes in this folder
+for the N9000A CXA, R&S FSP, E4438C ESG, DSO6014A scope and PL303-P PSU, and
+a local UDP responder standing in for the 72-13330 PSU driven by
+`psu7213300.PSU72`.
+
+The ESG output is fed to the CXA input through a single-pole LED roll-off, so
+frequency response sweeps produce realistic traces and marker readings. Every
+command can be given a latency and every setting a settle time, so sweep
+throughput can be benchmarked and regression-tested on any machine, e.g.
+
+    rm = simulator.SimResourceManager(latency=0.002, settle=0.01)
+    cxa = rm.open_resource("TCPIP0::10.42.0.90::inst0::INSTR")
+    equip.init_cxa(cxa)
+
+Resources are picked by host address (`SimResourceManager.addresses`, which
+match `vlc_led_test.py`) or by the model name appearing in the resource
+string, e.g. "SIM::E4438C".
+"""
+
+import math
+import random
+import re
+import socket
+import threading
+import time
+from typing import Optional
+
+import numpy
+import pyvisa
+
+
+IDN = {
+    "N9000A": "Agilent Technologies,N9000A,SIM00001,A.14.16",
+    "E4438C": "Agilent Technologies, E4438C, SIM00002, C.05.83",
+    "DSO6014A": "AGILENT TECHNOLOGIES,DSO6014A,SIM00003,05.20",
+    "PL303-P": "THURLBY THANDAR, PL303-P, SIM00004, 3.02 - 1.00 - 1.00",
+    "FSP": "Rohde&Schwarz,FSP-7,SIM00006,4.40",
+}
+
+# * SCPI nodes which may be omitted from a header (the root nodes only at the
+# * start), and headers which are synonyms once the optional nodes are removed
+OPTIONAL_ROOTS = ("SOUR", "SENS")
+OPTIONAL_NODES = ("IMM", "LEV", "AMPL")
+ALIASES = {
+    "FREQ:CW": "FREQ",
+    "FREQ:FIX": "FREQ",
+    "OUTP:STAT": "OUTP",
+    "OUTP:MOD:STAT": "OUTP:MOD",
+    "BAND:RES": "BAND",
+    "BAND:RES:AUTO": "BAND:AUTO",
+    "BWID": "BAND",
+    "BWID:RES": "BAND",
+}
+
+UNITS = {"HZ": 1, "KHZ": 1e3, "MHZ": 1e6, "GHZ": 1e9, "DBM": 1, "DB": 1,
+         "S": 1, "MS": 1e-3, "US": 1e-6, "V": 1, "A": 1}
+
+
+def short_form(mnemonic: str) -> str:
+    """Returns the SCPI short form of a header mnemonic
+
+    Long forms are cut to four characters, or three if the fourth is a vowel.
+    A numeric suffix is kept, except the default suffix 1 which is dropped.
+    """
+    match = re.fullmatch(r"([A-Z]+)(\d*)", mnemonic)
+    if match is None:
+        return mnemonic
+    (name, suffix) = match.groups()
+    if len(name) > 4:
+        name = name[:3] if name[3] in "AEIOU" else name[:4]
+    return name + ("" if suffix == "1" else suffix)
+
+
+def header_key(header: str) -> str:
+    """Normalises a SCPI header, e.g. ':SOURce:FREQuency:CW' -> 'FREQ'"""
+    nodes = [short_form(node) for node in header.upper().strip(":").split(":")]
+    if len(nodes) > 1 and nodes[0] in OPTIONAL_ROOTS:
+        nodes = nodes[1:]
+    nodes = [node for node in nodes if node not in OPTIONAL_NODES]
+    key = ":".join(nodes)
+    return ALIASES.get(key, key)
+
+
+def number(value: str) -> float:
+    """Converts a numeric SCPI argument with an optional unit to a float"""
+    match = re.fullmatch(r"\s*([-+0-9.eE]+)\s*([A-Za-z]*)\s*", value)
+    if match is None:
+        raise ValueError(f"Not a number: {value!r}")
+    return float(match.group(1)) * UNITS.get(match.group(2).upper(), 1)
+
+
+def boolean(value: str) -> str:
+    """Returns the canonical "1" / "0" form of an ON / OFF argument"""
+    return {"ON": "1", "OFF": "0"}.get(value.strip().upper(), value.strip())
+
+
+class SimEvent:
+    """Stand-in for the event object returned by `wait_on_event`"""
+
+    def __init__(self, timed_out: bool):
+        self.timed_out = timed_out
+
+
+class SimRig:
+    """The bench the simulated instruments share
+
+    Attributes:
+        led_corner: A `float` with the -3 dB frequency, in Hz, of the
+                    single-pole LED roll-off between the ESG and the CXA.
+        link_gain: A `float` with the gain, in dB, from the ESG output to the
+                   CXA input at low frequency.
+        noise_floor: A `float` with the displayed average noise level of the
+                     CXA, in dBm.
+        noise_jitter: A `float` with the standard deviation, in dB, of the
+                      noise on each trace point.
+        sweep_time: A `float` with the CXA sweep time, in seconds.
+        harmonics: A `tuple` with the levels, in dBc, of the 2nd, 3rd, ...
+                   harmonics of the ESG tone produced by the LED.
+        load_ohms: A `float` with the load on the PSU outputs, in Ohms.
+        instruments: A `dict` of model name to the simulated resource, the
+                     most recently opened of each model.
+    """
+
+    def __init__(self, led_corner: float = 20e6, link_gain: float = -20.0,
+                 noise_floor: float = -90.0, noise_jitter: float = 1.0,
+                 sweep_time: float = 0.01, harmonics: tuple = (-40.0, -50.0),
+                 load_ohms: float = 10.0, seed: Optional[int] = 0):
+        self.led_corner = led_corner
+        self.link_gain = link_gain
+        self.noise_floor = noise_floor
+        self.noise_jitter = noise_jitter
+        self.sweep_time = sweep_time
+        self.harmonics = harmonics
+        self.load_ohms = load_ohms
+        self.random = numpy.random.default_rng(seed)
+        self.instruments = {}
+
+    def gain(self, freq: float) -> float:
+        """Gain from the ESG output to the CXA input at `freq`, in dB"""
+        return self.link_gain - 10 * math.log10(
+            1 + (freq / self.led_corner) ** 2
+        )
+
+    def tones(self, sweeps: int) -> list:
+        """(frequency, level) of the tones reaching the CXA over `sweeps`"""
+        esg = self.instruments.get("E4438C")
+        if esg is None:
+            return []
+        return [(freq, level + self.gain(freq))
+                for (freq, level) in esg.tones(sweeps, self.stepped())]
+
+    def stepped(self) -> bool:
+        """Whether the CXA trigger output steps the ESG list"""
+        cxa = self.instruments.get("N9000A")
+        return (cxa is not None
+                and cxa.state.get("TRIG:OUTP", "OFF").upper() == "HSWP")
+
+    def swept(self, sweeps: int):
+        """Passes the end of `sweeps` CXA sweeps to the ESG trigger input"""
+        esg = self.instruments.get("E4438C")
+        if esg is not None and self.stepped():
+            esg.trigger(sweeps)
+
+    def spectrum(self, freq: float, level: float) -> list:
+        """(frequency, level) of a tone reaching the CXA and its harmonics"""
+        return [(freq, level)] + [
+            (order * freq, level + dbc)
+            for (order, dbc) in enumerate(self.harmonics, 2)
+        ]
+
+
+class SimResource:
+    """Simulated VISA resource understanding the IEEE 488.2 common commands
+
+    Messages are split into commands at ";" with the SCPI rules for relative
+    headers, settings are kept in `state` keyed by `header_key`, and replies
+    to the queries of one message are joined with ";" as a real instrument
+    does. Models subclass this and add handlers for their own commands.
+
+    Attributes:
+        state: A `dict` of normalised header to the value last written.
+        latency: A `float` with the time, in seconds, taken to process each
+                 command.
+        command_latency: A `dict` of normalised header (e.g. "*RST") to the
+                         time, in seconds, taken by that command instead.
+        settle: A `float` with the time, in seconds, the instrument stays
+                busy after each setting, i.e. before *OPC completes.
+        log: A `list` of every message written, for tests.
+        registers: A `dict` of save/recall register number to the `state`
+                   saved there with *SAV.
+    """
+
+    model = ""
+    defaults = {}
+
+    def __init__(self, resource_name: str, rig: SimRig, latency: float = 0.0,
+                 settle: float = 0.0, command_latency: dict = None):
+        self.resource_name = resource_name
+        self.rig = rig
+        self.latency = latency
+        self.command_latency = command_latency or {}
+        self.settle = settle
+        self.timeout = 2000
+        self.read_termination = "\n"
+        self.write_termination = "\n"
+        self.term_chars = "\n"
+        self.session = id(self)
+        self.log = []
+        self._lock = threading.RLock()
+        self._output = bytearray()
+        self._busy_until = 0.0
+        self._opc_at = None
+        self._events = False
+        self._srq = False
+        self.esr = 0
+        self.ese = 0
+        self.sre = 0
+        self.errors = []
+        self.state = {}
+        self.registers = {}
+        self.reset()
+
+    def reset(self):
+        """*RST, returns every setting to its default"""
+        self.state = dict(self.defaults)
+
+    # * pyvisa resource interface
+
+    def write(self, message: str):
+        with self._lock:
+            self.log.append(message)
+            replies = []
+            path = []
+            for command in message.strip().split(";"):
+                command = command.strip()
+                if not command:
+                    continue
+                (header, _, args) = command.partition(" ")
+                if not header.startswith((":", "*")) and path:
+                    header = ":".join(path + [header])
+                elif not header.startswith("*"):
+                    path = header.strip(":").split(":")[:-1]
+                self._delay(header)
+                reply = self._execute(header, args.strip())
+                if reply is not None:
+                    replies.append(reply if isinstance(reply, bytes)
+                                   else str(reply).encode())
+            if replies:
+                self._output += b";".join(replies) + b"\n"
+        return len(message)
+
+    def read(self) -> str:
+        with self._lock:
+            end = self._output.find(b"\n")
+            if end < 0:
+                raise pyvisa.errors.VisaIOError(
+                    pyvisa.constants.StatusCode.error_timeout
+                )
+            data = bytes(self._output[:end + 1])
+            del self._output[:end + 1]
+        return data.decode(errors="replace").rstrip("\r\n")
+
+    def read_bytes(self, count: int) -> bytes:
+        with self._lock:
+            if len(self._output) < count:
+                raise pyvisa.errors.VisaIOError(
+                    pyvisa.constants.StatusCode.error_timeout
+                )
+            data = bytes(self._output[:count])
+            del self._output[:count]
+        return data
+
+    def query(self, message: str, delay: float = None) -> str:
+        self.write(message)
+        if delay:
+            time.sleep(delay)
+        return self.read()
+
+    def ask(self, message: str) -> str:
+        return self.query(message)
+
+    def clear(self):
+        with self._lock:
+            self._output.clear()
+
+    def close(self):
+        pass
+
+    def read_stb(self) -> int:
+        with self._lock:
+            stb = self._status_byte()
+            self._srq = False
+        return stb
+
+    def enable_event(self, event_type, mechanism, context=None):
+        self._events = True
+
+    def disable_event(self, event_type, mechanism):
+        self._events = False
+        self._srq = False
+
+    def discard_events(self, event_type, mechanism):
+        self._srq = False
+
+    def wait_on_event(self, event_type, timeout: int,
+                      capture_timeout: bool = False) -> SimEvent:
+        deadline = time.monotonic() + timeout / 1000
+        while True:
+            with self._lock:
+                self._update_status()
+                if self._srq:
+                    return SimEvent(timed_out=False)
+                wake = self._opc_at if self._opc_at is not None else deadline
+            if time.monotonic() >= deadline:
+                if capture_timeout:
+                    return SimEvent(timed_out=True)
+                raise pyvisa.errors.VisaIOError(
+                    pyvisa.constants.StatusCode.error_timeout
+                )
+            time.sleep(max(0.0, min(wake, deadline) - time.monotonic()))
+
+    # * Command processing
+
+    def _delay(self, header: str):
+        key = header_key(header.rstrip("?"))
+        latency = self.command_latency.get(key, self.latency)
+        if latency:
+            time.sleep(latency)
+
+    def _busy(self, seconds: float):
+        self._busy_until = max(self._busy_until, time.monotonic() + seconds)
+
+    def _wait_idle(self):
+        wait = self._busy_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def _update_status(self):
+        if self._opc_at is not None and time.monotonic() >= self._opc_at:
+            self._opc_at = None
+            self.esr |= 1
+        if (self.esr & self.ese) and (self.sre & 32) and self._events:
+            self._srq = True
+
+    def _status_byte(self) -> int:
+        self._update_status()
+        stb = 0
+        if self.esr & self.ese:
+            stb |= 32
+        if self._output:
+            stb |= 16
+        if stb & self.sre:
+            stb |= 64
+        return stb
+
+    def _execute(self, header: str, args: str):
+        """Runs one command, returning the reply to a query or `None`"""
+        if header.startswith("*"):
+            return self._common(header.upper(), args)
+        query = header.endswith("?")
+        key = header_key(header.rstrip("?"))
+        if query:
+            return self._query(key, args)
+        self._setting(key, args)
+        self._busy(self.settle)
+        return None
+
+    def _common(self, header: str, args: str):
+        if header == "*IDN?":
+            return IDN.get(self.model, "SIMULATOR," + self.model + ",0,0")
+        if header == "*RST":
+            self.reset()
+            self._busy(self.settle)
+        elif header == "*CLS":
+            self.esr = 0
+            self.errors = []
+            self._opc_at = None
+        elif header == "*OPC?":
+            self._wait_idle()
+            return "1"
+        elif header == "*OPC":
+            self._opc_at = max(self._busy_until, time.monotonic())
+        elif header == "*WAI":
+            self._wait_idle()
+        elif header == "*ESR?":
+            self._update_status()
+            (esr, self.esr) = (self.esr, 0)
+            return str(esr)
+        elif header == "*ESE":
+            self.ese = int(number(args))
+        elif header == "*ESE?":
+            return str(self.ese)
+        elif header == "*SRE":
+            self.sre = int(number(args))
+        elif header == "*SRE?":
+            return str(self.sre)
+        elif header == "*STB?":
+            return str(self._status_byte())
+        elif header == "*SAV":
+            self.registers[int(number(args))] = dict(self.state)
+        elif header == "*RCL":
+            register = int(number(args))
+            if register in self.registers:
+                self.state = dict(self.registers[register])
+                self._busy(self.settle)
+            else:
+                self.errors.append('-222,"Data out of range"')
+        elif header == "*TRG":
+            pass
+        else:
+            self.errors.append('-113,"Undefined header"')
+        return None
+
+    def _setting(self, key: str, args: str):
+        self.state[key] = boolean(args)
+
+    def _query(self, key: str, args: str):
+        if key == "SYST:ERR":
+            return self.errors.pop(0) if self.errors else '+0,"No error"'
+        if key in self.state:
+            return self.state[key]
+        self.errors.append('-113,"Undefined header"')
+        return None
+
+
+class SimCXA(SimResource):
+    """Simulated Keysight N9000A CXA signal analyser
+
+    Supports the frequency, level, bandwidth, marker, trace (ASCII and
+    REAL,32 binary), max hold, averaging and single sweep commands used by
+    `equip.py`. The input is the ESG output through `SimRig.gain`.
+
+    The end of every sweep is an edge on the trigger output, for the single
+    sweeps of :INIT, for the sweeps run in continuous sweep (counted from the
+    sweep time whenever a command arrives) and for the sweep in flight when
+    continuous sweep is turned off.
+    """
+
+    model = "N9000A"
+    defaults = {
+        "FREQ:CENT": 1.5e9, "FREQ:SPAN": 3e9, "DISP:WIND:TRAC:Y:RLEV": "0",
+        "BAND": "AUTO", "BAND:VID": "AUTO", "SWE:POIN": "1001",
+        "TRAC:TYPE": "WRIT", "AVER": "0", "AVER:COUN": "100",
+        "INIT:CONT": "1", "TRIG:OUTP": "OFF", "FORM": "ASC",
+        "FORM:BORD": "NORM", "POW:ATT": "10", "DISP:ENAB": "1",
+    }
+
+    def reset(self):
+        super().reset()
+        self.markers = {}
+        self._trace = None
+        self._sweeping_since = time.monotonic()
+
+    # * Continuous sweep
+
+    def _execute(self, header: str, args: str):
+        """Accounts for the continuous sweeps run since the last command"""
+        self._continuous()
+        was = self.state["INIT:CONT"]
+        reply = super()._execute(header, args)
+        if was == "1" and self.state["INIT:CONT"] != "1":
+            self.rig.swept(1)  # the sweep in flight is aborted, ending it
+        elif was != "1" and self.state["INIT:CONT"] == "1":
+            self._sweeping_since = time.monotonic()
+        return reply
+
+    def _continuous(self):
+        """Passes the ends of the continuous sweeps completed to the ESG"""
+        if self.state["INIT:CONT"] != "1":
+            return
+        sweep_time = max(self._sweep_time(), 1e-6)
+        sweeps = int((time.monotonic() - self._sweeping_since) / sweep_time)
+        if sweeps:
+            self._sweeping_since += sweeps * sweep_time
+            self.rig.swept(sweeps)
+
+    # * Frequency axis
+
+    def _span(self) -> tuple:
+        centre = float(self.state["FREQ:CENT"])
+        span = float(self.state["FREQ:SPAN"])
+        return (centre - span / 2, centre + span / 2)
+
+    def _freqs(self) -> numpy.ndarray:
+        (start, stop) = self._span()
+        return numpy.linspace(start, stop, int(number(self.state["SWE:POIN"])))
+
+    def _rbw(self) -> float:
+        if self.state["BAND"] != "AUTO":
+            return float(self.state["BAND"])
+        return max(float(self.state["FREQ:SPAN"]) / 100, 1.0)
+
+    def _sweep_time(self) -> float:
+        if "SWE:TIME" in self.state:
+            return number(self.state["SWE:TIME"])
+        return self.rig.sweep_time
+
+    # * Trace generation
+
+    def _sweep(self, sweeps: int) -> numpy.ndarray:
+        """Trace after `sweeps` sweeps with the current trace type"""
+        freqs = self._freqs()
+        rbw = self._rbw()
+        jitter = self.rig.noise_jitter
+        if self.state["AVER"] == "1":
+            jitter = jitter / math.sqrt(max(sweeps, 1))
+        noise = self.rig.noise_floor + jitter * self.rig.random.standard_normal(
+            len(freqs)
+        )
+        power = 10 ** (noise / 10)
+        tones = self.rig.tones(sweeps)
+        if self.state["TRAC:TYPE"] != "MAXH":
+            tones = tones[-1:]
+        held = numpy.full(len(freqs), -numpy.inf)
+        for (freq, level) in tones or [(None, None)]:
+            sweep = power.copy()
+            if freq is not None:
+                for (component, power_dbm) in self.rig.spectrum(freq, level):
+                    shape = numpy.exp(
+                        -4 * math.log(2) * ((freqs - component) / rbw) ** 2
+                    )
+                    sweep = sweep + 10 ** (power_dbm / 10) * shape
+            held = numpy.maximum(held, 10 * numpy.log10(sweep))
+        return held.astype("<f4")
+
+    def trace(self) -> numpy.ndarray:
+        """Trace 1 as currently displayed"""
+        if self.state["INIT:CONT"] == "1" or self._trace is None:
+            self._trace = self._sweep(1)
+        return self._trace
+
+    # * Settings
+
+    def _setting(self, key: str, args: str):
+        if key in ("FREQ:STAR", "FREQ:STOP"):
+            (start, stop) = self._span()
+            if key == "FREQ:STAR":
+                start = number(args)
+            else:
+                stop = number(args)
+            self.state["FREQ:CENT"] = (start + stop) / 2
+            self.state["FREQ:SPAN"] = max(stop - start, 0.0)
+        elif key in ("FREQ:CENT", "FREQ:SPAN", "DISP:WIND:TRAC:Y:RLEV"):
+            self.state[key] = number(args)
+        elif key in ("BAND", "BAND:VID"):
+            self.state[key] = number(args)
+        elif key in ("BAND:AUTO", "BAND:VID:AUTO"):
+            if boolean(args) == "1":
+                self.state[key.replace(":AUTO", "")] = "AUTO"
+        elif key == "INIT":
+            sweeps = 1
+            if self.state["TRAC:TYPE"] == "MAXH" or self.state["AVER"] == "1":
+                sweeps = int(number(self.state["AVER:COUN"]))
+            self._trace = self._sweep(sweeps)
+            self._busy(sweeps * self._sweep_time())
+            self.rig.swept(sweeps)
+        elif key.startswith("CALC:MARK"):
+            self._marker(key, args)
+        else:
+            super()._setting(key, args)
+
+    def _marker(self, key: str, args: str):
+        match = re.fullmatch(r"CALC:MARK(\d*):(.*)", key)
+        marker = int(match.group(1) or 1)
+        action = match.group(2)
+        trace = self.trace()
+        freqs = self._freqs()
+        if action == "X":
+            self.markers[marker] = number(args)
+        elif action in ("MAX", "MIN"):
+            index = numpy.argmax(trace) if action == "MAX" else numpy.argmin(trace)
+            self.markers[marker] = freqs[index]
+        elif action in ("MAX:NEXT", "MAX:LEFT", "MAX:RIGH"):
+            peaks = numpy.flatnonzero(
+                (trace[1:-1] > trace[:-2]) & (trace[1:-1] >= trace[2:])
+            ) + 1
+            current = self.markers.get(marker, freqs[numpy.argmax(trace)])
+            here = numpy.argmin(numpy.abs(freqs - current))
+            if action == "MAX:NEXT":
+                peaks = peaks[trace[peaks] < trace[here]]
+                peaks = peaks[numpy.argsort(trace[peaks])[::-1]]
+            elif action == "MAX:LEFT":
+                peaks = peaks[peaks < here][::-1]
+            else:
+                peaks = peaks[peaks > here]
+            if len(peaks):
+                self.markers[marker] = freqs[peaks[0]]
+        elif action == "FUNC:CENT":
+            self.state["FREQ:CENT"] = self._marker_x(marker)
+        elif action == "FUNC:REF":
+            self.state["DISP:WIND:TRAC:Y:RLEV"] = round(self._marker_y(marker), 2)
+        else:
+            self.state[key] = boolean(args)
+
+    def _peak_list(self, threshold: float, excursion: float) -> list:
+        """(frequency, amplitude) of the trace peaks, highest first
+
+        A peak is a local maximum above `threshold` which falls by at least
+        `excursion` dB on both sides before the trace rises above it again.
+        """
+        trace = self.trace()
+        freqs = self._freqs()
+        maxima = numpy.flatnonzero(
+            (trace[1:-1] > trace[:-2]) & (trace[1:-1] >= trace[2:])
+        ) + 1
+        peaks = []
+        for index in maxima:
+            level = trace[index]
+            if level < threshold:
+                continue
+            dips = []
+            for side in (trace[:index][::-1], trace[index + 1:]):
+                higher = numpy.flatnonzero(side > level)
+                if len(higher):
+                    side = side[:higher[0]]
+                dips.append(level - side.min() if len(side) else math.inf)
+            if min(dips) >= excursion:
+                peaks.append((float(freqs[index]), float(level)))
+        return sorted(peaks, key=lambda peak: peak[1], reverse=True)
+
+    def _marker_x(self, marker: int) -> float:
+        return float(self.markers.get(marker, self.state["FREQ:CENT"]))
+
+    def _marker_y(self, marker: int) -> float:
+        freqs = self._freqs()
+        index = numpy.argmin(numpy.abs(freqs - self._marker_x(marker)))
+        return float(self.trace()[index])
+
+    # * Queries
+
+    def _query(self, key: str, args: str):
+        if key in ("FREQ:STAR", "FREQ:STOP"):
+            return repr(self._span()[0 if key == "FREQ:STAR" else 1])
+        if key in ("FREQ:CENT", "FREQ:SPAN", "DISP:WIND:TRAC:Y:RLEV"):
+            return repr(float(self.state[key]))
+        if key == "BAND":
+            return repr(self._rbw())
+        if key == "SWE:TIME":
+            return repr(self._sweep_time())
+        if key in ("TRAC:DATA", "TRAC"):
+            return self._trace_data(self.trace())
+        if re.fullmatch(r"CALC:DATA\d*:PEAK", key):
+            (threshold, excursion) = [number(arg) for arg in args.split(",")[:2]]
+            peaks = self._peak_list(threshold, excursion)
+            values = [len(peaks)]
+            for (freq, level) in peaks:
+                values += [level, freq]
+            if self._binary():
+                return self._block(numpy.array(values))
+            return ",".join([str(values[0])] + [
+                "%.3f" % value if count % 2 else repr(value)
+                for (count, value) in enumerate(values[1:], 1)
+            ])
+        match = re.fullmatch(r"CALC:MARK(\d*):([XY])", key)
+        if match is not None:
+            marker = int(match.group(1) or 1)
+            if match.group(2) == "X":
+                return repr(self._marker_x(marker))
+            return repr(self._marker_y(marker))
+        return super()._query(key, args)
+
+    def _binary(self) -> bool:
+        """Whether :FORM selects REAL,32 or REAL,64 data"""
+        return self.state["FORM"].replace(" ", "").upper().startswith("REAL")
+
+    def _block(self, values: numpy.ndarray) -> bytes:
+        """`values` as an IEEE 488.2 definite length block in the :FORM"""
+        order = "<" if self.state["FORM:BORD"].upper() == "SWAP" else ">"
+        width = "f8" if self.state["FORM"].endswith("64") else "f4"
+        data = values.astype(order + width).tobytes()
+        length = str(len(data))
+        return b"#" + str(len(length)).encode() + length.encode() + data
+
+    def _trace_data(self, trace: numpy.ndarray):
+        if self._binary():
+            return self._block(trace)
+        return ",".join("%.3f" % value for value in trace)
+
+
+class SimFSP(SimCXA):
+    """Simulated R&S FSP spectrum analyser
+
+    The CXA command subset, plus the threshold line and the fixed peak search
+    (`CALC:MARK:FUNC:FPE`) of marker 1.
+    """
+
+    model = "FSP"
+
+    def reset(self):
+        super().reset()
+        self.fixed_peaks = []
+
+    def _setting(self, key: str, args: str):
+        if re.fullmatch(r"CALC:MARK\d*:FUNC:FPE", key):
+            threshold = -math.inf
+            if self.state.get("CALC:THR:STAT") == "1":
+                threshold = number(self.state["CALC:THR"])
+            excursion = number(self.state.get("CALC:MARK:PEXC", "6"))
+            peaks = self._peak_list(threshold, excursion)
+            if self.state.get("CALC:MARK:FUNC:FPE:SORT", "Y") == "X":
+                peaks = sorted(peaks)
+            self.fixed_peaks = peaks[:int(number(args))]
+        else:
+            super()._setting(key, args)
+
+    def _query(self, key: str, args: str):
+        match = re.fullmatch(r"CALC:MARK\d*:FUNC:FPE:(COUN|X|Y)", key)
+        if match is None:
+            return super()._query(key, args)
+        if match.group(1) == "COUN":
+            return str(len(self.fixed_peaks))
+        column = 0 if match.group(1) == "X" else 1
+        return ",".join(repr(peak[column]) for peak in self.fixed_peaks)
+
+
+class SimESG(SimResource):
+    """Simulated Keysight E4438C ESG vector signal generator
+
+    Supports CW frequency and level, the RF and modulation output states and
+    the :LIST frequency sweep. When the list trigger source is EXT and the
+    CXA trigger output is on, the list steps once per CXA sweep.
+
+    :INIT of a list sweep is an overlapped command, the pass stays pending
+    until its last point has been stepped through (after the dwell of every
+    point for IMM, after one trigger per point for EXT) and *OPC? waits for
+    it. A pass that cannot complete times the *OPC? query out.
+
+    Attributes:
+        pending: An `int` with the EXT triggers still needed to complete the
+                 armed list pass, 0 when no pass is pending.
+        position: An `int` with the index of the list point being output,
+                  0 when the pass is armed and one on for every trigger.
+    """
+
+    model = "E4438C"
+    defaults = {
+        "FREQ": 1e9, "POW": -135.0, "OUTP": "0", "OUTP:MOD": "1",
+        "FREQ:MODE": "CW", "POW:MODE": "FIX", "LIST:TYPE": "LIST",
+        "LIST:DWEL": "0.002", "LIST:TRIG:SOUR": "IMM", "TRIG:SOUR": "IMM",
+        "LIST:DIR": "UP", "INIT:CONT": "0",
+    }
+
+    def reset(self):
+        super().reset()
+        self.freq_list = []
+        self.pending = 0
+        self.position = 0
+        self._busy_until = 0.0
+        if self._opc_at == math.inf:
+            self._opc_at = None
+
+    def trigger(self, count: int):
+        """`count` edges on the trigger input, stepping an armed EXT pass"""
+        with self._lock:
+            if not self.pending:
+                return
+            steps = min(count, self.pending)
+            self.position = min(self.position + steps, len(self.freq_list) - 1)
+            self.pending = self.pending - steps
+            if not self.pending:
+                self._complete()
+
+    def _complete(self):
+        now = time.monotonic()
+        self.pending = 0
+        self._busy_until = now
+        if self._opc_at == math.inf:
+            self._opc_at = now
+
+    def _wait_idle(self):
+        if self._busy_until == math.inf:
+            time.sleep(self.timeout / 1000)
+            raise pyvisa.errors.VisaIOError(
+                pyvisa.constants.StatusCode.error_timeout
+            )
+        super()._wait_idle()
+
+    def _arm(self):
+        if self.state["FREQ:MODE"].upper() != "LIST" or not self.freq_list:
+            return
+        trigger = self.state["LIST:TRIG:SOUR"].upper()
+        if trigger.startswith("IMM"):
+            self._busy(len(self.freq_list) * number(self.state["LIST:DWEL"]))
+        else:
+            self.pending = len(self.freq_list)
+            self.position = 0
+            self._busy_until = math.inf
+
+    def _setting(self, key: str, args: str):
+        if key in ("FREQ", "POW"):
+            self.state[key] = number(args)
+        elif key == "LIST:FREQ":
+            self.freq_list = [number(freq) for freq in args.split(",")]
+        elif key == "INIT":
+            self._arm()
+        else:
+            super()._setting(key, args)
+            if key == "FREQ:MODE" and self.state[key].upper() != "LIST":
+                self._complete()  # leaving list mode aborts the pass
+
+    def _query(self, key: str, args: str):
+        if key in ("FREQ", "POW"):
+            return repr(float(self.state[key]))
+        if key == "LIST:FREQ":
+            return ",".join(repr(freq) for freq in self.freq_list)
+        if key == "LIST:FREQ:POIN":
+            return str(len(self.freq_list))
+        return super()._query(key, args)
+
+    def tones(self, sweeps: int, stepped: bool) -> list:
+        """(frequency, level) output during `sweeps` sweeps of the CXA"""
+        if self.state["OUTP"] != "1":
+            return []
+        level = float(self.state["POW"])
+        if self.state["FREQ:MODE"].upper() == "LIST" and self.freq_list:
+            trigger = self.state["LIST:TRIG:SOUR"].upper()
+            if trigger.startswith("IMM"):
+                freqs = self.freq_list
+            elif trigger.startswith("EXT") and stepped:
+                freqs = self.freq_list[self.position:self.position + max(sweeps, 1)]
+            else:
+                freqs = self.freq_list[self.position:self.position + 1]
+            return [(freq, level) for freq in freqs]
+        return [(float(self.state["FREQ"]), level)]
+
+
+class SimDSO(SimResource):
+    """Simulated Keysight DSO6014A oscilloscope, common commands only"""
+
+    model = "DSO6014A"
+
+
+class SimPL303(SimResource):
+    """Simulated TTi PL303-P power supply
+
+    Supports the TTi command set used by `equip.py`: V<n>, I<n>, OP<n>,
+    OPALL and the V<n>?, I<n>?, V<n>O? and I<n>O? queries. The outputs drive
+    a resistive load of `SimRig.load_ohms`.
+    """
+
+    model = "PL303-P"
+
+    def reset(self):
+        super().reset()
+        self.vset = {1: 0.0, 2: 0.0}
+        self.iset = {1: 0.0, 2: 0.0}
+        self.output = {1: False, 2: False}
+
+    def _current(self, channel: int) -> float:
+        if not self.output[channel]:
+            return 0.0
+        return min(self.iset[channel], self.vset[channel] / self.rig.load_ohms)
+
+    def _voltage(self, channel: int) -> float:
+        if not self.output[channel]:
+            return 0.0
+        return min(self.vset[channel], self._current(channel) * self.rig.load_ohms)
+
+    def _execute(self, header: str, args: str):
+        header = header.upper()
+        match = re.fullmatch(r"([VI])(\d)(O?)\?", header)
+        if match is not None:
+            (quantity, channel, output) = match.groups()
+            channel = int(channel)
+            if quantity == "V" and output:
+                return "%.2fV" % self._voltage(channel)
+            if quantity == "I" and output:
+                return "%.4fA" % self._current(channel)
+            if quantity == "V":
+                return "V%d %.2f" % (channel, self.vset[channel])
+            return "I%d %.3f" % (channel, self.iset[channel])
+        match = re.fullmatch(r"([VI])(\d)", header)
+        if match is not None:
+            target = self.vset if match.group(1) == "V" else self.iset
+            target[int(match.group(2))] = number(args)
+            self._busy(self.settle)
+            return None
+        match = re.fullmatch(r"OP(\d|ALL)", header)
+        if match is not None:
+            channels = (1, 2) if match.group(1) == "ALL" else (int(match.group(1)),)
+            for channel in channels:
+                self.output[channel] = number(args) != 0
+            self._busy(self.settle)
+            return None
+        return super()._execute(header, args)
+
+
+MODELS = {
+    "N9000A": SimCXA,
+    "E4438C": SimESG,
+    "DSO6014A": SimDSO,
+    "PL303-P": SimPL303,
+    "FSP": SimFSP,
+}
+
+
+class SimResourceManager:
+    """Stand-in for `pyvisa.ResourceManager` opening simulated instruments
+
+    Attributes:
+        addresses: A `dict` of host address (or any part of a resource
+                   string) to model name, used to pick the instrument.
+        bench: The `SimRig` shared by the instruments opened here.
+        latency: A `float` with the per-command latency, in seconds, given to
+                 every instrument.
+        settle: A `float` with the settle time, in seconds, given to every
+                instrument.
+        command_latency: A `dict` of normalised header to latency, in
+                         seconds, overriding `latency` for those commands.
+    """
+
+    addresses = {
+        "10.42.0.90": "N9000A",
+        "10.42.0.38": "E4438C",
+        "10.42.0.60": "DSO6014A",
+    }
+
+    def __init__(self, bench: SimRig = None, latency: float = 0.0,
+                 settle: float = 0.0, command_latency: dict = None,
+                 addresses: dict = None):
+        self.bench = bench if bench is not None else SimRig()
+        self.latency = latency
+        self.settle = settle
+        self.command_latency = command_latency or {}
+        if addresses is not None:
+            self.addresses = addresses
+        self.resources = {}
+
+    def _model(self, resource_name: str) -> str:
+        for (address, model) in self.addresses.items():
+            if address in resource_name.split("::"):
+                return model
+        for model in MODELS:
+            if model in resource_name.upper():
+                return model
+        raise pyvisa.errors.VisaIOError(
+            pyvisa.constants.StatusCode.error_resource_not_found
+        )
+
+    def open_resource(self, resource_name: str, **kwargs) -> SimResource:
+        model = self._model(resource_name)
+        resource = MODELS[model](
+            resource_name, self.bench, self.latency, self.settle,
+            self.command_latency,
+        )
+        for (name, value) in kwargs.items():
+            setattr(resource, name, value)
+        self.bench.instruments[model] = resource
+        self.resources[resource_name] = resource
+        return resource
+
+    def list_resources(self, query: str = "?*::INSTR") -> tuple:
+        return tuple(
+            f"TCPIP0::{address}::inst0::INSTR" for address in self.addresses
+        )
+
+    def close(self):
+        self.resources.clear()
+
+
+class SimPSU72:
+    """Local UDP stand-in for the 72-13330 power supply
+
+    Answers the datagram protocol used by `psu7213300.PSU72` from a
+    background thread. The supply listens on port 18190 of `address`, so run
+    it on a loopback address other than the one the client binds to, e.g.
+
+        with simulator.SimPSU72("127.0.0.2"):
+            psu = psu7213300.PSU72("127.0.0.2", local_port=28190)
+
+    Attributes:
+        latency: A `float` with the time, in seconds, before each reply.
+        drop: A `float` with the probability of a reply being lost.
+        load_ohms: A `float` with the resistive load on both outputs.
+        log: A `list` of every datagram received, for tests.
+    """
+
+    def __init__(self, address: str = "127.0.0.2", port: int = 18190,
+                 latency: float = 0.0, drop: float = 0.0,
+                 load_ohms: float = 10.0, seed: Optional[int] = 0):
+        self.latency = latency
+        self.drop = drop
+        self.load_ohms = load_ohms
+        self.log = []
+        self.vset = {1: 0.0, 2: 0.0}
+        self.iset = {1: 0.0, 2: 0.0}
+        self.output = {1: False, 2: False}
+        self.tracking = 0
+        self.locked = False
+        self._random = random.Random(seed)
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind((address, port))
+        self._sock.settimeout(0.1)
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        self._running = False
+        self._thread.join()
+        self._sock.close()
+
+    def _current(self, channel: int) -> float:
+        if not self.output[channel]:
+            return 0.0
+        return min(self.iset[channel], self.vset[channel] / self.load_ohms)
+
+    def _voltage(self, channel: int) -> float:
+        if not self.output[channel]:
+            return 0.0
+        return min(self.vset[channel], self._current(channel) * self.load_ohms)
+
+    def _status(self) -> int:
+        status = 0
+        for channel in (1, 2):
+            constant_voltage = self._current(channel) < self.iset[channel]
+            status |= int(constant_voltage) << (channel - 1)
+            status |= int(self.output[channel]) << (channel + 5)
+        return status | (self.tracking & 0b11) << 2
+
+    def _reply(self, command: str) -> Optional[bytes]:
+        match = re.fullmatch(r"(VSET|ISET|VOUT|IOUT)([12])\?", command)
+        if match is not None:
+            (quantity, channel) = (match.group(1), int(match.group(2)))
+            value = {"VSET": self.vset, "ISET": self.iset}.get(quantity)
+            if value is not None:
+                return b"%.2f\n" % value[channel]
+            if quantity == "VOUT":
+                return b"%.2f\n" % self._voltage(channel)
+            return b"%.3f\n" % self._current(channel)
+        if command == "*IDN?":
+            return b"TENMA 72-13330 V2.0 SIM00005\n"
+        if command == "STATUS?":
+            return bytes([self._status()]) + b"\n"
+
+        match = re.fullmatch(r"(VSET|ISET|OUT)([12]):(.+)", command)
+        if match is not None:
+            channel = int(match.group(2))
+            if match.group(1) == "OUT":
+                self.output[channel] = match.group(3).strip() == "1"
+            elif match.group(1) == "VSET":
+                self.vset[channel] = float(match.group(3))
+            else:
+                self.iset[channel] = float(match.group(3))
+        elif re.fullmatch(r"TRACK[012]", command):
+            self.tracking = int(command[-1])
+        elif re.fullmatch(r"LOCK[01]", command):
+            self.locked = command[-1] == "1"
+        return None
+
+    def _serve(self):
+        while self._running:
+            try:
+                (data, client) = self._sock.recvfrom(1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            self.log.append(data)
+            reply = self._reply(data.decode(errors="replace").strip())
+            if reply is None or self._random.random() < self.drop:
+                continue
+            if self.latency:
+                time.sleep(self.latency)
+            self._sock.sendto(reply, client)
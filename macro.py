@@ -1,107 +1,370 @@
-#-----------------------------------------------------------------------------------------------------------------------#	
-# Function: macro                               		      				                                            #
-# Purpose: contains all available test macros                                       	                                #
-# Parameters: accepts none, returns none								                                                #
-# Author: TJA														                                                    #
-# Date: 16/12/2021													                                                    #
-# Revision: A														                                                    #
-# Status: work in progress											                                                            #
-#-----------------------------------------------------------------------------------------------------------------------#
-# Measurements Available                                                                                                #
-#-----------------------------------------------------------------------------------------------------------------------#
-# Frequency Response
-# ----Measures the frequency response of an LED using the ESG (source) and CXA (sink)
-
-# Power consumption (VI) (measured on all above tests) (Completed)
-
-# Temperature (measured on all above tests) (Completed)
-#-----------------------------------------------------------------------------------------------------------------------#
-
-#imports
-import visa
-import binascii
-import csv
-import sys
-import imp
-import os
-import time
-
-#set top level directory path
-dirpath = '/home/instrument/Desktop/'
-
-#append source directory
-sys.path.append (dirpath+'vlc_rig')
-
-import equip
-import csvf
-import user
-#import levcor
-
-#-----------------------------------------------------------------------------------------------------------------------#	
-# Purpose: LED Frequency Response Test                                                  	                            #
-# Parameters:                                                                               		                    #
-# Author: TJA														                                                    #
-# Date: 16/12/2021   												                                                    #
-# Revision: A 														                                                    #
-# Status: Finished											                                                            #
-#-----------------------------------------------------------------------------------------------------------------------#
-
-def cgaint(fd_results, addr_spec_an, addr_sig_gen, addr_psu, spec_an_freq, sig_gen_freq, sig_gen_lev, psu_voltage, temp, hdrenable):
- 
- if (hdrenable == 0): # First pass of the phase noise test, place header in results file
-  user.scrn_print("Frequency Response Test Running"  ,"")
-  csvf.fappn(fd_results, "###", "Frequency Response", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")	
-  csvf.fappn(fd_results, "LNB IF (Hz)", "Signal Generator Freq", "Spec An Measured IF Noise Level (dBm)", "Thermal Noise Reference (dBm/Hz)", "Input Referred RF (Hz)", "Conversion Gain (dB)", "Upconverter LO (Hz)", "LNB LO (Hz)", "Measured Supply Voltage (V)", "Measured Supply Current (A)", "Calculated Power (W)", "Temp deg C", "", "", "", "", "", "", "", "")	 
- 
- #setup signal generator
- #output frequency and level
- equip.freq_esg(addr_sig_gen, sig_gen_freq) #Hz
- equip.lev_esg(addr_sig_gen, sig_gen_lev) #dBm
- equip.output_esg(addr_sig_gen, "ON") #Turn signal generator ON
-
-  #setup spectrum analyser
- #ref level and atten
- equip.reflev_cxa(addr_spec_an, 10)  # sets reference level high to prevent signal going outside the graticule
- equip.atten_cxa(addr_spec_an,"AUTO",0)
- #res and vid bw 
- equip.resbw_cxa(addr_spec_an,"AUTO",0) 
- equip.vidbw_cxa(addr_spec_an,"AUTO",0) 
- #set marker mode to NORMAL
- equip.mrkrmode_cxa(addr_spec_an,1,"NORMAL")
- #set spectrum analyser span to 1MHz
- equip.freqcs_cxa(addr_spec_an, int(freqc_fsp), 1000000)
-
- #peak search 
- equip.mrkrpksrch_cxa(addr_spec_an,1,"PEAK")
-
-
- #ref level
- equip.reflev_cxa(addr_spec_an, int(equip.ymrkrval_cxa(addr_spec_an, 1)) + 10) # add 10dB headroom onto the ref lev
- 
- time.sleep(1.2)
- 
- #place marker at analyser centre freq
- equip.mrkrxoffset_cxa(addr_spec_an,1,(spec_an_freq))
- 
- #video averaging ON
- #equip.average_fsp(addr_fsp,"ON",50,"VID")
-    
- #video averaging OFF
- #equip.average_fsp(spec_an_freq,,"OFF",50,"VID")
- 
- #voltage = equip.vread_pl303(addr_pl303, 1)
- #current = equip.iread_pl303(addr_pl303, 1)
- #power = voltage * current
-
-# Dummy values
- voltage = 1
- current = 0.5
- power = voltage * current
-
- #setup signal generator
- #output level
- equip.lev_esg(addr_sig_gen, -100) #dBm
- equip.output_esg(addr_sig_gen, "ON") #Turn signal generator ON
-                                                                               	                          
- csvf.fappn(fd_results, spec_an_freq, markerx_noise, markery_noise, thermal_noise, upconv_rf, conv_gain, upconv_lo, lnb_lo, voltage, current, power, temp, "", "", "", "", "", "", "","")                                 
- return (0) 
\ No newline at end of file
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Function: macro                               		      				                                            #
+# Purpose: contains all available test macros                                       	                                #
+# Parameters: accepts none, returns none								                                                #
+# Author: TJA														                                                    #
+# Date: 16/12/2021													                                                    #
+# Revision: A														                                                    #
+# Status: work in progress											                                                            #
+#-----------------------------------------------------------------------------------------------------------------------#
+# Measurements Available                                                                                                #
+#-----------------------------------------------------------------------------------------------------------------------#
+# Frequency Response
+# ----Measures the frequency response of an LED using the ESG (source) and CXA (sink)
+# ----freqresp_list: ESG hardware list sweep stepped by the CXA trigger output, one max hold acquisition
+# ----freqresp_maxhold: as freqresp_list without the trigger cable, the ESG list free runs two sweeps per point
+# ----freqresp_step: per point fallback, ESG and CXA retuned and the marker peak read at every frequency
+# ----freqresp_harm: per point, one trace fetch analysed on the host for the tone, its band power and 2f/3f harmonics
+
+# Power consumption (VI) (measured on all above tests) (Completed)
+
+# Temperature (measured on all above tests) (Completed)
+#-----------------------------------------------------------------------------------------------------------------------#
+
+#imports
+import pyvisa # changed from visa
+import binascii
+import csv
+import sys
+import importlib # changed from imp - depricated
+import os
+import time
+import numpy
+
+#set top level directory path
+dirpath = '/home/instrument/Desktop/'
+
+#append source directory
+sys.path.append (dirpath+'vlc_rig')
+
+import equip
+import csvf
+import user
+import analysis
+import autorange
+#import levcor
+
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Purpose: LED Frequency Response Test                                                  	                            #
+# Parameters:                                                                               		                    #
+# Author: TJA														                                                    #
+# Date: 16/12/2021   												                                                    #
+# Revision: A 														                                                    #
+# Status: Finished											                                                            #
+#-----------------------------------------------------------------------------------------------------------------------#
+
+def cgaint(fd_results, addr_spec_an, addr_sig_gen, addr_psu, spec_an_freq, sig_gen_freq, sig_gen_lev, psu_voltage, temp, hdrenable, store=None, ranging=None):
+ 
+ if (hdrenable == 0): # First pass of the phase noise test, place header in results file
+  user.scrn_print("Frequency Response Test Running"  ,"")
+  csvf.fappn(fd_results, "###", "Frequency Response", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")	
+  csvf.fappn(fd_results, "LNB IF (Hz)", "Signal Generator Freq", "Spec An Measured IF Noise Level (dBm/Hz)", "Thermal Noise Reference (dBm/Hz)", "Input Referred RF (Hz)", "Conversion Gain (dB)", "Upconverter LO (Hz)", "LNB LO (Hz)", "Measured Supply Voltage (V)", "Measured Supply Current (A)", "Calculated Power (W)", "Temp deg C", "", "", "", "", "", "", "", "")	 
+ 
+ #setup signal generator
+ #output frequency and level
+ equip.freq_esg(addr_sig_gen, sig_gen_freq) #Hz
+ equip.lev_esg(addr_sig_gen, sig_gen_lev) #dBm
+ equip.output_esg(addr_sig_gen, "ON") #Turn signal generator ON
+
+  #setup spectrum analyser
+ #atten coupled to the ref level, which is set by the auto ranging (pass the same ranging=autorange.new(addr_spec_an)
+ #for every point of a sweep so the ref level is predicted from the previous points)
+ equip.atten_cxa(addr_spec_an,"AUTO",0)
+ if ranging is None:
+  ranging = autorange.new(addr_spec_an)
+ #res and vid bw 
+ equip.resbw_cxa(addr_spec_an,"AUTO",0) 
+ equip.vidbw_cxa(addr_spec_an,"AUTO",0) 
+ #set spectrum analyser span to 1MHz
+ equip.freqcs_cxa(addr_spec_an, int(spec_an_freq), 1000000)
+ rbw = equip.resbwrd_cxa(addr_spec_an)
+
+ #IF tone from one trace fetch (interpolated peak within 100kHz of the analyser centre freq), re-ranged and fetched
+ #again only if the tone is outside the headroom window below the ref level
+ def read(addr):
+  (freqs, levels) = analysis.fetch_cxa(addr, 1)
+  return(analysis.tone(freqs, levels, spec_an_freq, 100000))
+ (tone_freq, tone_level) = autorange.measure(ranging, spec_an_freq, read)
+ 
+ #video averaging ON
+ #equip.average_fsp(addr_fsp,"ON",50,"VID")
+    
+ #video averaging OFF
+ #equip.average_fsp(spec_an_freq,,"OFF",50,"VID")
+ 
+ #voltage = equip.vread_pl303(addr_pl303, 1)
+ #current = equip.iread_pl303(addr_pl303, 1)
+ #power = voltage * current
+
+# Dummy values
+ voltage = 1
+ current = 0.5
+ power = voltage * current
+
+ #setup signal generator
+ #output level
+ equip.lev_esg(addr_sig_gen, -100) #dBm
+ equip.output_esg(addr_sig_gen, "ON") #Turn signal generator ON
+
+ #IF noise level at the analyser centre freq with the tone removed
+ equip.SETTLE(addr_spec_an)
+ (freqs, levels) = analysis.fetch_cxa(addr_spec_an, 1)
+ markerx_noise = spec_an_freq
+ markery_noise = analysis.noise_density(freqs, levels, spec_an_freq, 100000, rbw) # dBm/Hz
+ thermal_noise = analysis.thermal_noise(temp)
+
+ #frequency plan and gain, the IF is the difference of the RF from the signal generator and the LNB LO
+ upconv_rf = sig_gen_freq
+ upconv_lo = "" # no upconverter in this set up
+ lnb_lo = abs(sig_gen_freq - tone_freq)
+ conv_gain = tone_level - sig_gen_lev
+                                                                               	                          
+ csvf.fappn(fd_results, spec_an_freq, markerx_noise, markery_noise, thermal_noise, upconv_rf, conv_gain, upconv_lo, lnb_lo, voltage, current, power, temp, "", "", "", "", "", "", "","")                                 
+ if store is not None: # columnar store written in parallel with the results file
+  store.append_row("cgaint", {"spec_an_freq": spec_an_freq, "markerx": markerx_noise, "markery": markery_noise, "thermal_noise": thermal_noise, "upconv_rf": upconv_rf, "conv_gain": conv_gain, "lnb_lo": lnb_lo, "voltage": voltage, "current": current, "power": power, "temp": temp})
+ return (0) 
+
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Purpose: LED Frequency Response Test (hardware list sweep)                                                            #
+# Parameters: freq_list in Hz, sig_gen_lev in dBm                                                                       #
+# Author: TJA														                                                    #
+# Date: 17/10/2026   												                                                    #
+# Revision: A 														                                                    #
+# Status: development											                                                        #
+#-----------------------------------------------------------------------------------------------------------------------#
+# The whole frequency list is loaded into the ESG list sweep and the CXA sweeps across start to stop with max hold on.
+# The ESG trigger input is wired to the CXA trigger 1 output, so the ESG steps to the next list point at the end of
+# each analyser sweep and the held trace ends up with one peak per list point. The response is taken as the maximum
+# of the trace within half a step of each list frequency. Requires the trigger cable, use freqresp_step without it.
+
+def freqresp_list(fd_results, fd_captures, addr_spec_an, addr_sig_gen, freq_list, sig_gen_lev, hdrenable, store=None, journal=None, key=()):
+
+ if (hdrenable == 0):
+  user.scrn_print("Frequency Response Test Running (list sweep)"  ,"")
+  csvf.fappn(fd_results, "###", "Frequency Response", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")
+  csvf.fappn(fd_results, "Signal Generator Freq (Hz)", "Spec An Peak Freq (Hz)", "Spec An Peak Level (dBm)", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")
+
+ freq_list = numpy.sort(numpy.asarray(freq_list, dtype=float))
+ if len(freq_list) > 1:
+  window = numpy.min(numpy.diff(freq_list)) / 2
+ else:
+  window = 500000.0
+
+ #setup signal generator, list loaded in one transfer and stepped by the analyser
+ equip.listsweep_esg(addr_sig_gen, freq_list, sig_gen_lev, "EXT", 0.001)
+ equip.output_esg(addr_sig_gen, "ON")
+
+ #setup spectrum analyser to cover the whole list with max hold, stopped first so that no sweep is in flight when the
+ #list is armed (its end, or its abort by the single sweep, would step the ESG past the first point)
+ equip.cont_cxa(addr_spec_an, "OFF")
+ equip.OPCQ(addr_spec_an)
+ equip.reflev_cxa(addr_spec_an, 10)
+ equip.freqss_cxa(addr_spec_an, freq_list[0] - window, freq_list[-1] + window)
+ equip.trigout_cxa(addr_spec_an, "HSWP")
+ equip.maxhold_cxa(addr_spec_an, "ON")
+
+ #one acquisition, one analyser sweep per list point (the ESG steps at the end of every sweep), armed just before it
+ try:
+  equip.listarm_esg(addr_sig_gen)
+  equip.single_cxa(addr_spec_an, len(freq_list))
+  (safstart, safstop) = equip.freqssrd_cxa(addr_spec_an)
+  tracedata = equip.trace_cxa(addr_spec_an, 1)
+ finally:
+  equip.maxhold_cxa(addr_spec_an, "OFF")
+  equip.trigout_cxa(addr_spec_an, "OFF")
+  equip.RESUME(addr_spec_an)
+  equip.listoff_esg(addr_sig_gen)
+
+ #on resume the trace of the interrupted sweep is already in the captures
+ if journal is None or len(journal.completed(*key)) == 0:
+  csvf.fappn_trace(fd_captures, safstart, safstop, tracedata, "freqresp_list max hold")
+  if store is not None:
+   store.append_trace(safstart, safstop, tracedata, "freqresp_list max hold")
+
+ #peak of the held trace around each list frequency
+ return(freqresp_held(fd_results, freq_list, safstart, safstop, tracedata, window, store, journal, key))
+
+#-----------------------------------------------------------------------------------------------------------------------#
+# Response rows from a max hold trace, the maximum of the trace within window of each list frequency. Each row is
+# journalled as in freqresp_step (at least once, see checkpoint.py), rows journalled before a resume are not written again
+def freqresp_held(fd_results, freq_list, safstart, safstop, tracedata, window, store=None, journal=None, key=()):
+ trace_freqs = numpy.linspace(safstart, safstop, len(tracedata))
+ response = []
+ for freq in freq_list:
+  if journal is not None and journal.done(*key, float(freq)):
+   data = journal.data(*key, float(freq))
+   response.append((float(freq), data["peak_freq"], data["peak_level"]))
+   continue
+  inwindow = numpy.flatnonzero(numpy.abs(trace_freqs - freq) <= window)
+  peak = inwindow[numpy.argmax(tracedata[inwindow])]
+  (peak_freq, peak_level) = (float(trace_freqs[peak]), float(tracedata[peak]))
+  response.append((float(freq), peak_freq, peak_level))
+  csvf.fappn(fd_results, float(freq), peak_freq, peak_level, "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")
+  if store is not None:
+   store.append_row("freqresp", {"sig_gen_freq": float(freq), "peak_freq": peak_freq, "peak_level": peak_level})
+  if journal is not None:
+   journal.mark(key + (float(freq),), {"peak_freq": peak_freq, "peak_level": peak_level})
+ return(response)
+
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Purpose: LED Frequency Response Test (free running list sweep, single max hold acquisition)                           #
+# Parameters: freq_list in Hz, sig_gen_lev in dBm                                                                       #
+# Author: TJA														                                                    #
+# Date: 17/10/2026   												                                                    #
+# Revision: A 														                                                    #
+# Status: development											                                                        #
+#-----------------------------------------------------------------------------------------------------------------------#
+# As freqresp_list but without the trigger cable. The CXA is set once to cover start to stop with max hold on and the
+# ESG steps through the list on its own timer, dwelling two analyser sweeps on each point so that whatever the phase
+# between the two, every point is present for one whole analyser sweep. The response curve comes from one acquisition
+# of twice as many sweeps as list points (plus one) and one trace transfer.
+
+def freqresp_maxhold(fd_results, fd_captures, addr_spec_an, addr_sig_gen, freq_list, sig_gen_lev, hdrenable, store=None, journal=None, key=()):
+
+ if (hdrenable == 0):
+  user.scrn_print("Frequency Response Test Running (max hold)"  ,"")
+  csvf.fappn(fd_results, "###", "Frequency Response", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")
+  csvf.fappn(fd_results, "Signal Generator Freq (Hz)", "Spec An Peak Freq (Hz)", "Spec An Peak Level (dBm)", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")
+
+ freq_list = numpy.sort(numpy.asarray(freq_list, dtype=float))
+ if len(freq_list) > 1:
+  window = numpy.min(numpy.diff(freq_list)) / 2
+ else:
+  window = 500000.0
+
+ #setup spectrum analyser to cover the whole list with max hold, the sweep time sets the list dwell
+ equip.reflev_cxa(addr_spec_an, 10)
+ equip.freqss_cxa(addr_spec_an, freq_list[0] - window, freq_list[-1] + window)
+ equip.maxhold_cxa(addr_spec_an, "ON")
+ dwell = 2 * equip.SWEEPTIME(addr_spec_an)
+
+ #setup signal generator, list loaded in one transfer and stepped on its own timer
+ equip.listsweep_esg(addr_sig_gen, freq_list, sig_gen_lev, "IMM", dwell)
+ equip.output_esg(addr_sig_gen, "ON")
+
+ #one acquisition covering the whole pass through the list
+ try:
+  equip.listarm_esg(addr_sig_gen)
+  equip.single_cxa(addr_spec_an, 2 * len(freq_list) + 1)
+  (safstart, safstop) = equip.freqssrd_cxa(addr_spec_an)
+  tracedata = equip.trace_cxa(addr_spec_an, 1)
+ finally:
+  equip.maxhold_cxa(addr_spec_an, "OFF")
+  equip.RESUME(addr_spec_an)
+  equip.listoff_esg(addr_sig_gen)
+
+ #on resume the trace of the interrupted sweep is already in the captures
+ if journal is None or len(journal.completed(*key)) == 0:
+  csvf.fappn_trace(fd_captures, safstart, safstop, tracedata, "freqresp_maxhold max hold")
+  if store is not None:
+   store.append_trace(safstart, safstop, tracedata, "freqresp_maxhold max hold")
+
+ #peak of the held trace around each list frequency
+ return(freqresp_held(fd_results, freq_list, safstart, safstop, tracedata, window, store, journal, key))
+
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Purpose: LED Frequency Response Test (per point fallback)                                                             #
+# Parameters: freq_list in Hz, sig_gen_lev in dBm, span in Hz around each point                                         #
+# Author: TJA														                                                    #
+# Date: 17/10/2026   												                                                    #
+# Revision: A 														                                                    #
+# Status: development											                                                        #
+#-----------------------------------------------------------------------------------------------------------------------#
+
+def freqresp_step(fd_results, addr_spec_an, addr_sig_gen, freq_list, sig_gen_lev, span, hdrenable, store=None, journal=None, key=()):
+
+ if (hdrenable == 0):
+  user.scrn_print("Frequency Response Test Running (per point)"  ,"")
+  csvf.fappn(fd_results, "###", "Frequency Response", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")
+  csvf.fappn(fd_results, "Signal Generator Freq (Hz)", "Spec An Peak Freq (Hz)", "Spec An Peak Level (dBm)", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")
+
+ equip.lev_esg(addr_sig_gen, sig_gen_lev)
+ equip.output_esg(addr_sig_gen, "ON")
+ equip.mrkrmode_cxa(addr_spec_an,1,"NORMAL")
+
+ #marker peak, ref level predicted from the previous points
+ def read(addr):
+  equip.mrkrpksrch_cxa(addr,1,"PEAK")
+  ((peak_freq, peak_level),) = equip.mrkrvals_cxa(addr,[1])
+  return(float(peak_freq), float(peak_level))
+ ranging = autorange.new(addr_spec_an)
+
+ #points journalled before a resume (journal=checkpoint.Journal, key the position of this sweep in the outer loops)
+ #are skipped, their levels seed the ref level prediction. A point is journalled after its row is on disk, so a crash
+ #between the two measures it again on resume and its row appears twice (at least once, never lost)
+ response = []
+ if journal is not None:
+  for (point, data) in journal.completed(*key):
+   response.append((point[-1], data["peak_freq"], data["peak_level"]))
+   if not numpy.isnan(data["peak_level"]):
+    ranging["points"].append((point[-1], data["peak_level"]))
+
+ for freq in freq_list:
+  if journal is not None and journal.done(*key, freq):
+   continue
+  equip.freq_esg(addr_sig_gen, freq)
+  equip.freqcs_cxa(addr_spec_an, int(freq), span)
+  (peak_freq, peak_level) = autorange.measure(ranging, freq, read)
+  response.append((freq, peak_freq, peak_level))
+  csvf.fappn(fd_results, freq, peak_freq, peak_level, "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")
+  if store is not None:
+   store.append_row("freqresp", {"sig_gen_freq": freq, "peak_freq": peak_freq, "peak_level": peak_level})
+  if journal is not None:
+   journal.mark(key + (freq,), {"peak_freq": peak_freq, "peak_level": peak_level})
+ return(response)
+
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Purpose: LED Frequency Response and Harmonics Test (per point, one trace fetch each)                                  #
+# Parameters: freq_list in Hz, sig_gen_lev in dBm                                                                       #
+# Author: TJA														                                                    #
+# Date: 17/10/2026   												                                                    #
+# Revision: A 														                                                    #
+# Status: development											                                                        #
+#-----------------------------------------------------------------------------------------------------------------------#
+# The analyser sweeps from half the tone frequency to beyond its 3rd harmonic and the trace is fetched once per point.
+# The fundamental and the 2f and 3f harmonics are taken as the interpolated peaks within a quarter of the tone
+# frequency of each, and the tone band power is integrated over 5 RBW either side of the fundamental.
+
+def freqresp_harm(fd_results, addr_spec_an, addr_sig_gen, freq_list, sig_gen_lev, hdrenable, store=None, journal=None, key=()):
+
+ if (hdrenable == 0):
+  user.scrn_print("Frequency Response and Harmonics Test Running"  ,"")
+  csvf.fappn(fd_results, "###", "Frequency Response and Harmonics", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "")
+  csvf.fappn(fd_results, "Signal Generator Freq (Hz)", "Spec An Peak Freq (Hz)", "Spec An Peak Level (dBm)", "Tone Band Power (dBm)", "2nd Harmonic Freq (Hz)", "2nd Harmonic (dBc)", "3rd Harmonic Freq (Hz)", "3rd Harmonic (dBc)", "", "", "", "", "", "", "", "", "", "", "", "")
+
+ equip.lev_esg(addr_sig_gen, sig_gen_lev)
+ equip.output_esg(addr_sig_gen, "ON")
+
+ #trace fetch, ref level predicted from the previous points so the harmonics keep their dynamic range
+ trace = {}
+ def read(addr):
+  (trace["freqs"], trace["levels"]) = analysis.fetch_cxa(addr, 1)
+  return(analysis.tone(trace["freqs"], trace["levels"], trace["freq"], trace["freq"] / 4))
+ ranging = autorange.new(addr_spec_an)
+
+ #points journalled before a resume are skipped as in freqresp_step (at least once, see checkpoint.py)
+ response = []
+ if journal is not None:
+  for (point, data) in journal.completed(*key):
+   response.append((point[-1], data["peak_freq"], data["peak_level"], data["band_power"], data["harm2_dbc"], data["harm3_dbc"]))
+   if not numpy.isnan(data["peak_level"]):
+    ranging["points"].append((point[-1], data["peak_level"]))
+
+ for freq in freq_list:
+  if journal is not None and journal.done(*key, freq):
+   continue
+  equip.freq_esg(addr_sig_gen, freq)
+  equip.freqss_cxa(addr_spec_an, freq / 2, 3.5 * freq)
+  rbw = equip.resbwrd_cxa(addr_spec_an)
+  trace["freq"] = freq
+  (peak_freq, peak_level) = autorange.measure(ranging, freq, read)
+  (freqs, levels) = (trace["freqs"], trace["levels"])
+  band_power = analysis.band_power(freqs, levels, peak_freq - 5*rbw, peak_freq + 5*rbw, rbw)
+  ((order2, harm2_freq, harm2_level, harm2_dbc), (order3, harm3_freq, harm3_level, harm3_dbc)) = analysis.harmonics(freqs, levels, peak_freq, freq / 4)
+  response.append((freq, peak_freq, peak_level, band_power, harm2_dbc, harm3_dbc))
+  csvf.fappn(fd_results, freq, peak_freq, peak_level, band_power, harm2_freq, harm2_dbc, harm3_freq, harm3_dbc, "", "", "", "", "", "", "", "", "", "", "", "")
+  if store is not None:
+   store.append_row("freqresp_harm", {"sig_gen_freq": freq, "peak_freq": peak_freq, "peak_level": peak_level, "band_power": band_power, "harm2_freq": harm2_freq, "harm2_dbc": harm2_dbc, "harm3_freq": harm3_freq, "harm3_dbc": harm3_dbc})
+  if journal is not None:
+   journal.mark(key + (freq,), {"peak_freq": peak_freq, "peak_level": peak_level, "band_power": band_power, "harm2_dbc": harm2_dbc, "harm3_dbc": harm3_dbc})
+ return(response)
@@ -0,0 +1,346 @@
+#-----------------------------------------------------------------------------------------------------------------------#
+# Function: rigd                                                                                                        #
+# Purpose: rig daemon keeping the VISA sessions open and the instruments initialised between script runs                #
+# Parameters: accepts and returns refer to the code                                                                     #
+# Author: TJA                                                                                                           #
+# Date: 17/10/2026                                                                                                      #
+# Revision: A                                                                                                           #
+# Status: development                                                                                                   #
+#-----------------------------------------------------------------------------------------------------------------------#
+# Start the daemon once (python rigd.py, or python rigd.py --simulate to try it without the lab hardware), then scripts
+# open the instruments through it instead of through pyvisa, e.g.
+#
+#  rm = rigd.RemoteResourceManager()
+#  rig = [("spec_an", "TCPIP0::10.42.0.90::inst0::INSTR", rigd.reuse(equip.init_cxa)), ...]
+#  instruments = equip.INITALL(rm, rig, prepare)
+#  ...
+#  rigd.release(addr_spec_an)
+#
+# The daemon owns one session per resource, a script has the instrument to itself from opening it until it is closed
+# (another script opening it waits) so commands from two scripts never interleave. The messages on the Unix socket are
+# one JSON object per line. reuse() skips the init function (and its reset) when the last script to use the
+# instrument ran the same init function and released it cleanly with release(), restoring the cached settings it left;
+# after a crash the instrument is initialised again. python rigd.py --status lists the instruments the daemon holds.
+# Only the user running the daemon can use it: the socket is created with mode 0600, connections from other users are
+# refused and scripts only use a socket owned by themselves. Attributes other than the resource settings in
+# attributes cannot be read or set through it.
+#-----------------------------------------------------------------------------------------------------------------------#
+
+#imports
+import base64
+import builtins
+import functools
+import json
+import os
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import types
+import numpy
+import pyvisa
+
+import equip
+
+#socket the daemon listens on, one per user
+SOCKET_PATH = os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/tmp"), "vlc_rigd_%d.sock" %os.getuid())
+VISA_LIBRARY = "/lib/x86_64-linux-gnu/libivivisa.so"
+
+#time (s) a script opening an instrument waits for another script to release it
+owner_timeout = 600
+
+#resource methods forwarded to the daemon, other attributes are read and set on the daemon's session
+methods = ("write", "read", "read_raw", "read_bytes", "write_raw", "query", "read_stb", "clear", "assert_trigger",
+           "enable_event", "disable_event", "discard_events", "wait_on_event")
+#resource settings read and set on the daemon's session
+attributes = ("timeout", "term_chars", "read_termination", "write_termination", "chunk_size", "send_end", "query_delay")
+
+#-----------------------------------------------------------------------------------------------------------------------#
+# Purpose: Messages                                                                                                     #
+#-----------------------------------------------------------------------------------------------------------------------#
+def encode(value):
+ # JSON compatible form of the arguments and results of the resource methods
+ if isinstance(value, (bytes, bytearray)):
+  return({"bytes": base64.b64encode(bytes(value)).decode()})
+ if isinstance(value, numpy.ndarray):
+  return(value.tolist())
+ if isinstance(value, (list, tuple)):
+  return([encode(item) for item in value])
+ if isinstance(value, dict):
+  return(dict([(key, encode(item)) for (key, item) in value.items()]))
+ if hasattr(value, "timed_out"): # wait_on_event response
+  return({"event": {"timed_out": bool(value.timed_out)}})
+ return(value)
+#-----------------------------------------------------------------------------------------------------------------------#
+def decode(value):
+ if isinstance(value, list):
+  return([decode(item) for item in value])
+ if isinstance(value, dict):
+  if "bytes" in value and len(value) == 1:
+   return(base64.b64decode(value["bytes"]))
+  if "event" in value and len(value) == 1:
+   return(types.SimpleNamespace(**value["event"]))
+  return(dict([(key, decode(item)) for (key, item) in value.items()]))
+ return(value)
+#-----------------------------------------------------------------------------------------------------------------------#
+def raise_error(reply):
+ # Raises the exception the daemon caught, as the same type for VISA and built in errors
+ if reply.get("code") is not None:
+  raise pyvisa.errors.VisaIOError(reply["code"])
+ error = getattr(builtins, reply["error"], None)
+ if isinstance(error, type) and issubclass(error, Exception):
+  raise error(reply["message"])
+ raise RuntimeError("%s: %s" %(reply["error"], reply["message"]))
+#-----------------------------------------------------------------------------------------------------------------------#
+# Purpose: Daemon                                                                                                       #
+#-----------------------------------------------------------------------------------------------------------------------#
+class Rig:
+ # Sessions held by the daemon by resource name, each with the lock held by the script using it and its status (the
+ # init function run, *IDN? reply and the state left by the last script)
+ def __init__(self, rm):
+  self.rm = rm
+  self.lock = threading.Lock()
+  self.instruments = {}
+
+ def instrument(self, resource_name):
+  with self.lock:
+   if resource_name not in self.instruments:
+    self.instruments[resource_name] = {"name": resource_name, "session": None, "owner": threading.Lock(), "status": {}}
+   return(self.instruments[resource_name])
+
+ def close(self):
+  for instrument in self.instruments.values():
+   if instrument["session"] is not None:
+    instrument["session"].close()
+  return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def dispatch(rig, instrument, request):
+ # Runs one request of a connection, returns the instrument the connection holds afterwards and the result
+ op = request["op"]
+ if op == "rig":
+  return(instrument, dict([(name, held["status"]) for (name, held) in rig.instruments.items()]))
+ if op == "open":
+  if instrument is not None:
+   raise RuntimeError("connection already holds %s" %instrument["name"])
+  opening = rig.instrument(request["resource"])
+  if not opening["owner"].acquire(timeout=request.get("timeout", owner_timeout)):
+   raise TimeoutError("%s is in use by another script" %request["resource"])
+  try:
+   if opening["session"] is None:
+    opening["session"] = rig.rm.open_resource(request["resource"])
+  except BaseException:
+   opening["owner"].release()
+   raise
+  status = dict(opening["status"])
+  opening["status"].pop("state", None) # handed to this script, given back by a clean release
+  return(opening, status)
+ if instrument is None:
+  raise RuntimeError("no instrument open on this connection")
+ session = instrument["session"]
+ if op == "call":
+  if request["method"] not in methods:
+   raise AttributeError("%s cannot be called through the rig daemon" %request["method"])
+  return(instrument, getattr(session, request["method"])(*decode(request.get("args", [])), **decode(request.get("kwargs", {}))))
+ if op in ("get", "set") and request["name"] not in attributes:
+  raise AttributeError("%s cannot be accessed through the rig daemon" %request["name"])
+ if op == "get":
+  return(instrument, getattr(session, request["name"]))
+ if op == "set":
+  setattr(session, request["name"], decode(request["value"]))
+  return(instrument, None)
+ if op == "status":
+  instrument["status"].update(request.get("status", {}))
+  return(instrument, instrument["status"])
+ if op == "close":
+  instrument["owner"].release()
+  return(None, None)
+ raise ValueError("unknown rig daemon request %s" %op)
+#-----------------------------------------------------------------------------------------------------------------------#
+class Handler(socketserver.StreamRequestHandler):
+ # One connection per open resource, served on its own thread
+ def handle(self):
+  instrument = None
+  try:
+   for line in self.rfile:
+    try:
+     (instrument, result) = dispatch(self.server.rig, instrument, json.loads(line))
+     reply = json.dumps({"result": encode(result)})
+    except Exception as error:
+     reply = json.dumps({"error": type(error).__name__, "message": str(error), "code": getattr(error, "error_code", None)})
+    self.wfile.write((reply + "\n").encode())
+    self.wfile.flush()
+  finally:
+   if instrument is not None: # script gone without closing, its state is unknown
+    instrument["owner"].release()
+#-----------------------------------------------------------------------------------------------------------------------#
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+ daemon_threads = True
+
+ def verify_request(self, request, client_address):
+  # Connections from the user running the daemon (or root) only
+  credentials = request.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+  (pid, uid, gid) = struct.unpack("3i", credentials)
+  return(uid in (0, os.getuid()))
+#-----------------------------------------------------------------------------------------------------------------------#
+def serve(rm, socket_path=SOCKET_PATH):
+ # Serves the sessions of rm on socket_path until interrupted, a socket left by a daemon which is no longer running is
+ # replaced
+ if running(socket_path):
+  raise RuntimeError("a rig daemon is already running on %s" %socket_path)
+ if os.path.exists(socket_path):
+  os.unlink(socket_path)
+ umask = os.umask(0o177) # socket created with mode 0600
+ try:
+  server = Server(socket_path, Handler)
+ finally:
+  os.umask(umask)
+ server.rig = Rig(rm)
+ try:
+  server.serve_forever()
+ finally:
+  server.server_close()
+  server.rig.close()
+  if os.path.exists(socket_path):
+   os.unlink(socket_path)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+# Purpose: Scripts                                                                                                      #
+#-----------------------------------------------------------------------------------------------------------------------#
+class RemoteResource:
+ # Stands in for a pyvisa resource, every call is run on the daemon's session. daemon_status is what the daemon
+ # knew of the instrument when it was opened
+ def __init__(self, socket_path, resource_name, timeout=owner_timeout):
+  connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  connection.connect(socket_path)
+  object.__setattr__(self, "connection", connection)
+  object.__setattr__(self, "stream", connection.makefile('rwb'))
+  object.__setattr__(self, "resource_name", resource_name)
+  object.__setattr__(self, "daemon_status", self.request({"op": "open", "resource": resource_name, "timeout": timeout}))
+
+ def request(self, request):
+  self.stream.write((json.dumps(request) + "\n").encode())
+  self.stream.flush()
+  line = self.stream.readline()
+  if not line:
+   raise ConnectionError("rig daemon closed the connection")
+  reply = json.loads(line)
+  if "error" in reply:
+   raise_error(reply)
+  return(decode(reply["result"]))
+
+ def call(self, method, *args, **kwargs):
+  return(self.request({"op": "call", "method": method, "args": encode(args), "kwargs": encode(kwargs)}))
+
+ def __getattr__(self, attribute):
+  if attribute in methods:
+   return(functools.partial(self.call, attribute))
+  if attribute.startswith("_"):
+   raise AttributeError(attribute)
+  return(self.request({"op": "get", "name": attribute}))
+
+ def __setattr__(self, attribute, value):
+  self.request({"op": "set", "name": attribute, "value": encode(value)})
+
+ def save_status(self, status):
+  # Updates what the daemon keeps for the next script to open the instrument
+  return(self.request({"op": "status", "status": status}))
+
+ def close(self):
+  if self.connection.fileno() != -1:
+   try:
+    self.request({"op": "close"})
+   finally:
+    self.stream.close()
+    self.connection.close()
+  return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+class RemoteResourceManager:
+ # Stands in for pyvisa.ResourceManager, opening the instruments through the daemon on socket_path
+ def __init__(self, socket_path=SOCKET_PATH, timeout=owner_timeout):
+  self.socket_path = socket_path
+  self.timeout = timeout
+
+ def open_resource(self, resource_name, **kwargs):
+  resource = RemoteResource(self.socket_path, resource_name, self.timeout)
+  for (name, value) in kwargs.items():
+   setattr(resource, name, value)
+  return(resource)
+
+ def rig(self):
+  # Status of every instrument the daemon holds, by resource name
+  connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+  connection.connect(self.socket_path)
+  with connection, connection.makefile('rwb') as stream:
+   stream.write((json.dumps({"op": "rig"}) + "\n").encode())
+   stream.flush()
+   reply = json.loads(stream.readline())
+  if "error" in reply:
+   raise_error(reply)
+  return(reply["result"])
+
+ def close(self):
+  return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def running(socket_path=SOCKET_PATH):
+ # True if a daemon is listening on socket_path, a socket owned by another user is not used
+ if not os.path.exists(socket_path) or os.stat(socket_path).st_uid != os.getuid():
+  return(False)
+ connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+ try:
+  connection.connect(socket_path)
+ except OSError:
+  return(False)
+ finally:
+  connection.close()
+ return(True)
+#-----------------------------------------------------------------------------------------------------------------------#
+def reuse(init):
+ # Wraps an equip init function: an instrument the daemon holds initialised by the same function and released
+ # cleanly is not initialised (reset) again, the settings cached by the last script are restored instead
+ def attach(addr):
+  status = getattr(addr, "daemon_status", None)
+  if status is not None and status.get("init") == init.__name__ and "state" in status:
+   equip.LOADSTATE(addr, status["state"])
+   return(status["idn"])
+  idn = init(addr)
+  if status is not None:
+   addr.save_status({"init": init.__name__, "idn": idn})
+  return(idn)
+ attach.__name__ = init.__name__
+ return(attach)
+#-----------------------------------------------------------------------------------------------------------------------#
+def release(addr):
+ # Closes an instrument, leaving the daemon what equip knows of its settings for the next script
+ if getattr(addr, "daemon_status", None) is not None:
+  addr.save_status({"state": equip.SAVESTATE(addr)})
+ addr.close()
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+
+#run the daemon
+if __name__ == "__main__":
+ import argparse
+ parser = argparse.ArgumentParser(description="VLC rig daemon, keeps the instrument sessions open between runs")
+ parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket to listen on")
+ parser.add_argument("--simulate", action="store_true", help="serve the simulated instruments (instruments/simulator.py)")
+ parser.add_argument("--status", action="store_true", help="list the instruments held by the running daemon and exit")
+ args = parser.parse_args()
+ if args.status:
+  for (name, status) in RemoteResourceManager(args.socket).rig().items():
+   print(name, status.get("idn", ""), "(initialised by %s)" %status["init"] if "init" in status else "")
+  sys.exit(0)
+ if args.simulate:
+  sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "instruments"))
+  import simulator
+  rm = simulator.SimResourceManager()
+ else:
+  import pyvisa
+  rm = pyvisa.ResourceManager(VISA_LIBRARY)
+ print("Rig daemon listening on", args.socket)
+ try:
+  serve(rm, args.socket)
+ except RuntimeError as error:
+  sys.exit(str(error))
+ except KeyboardInterrupt:
+  pass
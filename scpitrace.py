@@ -0,0 +1,257 @@
+#-----------------------------------------------------------------------------------------------------------------------#
+# Function: scpitrace                                                                                                   #
+# Purpose: opt-in per command SCPI timing tracer for equip, macro and the instruments classes                           #
+# Parameters: accepts and returns refer to the code                                                                     #
+# Author: TJA                                                                                                           #
+# Date: 17/10/2026                                                                                                      #
+# Revision: A                                                                                                           #
+# Status: development                                                                                                   #
+#-----------------------------------------------------------------------------------------------------------------------#
+# Usage:
+#  rm = scpitrace.wrap_rm(pyvisa.ResourceManager())   # every resource opened from rm is traced
+#  addr = scpitrace.wrap_resource(addr)               # or trace a single resource already open
+#  scpitrace.enable()                                 # also time OPCQ, time.sleep and the PSU72 datagrams
+#  ... run the test ...
+#  scpitrace.export_json("trace.json"); scpitrace.export_csv("trace.csv")
+#
+# One record is kept per message written: instrument, SCPI header(s), bytes sent and received, time writing and
+# reading the reply, and the time spent in the OPCQ and time.sleep calls that follow it before the next message to the
+# same instrument (sleeps are charged to the last message sent from the same thread). Messages written by OPCQ itself
+# are recorded but do not take over the charging. stats() aggregates the records per instrument and header.
+#-----------------------------------------------------------------------------------------------------------------------#
+
+#imports
+import csv
+import json
+import sys
+import threading
+import time
+import numpy
+
+#records of the messages written while tracing
+records = []
+lock = threading.RLock()
+current = {} # instrument name -> record charged with its OPCQ time
+state = {"patches": []}
+local = threading.local() # per thread: last record sent (charged with time.sleep) and OPCQ nesting depth
+
+#modules whose time.sleep calls are charged to the last message, and the instrument classes' modules
+sleep_modules = ("equip", "macro", "e4438c", "n9000a", "psu7213300")
+
+#-----------------------------------------------------------------------------------------------------------------------#
+def header(message):
+ # SCPI header(s) of a message without the parameters, e.g. ":FREQ:CENT 1e6;:FREQ:SPAN 2e6" -> ":FREQ:CENT;:FREQ:SPAN"
+ return(";".join([command.split()[0] for command in message.split(";") if command.strip()]))
+#-----------------------------------------------------------------------------------------------------------------------#
+def opc_depth():
+ return(getattr(local, "opc_depth", 0))
+#-----------------------------------------------------------------------------------------------------------------------#
+def begin(instrument, command, nbytes):
+ record = {"instrument": instrument, "header": command, "bytes_sent": nbytes, "bytes_received": 0,
+           "time": time.time(), "write_s": 0.0, "read_s": 0.0, "opc_s": 0.0, "sleep_s": 0.0}
+ with lock:
+  records.append(record)
+  if opc_depth() == 0:
+   current[instrument] = record
+   local.last = record
+ return(record)
+#-----------------------------------------------------------------------------------------------------------------------#
+def received(instrument, nbytes, seconds):
+ with lock:
+  record = current.get(instrument)
+  if record is not None and opc_depth() == 0:
+   record["bytes_received"] += nbytes
+   record["read_s"] += seconds
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+class TracedResource:
+ # Wraps a pyvisa resource, everything other than the I/O calls is passed straight through
+ def __init__(self, resource, name=None):
+  object.__setattr__(self, "resource", resource)
+  object.__setattr__(self, "name", name or getattr(resource, "resource_name", repr(resource)))
+
+ def __getattr__(self, attribute):
+  return(getattr(self.resource, attribute))
+
+ def __setattr__(self, attribute, value):
+  setattr(self.resource, attribute, value)
+
+ def write(self, message, *args, **kwargs):
+  timestore = time.perf_counter()
+  record = begin(self.name, header(message), len(message))
+  result = self.resource.write(message, *args, **kwargs)
+  record["write_s"] += time.perf_counter() - timestore
+  return(result)
+
+ def read(self, *args, **kwargs):
+  timestore = time.perf_counter()
+  response = self.resource.read(*args, **kwargs)
+  received(self.name, len(response), time.perf_counter() - timestore)
+  return(response)
+
+ def read_bytes(self, count, *args, **kwargs):
+  timestore = time.perf_counter()
+  response = self.resource.read_bytes(count, *args, **kwargs)
+  received(self.name, len(response), time.perf_counter() - timestore)
+  return(response)
+
+ def read_raw(self, *args, **kwargs):
+  timestore = time.perf_counter()
+  response = self.resource.read_raw(*args, **kwargs)
+  received(self.name, len(response), time.perf_counter() - timestore)
+  return(response)
+
+ def query(self, message, delay=None):
+  self.write(message)
+  if delay:
+   sleep(delay)
+  return(self.read())
+
+ def ask(self, message):
+  return(self.query(message))
+#-----------------------------------------------------------------------------------------------------------------------#
+class TracedResourceManager:
+ # Wraps a pyvisa ResourceManager so every resource it opens is traced
+ def __init__(self, rm):
+  self.rm = rm
+
+ def __getattr__(self, attribute):
+  return(getattr(self.rm, attribute))
+
+ def open_resource(self, resource_name, *args, **kwargs):
+  return(TracedResource(self.rm.open_resource(resource_name, *args, **kwargs), resource_name))
+#-----------------------------------------------------------------------------------------------------------------------#
+def wrap_resource(resource, name=None):
+ return(TracedResource(resource, name))
+#-----------------------------------------------------------------------------------------------------------------------#
+def wrap_rm(rm):
+ return(TracedResourceManager(rm))
+#-----------------------------------------------------------------------------------------------------------------------#
+def sleep(seconds):
+ timestore = time.perf_counter()
+ time.sleep(seconds)
+ with lock:
+  record = getattr(local, "last", None)
+  if record is not None and opc_depth() == 0:
+   record["sleep_s"] += time.perf_counter() - timestore
+ return(None)
+#-----------------------------------------------------------------------------------------------------------------------#
+class SleepProxy:
+ # Stands in for the time module of the traced modules so their time.sleep calls are charged
+ def sleep(self, seconds):
+  return(sleep(seconds))
+
+ def __getattr__(self, attribute):
+  return(getattr(time, attribute))
+#-----------------------------------------------------------------------------------------------------------------------#
+def traced_opcq(opcq):
+ def OPCQ(addr):
+  timestore = time.perf_counter()
+  local.opc_depth = opc_depth() + 1
+  try:
+   return(opcq(addr))
+  finally:
+   local.opc_depth -= 1
+   with lock:
+    record = current.get(getattr(addr, "name", getattr(addr, "resource_name", repr(addr))))
+    if record is not None and opc_depth() == 0:
+     record["opc_s"] += time.perf_counter() - timestore
+ return(OPCQ)
+#-----------------------------------------------------------------------------------------------------------------------#
+def traced_psu72(transport_class):
+ # PSU72 datagrams, one record per command sent to each supply
+ send = transport_class.send
+ query_many = transport_class.query_many
+
+ def traced_send(self, address, cmd):
+  timestore = time.perf_counter()
+  # the 72-13330 separates the value with a colon, e.g. VSET1:12.0
+  record = begin("PSU72 %s" %address, cmd.decode(errors="replace").strip().split(":")[0], len(cmd))
+  send(self, address, cmd)
+  record["write_s"] += time.perf_counter() - timestore
+
+ def traced_query_many(self, requests, *args, **kwargs):
+  timestore = time.perf_counter()
+  responses = query_many(self, requests, *args, **kwargs)
+  seconds = time.perf_counter() - timestore
+  for ((address, cmd, parse), response) in zip(requests, responses):
+   received("PSU72 %s" %address, len(str(response)), seconds)
+  return(responses)
+
+ return({"send": traced_send, "query_many": traced_query_many})
+#-----------------------------------------------------------------------------------------------------------------------#
+def enable():
+ # Times OPCQ, the time.sleep calls of the traced modules and the PSU72 datagrams, for modules already imported
+ if state["patches"]:
+  return(0)
+ patches = []
+ for name in sleep_modules:
+  module = sys.modules.get(name)
+  if module is not None and getattr(module, "time", None) is time:
+   patches.append((module, "time", SleepProxy()))
+ if "equip" in sys.modules:
+  patches.append((sys.modules["equip"], "OPCQ", traced_opcq(sys.modules["equip"].OPCQ)))
+ if "psu7213300" in sys.modules:
+  transport_class = sys.modules["psu7213300"].PSU72Transport
+  for (attribute, method) in traced_psu72(transport_class).items():
+   patches.append((transport_class, attribute, method))
+ for (owner, attribute, value) in patches:
+  state["patches"].append((owner, attribute, getattr(owner, attribute)))
+  setattr(owner, attribute, value)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def disable():
+ for (owner, attribute, value) in reversed(state["patches"]):
+  setattr(owner, attribute, value)
+ state["patches"] = []
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def reset():
+ with lock:
+  records.clear()
+  current.clear()
+  local.last = None
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def stats():
+ # Aggregates per instrument and header, most total time first. Times are per message in seconds, total_s being
+ # write + read + OPCQ + sleep
+ groups = {}
+ with lock:
+  for record in records:
+   groups.setdefault((record["instrument"], record["header"]), []).append(record)
+ rows = []
+ for ((instrument, command), group) in groups.items():
+  total = numpy.array([record["write_s"] + record["read_s"] + record["opc_s"] + record["sleep_s"] for record in group])
+  rows.append({"instrument": instrument, "header": command, "count": len(group),
+               "total_s": float(total.sum()), "p50_s": float(numpy.percentile(total, 50)),
+               "p95_s": float(numpy.percentile(total, 95)), "max_s": float(total.max()),
+               "write_s": sum([record["write_s"] for record in group]),
+               "read_s": sum([record["read_s"] for record in group]),
+               "opc_s": sum([record["opc_s"] for record in group]),
+               "sleep_s": sum([record["sleep_s"] for record in group]),
+               "bytes_sent": sum([record["bytes_sent"] for record in group]),
+               "bytes_received": sum([record["bytes_received"] for record in group])})
+ rows.sort(key=lambda row: row["total_s"], reverse=True)
+ return(rows)
+#-----------------------------------------------------------------------------------------------------------------------#
+def export_json(filename, raw=False):
+ # raw=True also writes every record
+ report = {"commands": stats()}
+ if raw:
+  with lock:
+   report["records"] = list(records)
+ with open(filename, 'w') as json_file:
+  json.dump(report, json_file, indent=1)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def export_csv(filename):
+ rows = stats()
+ fields = ["instrument", "header", "count", "total_s", "p50_s", "p95_s", "max_s", "write_s", "read_s", "opc_s",
+           "sleep_s", "bytes_sent", "bytes_received"]
+ with open(filename, 'w', newline='') as csvfile:
+  filewriter = csv.DictWriter(csvfile, fieldnames=fields)
+  filewriter.writeheader()
+  filewriter.writerows(rows)
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
@@ -0,0 +1,158 @@
+#-----------------------------------------------------------------------------------------------------------------------#
+# Function: sweepplan                                                                                                   #
+# Purpose: orders nested sweeps so the slow settings (chamber temperature, supply voltage) change as little as possible #
+# Parameters: accepts and returns refer to the code                                                                     #
+# Author: TJA                                                                                                           #
+# Date: 17/10/2026                                                                                                      #
+# Revision: A                                                                                                           #
+# Status: development                                                                                                   #
+#-----------------------------------------------------------------------------------------------------------------------#
+# Each axis of the sweep is given with the time it takes to change it, a fixed part (soak, settle) plus a part per unit
+# of the change (chamber ramp rate, in s per degree), e.g.
+#
+#  plan = sweepplan.plan([sweepplan.axis("temp", temp_list, fixed=1800, rate=60),
+#                         sweepplan.axis("psu", psu_list, fixed=2),
+#                         sweepplan.axis("freq", freq_list, fixed=0.01)], point_time=0.25, innermost="freq")
+#  sweepplan.report(plan)
+#  for (setting, freqs) in sweepplan.sweeps(plan, "freq"):
+#   ... set setting["temp"] and setting["psu"], sweep freqs ...
+#
+# Every nesting order of the axes is tried, each with the inner axes run in serpentine order (reversed on every other
+# pass so an axis carries on from where it ended rather than jumping back to its start) and in plain order, and the
+# order with the least predicted time is used. Costs can be taken from a previous run's SCPI trace with trace_cost,
+# e.g. fixed=sweepplan.trace_cost(fn, "FREQ") for the ESG frequency changes.
+#-----------------------------------------------------------------------------------------------------------------------#
+
+#imports
+import csv
+import itertools
+
+import user
+
+#orders tried exhaustively up to this many axes, beyond it the costliest axis is put outermost
+max_permuted = 6
+
+#-----------------------------------------------------------------------------------------------------------------------#
+def axis(name, values, fixed=0.0, rate=0.0):
+ # An axis of the sweep, changing it from value a to b takes fixed + rate*abs(b - a) seconds (fixed only for the first
+ # setting), values are swept in the order given (or its reverse)
+ return({"name": name, "values": list(values), "fixed": fixed, "rate": rate})
+#-----------------------------------------------------------------------------------------------------------------------#
+def change_time(sweep_axis, previous, value):
+ if previous is None:
+  return(sweep_axis["fixed"])
+ return(sweep_axis["fixed"] + sweep_axis["rate"] * abs(value - previous))
+#-----------------------------------------------------------------------------------------------------------------------#
+def mean_change_time(sweep_axis):
+ # Average time of a change between neighbouring values, used to rank the axes
+ values = sweep_axis["values"]
+ if len(values) < 2:
+  return(sweep_axis["fixed"])
+ steps = [abs(values[count + 1] - values[count]) for count in range(len(values) - 1)]
+ return(sweep_axis["fixed"] + sweep_axis["rate"] * sum(steps) / len(steps))
+#-----------------------------------------------------------------------------------------------------------------------#
+def order_points(axes, serpentine):
+ # Points of the nested sweep, outermost axis first in each tuple
+ points = [()]
+ for sweep_axis in axes:
+  nested = []
+  for (count, point) in enumerate(points):
+   if serpentine and count % 2:
+    values = sweep_axis["values"][::-1]
+   else:
+    values = sweep_axis["values"]
+   nested.extend([point + (value,) for value in values])
+  points = nested
+ return(points)
+#-----------------------------------------------------------------------------------------------------------------------#
+def transitions(axes, points):
+ # Number of changes and the time they take for each axis, walking the points in order
+ changes = dict([(sweep_axis["name"], [0, 0.0]) for sweep_axis in axes])
+ previous = None
+ for point in points:
+  for (index, sweep_axis) in enumerate(axes):
+   if previous is None or previous[index] != point[index]:
+    change = changes[sweep_axis["name"]]
+    change[0] = change[0] + 1
+    change[1] = change[1] + change_time(sweep_axis, None if previous is None else previous[index], point[index])
+  previous = point
+ return(changes)
+#-----------------------------------------------------------------------------------------------------------------------#
+def plan(axes, point_time=0.0, innermost=None, serpentine=None):
+ # Lowest predicted time execution order of the sweep. point_time is the time of the measurement at each point,
+ # innermost names an axis which must stay innermost (e.g. the frequency axis of a sweep macro) and serpentine
+ # forces the serpentine (True) or plain (False) order instead of trying both. Returns a dict of the axis names
+ # outermost first, the points in execution order, changes per axis and the predicted duration (s)
+ ranked = sorted(axes, key=mean_change_time, reverse=True)
+ if len(axes) <= max_permuted:
+  orders = itertools.permutations(ranked)
+ else:
+  orders = [ranked]
+ if serpentine is None:
+  styles = (True, False)
+ else:
+  styles = (serpentine,)
+ best = None
+ for order in orders:
+  if innermost is not None and order[-1]["name"] != innermost and innermost in [sweep_axis["name"] for sweep_axis in axes]:
+   continue
+  for style in styles:
+   points = order_points(order, style)
+   changes = transitions(order, points)
+   duration = point_time * len(points) + sum([change[1] for change in changes.values()])
+   if best is None or duration < best["duration"]:
+    best = {"axes": [sweep_axis["name"] for sweep_axis in order], "serpentine": style, "points": points,
+            "changes": changes, "point_time": point_time, "duration": duration}
+ return(best)
+#-----------------------------------------------------------------------------------------------------------------------#
+def sweeps(plan, inner):
+ # Splits the plan into runs of the inner axis: yields (setting, values), setting being a dict of the other axes'
+ # values and values the inner axis values in execution order (None if the plan has no inner axis, one per point)
+ if inner not in plan["axes"]:
+  for point in plan["points"]:
+   yield(dict(zip(plan["axes"], point)), None)
+  return
+ index = plan["axes"].index(inner)
+ setting = None
+ values = []
+ for point in plan["points"]:
+  current = dict([(name, value) for (name, value) in zip(plan["axes"], point) if name != inner])
+  if setting is not None and current != setting:
+   yield(setting, values)
+   values = []
+  setting = current
+  values.append(point[index])
+ if setting is not None:
+  yield(setting, values)
+#-----------------------------------------------------------------------------------------------------------------------#
+def hms(seconds):
+ seconds = int(round(seconds))
+ return("%d:%02d:%02d" %(seconds // 3600, (seconds // 60) % 60, seconds % 60))
+#-----------------------------------------------------------------------------------------------------------------------#
+def report(plan):
+ # Echoes the sweep order and predicted duration to the screen before the run starts
+ order = " > ".join(plan["axes"])
+ if plan["serpentine"]:
+  order = order + " (serpentine)"
+ user.scrn_print("Sweep order (outermost first)", order)
+ for name in plan["axes"]:
+  (count, seconds) = plan["changes"][name]
+  user.scrn_print("%s changes, time" %name, "%d, %s" %(count, hms(seconds)))
+ user.scrn_print("Measurement points, time", "%d, %s" %(len(plan["points"]), hms(plan["point_time"] * len(plan["points"]))))
+ user.scrn_print("Predicted run duration", hms(plan["duration"]))
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+def trace_cost(csvfn, header, instrument=None):
+ # Mean time (s) per message with the SCPI header from the statistics written by scpitrace.export_csv, e.g.
+ # trace_cost(fn, "FREQ") for the ESG frequency change, None if the trace has no such message
+ total = 0.0
+ count = 0
+ with open(csvfn, newline='') as csvfile:
+  for row in csv.DictReader(csvfile):
+   if row["header"].split(";")[0] == header and (instrument is None or row["instrument"] == instrument):
+    total = total + float(row["total_s"])
+    count = count + int(row["count"])
+ if count == 0:
+  return(None)
+ return(total / count)
+#-----------------------------------------------------------------------------------------------------------------------#
@@ -1,223 +1,328 @@
-#-----------------------------------------------------------------------------------------------------------------------#	
-# Function: vlc_led_test               							      				                                    #
-# Purpose: VLC LED Test Script                                                 	                               		    #
-# Parameters: 										                                                                    #
-# Author: TJA														                                                    #
-# Date: 06/12/2021													                                                    #
-# Revision: A														                                                    #
-# Status: In development											                                                    #
-#-----------------------------------------------------------------------------------------------------------------------#
-
-#imports
-import pyvisa # available changed from visa
-import binascii # available
-import csv # available
-import sys # available
-import importlib # available changed from import imp - depricated
-import os # available
-import time # available
-
-#set top level directory path
-dirpath = '/home/instrument/Desktop/'
-
-#append source directory
-sys.path.append (dirpath+'vlc_rig')
-
-import equip
-import csvf
-import user
-#import macro
-
-#-----------------------------------------------------------------------------------------------------------------------#
- 
-#echo information to the screen
-#clear screen and display logo
-#user.scrn_clr()
-user.scrn_print("---------------------------------------------------------------","")
-user.scrn_print("University of Leeds (c)2021","")
-user.scrn_print("Author T J Amsdon","")
-user.scrn_print("VLC Characterisation System","")
-user.scrn_print("---------------------------------------------------------------","")
-
-user.scrn_print("---------------------------------------------------------------","")
-user.scrn_print("Ensure ALL required equipment is powered-up and initialised......","")
-user.scrn_print("---------------------------------------------------------------","")
-#input("PRESS ENTER TO CONTINUE")
-
-#-----------------------------------------------------------------------------------------------------------------------#
-
-#define test results and screen capture files
-CSV_FILE_NAME_RESULTS="results.csv" #general test data
-CSV_FILE_NAME_CAPTURES="captures.csv" #spectrum analyser screen captures
-CSV_PATH="/home/instrument/Desktop/vlc_rig/"  
-
-#-----------------------------------------------------------------------------------------------------------------------#
-#MAIN() FUNCTION CALL BEGIN
-def main():
-
- #pyVISA connections
- rm = pyvisa.ResourceManager("/lib/x86_64-linux-gnu/libivivisa.so")
-
- #test equipment list  
- addr_spec_an = rm.open_resource("TCPIP0::10.42.0.90::inst0::INSTR") #N9000A Signal Analyser
- addr_sig_gen = rm.open_resource("TCPIP0::10.42.0.38::inst0::INSTR") #E4438C Signal Generator
- addr_osc_scope = rm.open_resource("TCPIP0::10.42.0.60::inst0::INSTR") #DSO6014A Oscilloscope
- #addr_psu = rm.get_instrument("TCPIP0::10.42.0.72::18190::SOCKET") #72-13330 DC Power Supply
-
-#-----------------------------------------------------------------------------------------------------------------------#
-
- #create datetime stamp
- dtstamp = csvf.csv_dtstamp()
-
-#-----------------------------------------------------------------------------------------------------------------------#
- 
- #!!!!!!!!!!!!!!!!!!!!!!!!USER DEFINED INPUT BEGIN!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!! 
- #DUT description
- 
- led_mfr_name = "Osram"                          # LED manufacturer (no spaces allowed)
- led_mfr_prtnum = "FW8-15265"                    # LED manufacturer part number (no spaces allowed)
- led_mfr_srnum = "15265A14300000065"             # LED manufacturer serial number (no spaces allowed)
- led_wavelength_nm = 470.0                       # LED wavelength (nm)
- led_fwd_volt = 2.75                             # LED forward voltage (V)
- led_fwd_current = 500                           # LED forward current (mA)
- led_view_angle = 35                             # LED angle of view (degrees)
- led_material = "InGaN"                          # LED semiconductor material
-
-
- #user information used in file headers and automated email function
- #!!!!!MS OUTLOOK MUST BE OPEN ON THE MACHINE AUTO EMAILING TO WORK!!!!!
-  
- tester = "t.j.amsdon@leeds.ac.uk"        # email address of test operator (no spaces allowed)
- #!!!!!!!!!!!!!!!!!!!!!!!!USER DEFINED INPUT END!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!! 
- 
-#-----------------------------------------------------------------------------------------------------------------------#
-
- #test equipment initialisation
- spec_an = equip.init_cxa(addr_spec_an)
- sig_gen = equip.init_esg(addr_sig_gen)
- osc_scope = equip.init_dso(addr_osc_scope)
- #psu = equip.init_psu(addr_psu) // need to setup names in equip file
-
- #Dummy place holder for the PSU
- psu = "72-13330 DC Power Supply"
-#-----------------------------------------------------------------------------------------------------------------------# 
- 
-#-----------------------------------------------------------------------------------------------------------------------# 
- 
- #create CSV results and capture files and create headers for each
-
-#automatically create CSV file for results and screen captures
- fd_results = csvf.csv_file(CSV_PATH,CSV_FILE_NAME_RESULTS, dtstamp, led_mfr_name, led_mfr_prtnum, led_mfr_srnum)
- fd_captures = csvf.csv_file(CSV_PATH,CSV_FILE_NAME_CAPTURES, dtstamp, led_mfr_name, led_mfr_prtnum, led_mfr_srnum)
- 
- #create file headers 
- csvf.fappn(fd_results, "dt stamp", "tester", "mfct", "mfct prt num" , "serial num", "LED wavelenght (nm)", "LED forward voltage (V)", "LED forward current (V)", "LED angle of view (degrees)", "LED material", "", "", "", "", "", "", "", "", "", "")
- csvf.fappn(fd_results, dtstamp, tester, led_mfr_name, led_mfr_prtnum, led_mfr_srnum, led_wavelength_nm, led_fwd_volt, led_fwd_current, led_view_angle, led_material, "", "", "", "", "", "","", "", "", "")
- csvf.fappn(fd_captures, "dt stamp", "tester", "mfct", "mfct prt num" , "serial num", "LED wavelenght (nm)", "LED forward voltage (V)", "LED forward current (V)", "LED angle of view (degrees)", "LED material", "", "", "", "", "", "", "", "", "", "")
- csvf.fappn(fd_captures, dtstamp, tester, led_mfr_name, led_mfr_prtnum, led_mfr_srnum, led_wavelength_nm, led_fwd_volt, led_fwd_current, led_view_angle, led_material, "", "", "", "", "", "","", "", "", "")
-
- #append files with equipment lists
- csvf.fappn(fd_results, "spectrum analyser", "signal gen", "scope", "psu", "", "", "", "", "", "", "", "", "", "", "","", "", "", "", "")
- csvf.fappn(fd_results, spec_an, sig_gen, osc_scope, psu, psu, "", "", "", "", "", "", "", "", "", "","", "", "", "", "")
- csvf.fappn(fd_captures, "spectrum analyser", "signal gen", "scope", "psu", "", "", "", "", "", "", "", "", "", "", "","", "", "", "", "")
- csvf.fappn(fd_captures, spec_an, sig_gen, osc_scope, psu, "", "", "", "", "", "", "", "", "", "", "","", "", "", "", "")
-
-#-----------------------------------------------------------------------------------------------------------------------#
-
- #echo information to the screen
- #clear screen and display logo
- #user.scrn_clr()
-
- #echo user email address to screen
- user.scrn_print("----Tester/User ID----",tester)
- user.scrn_print("---------------------------------------------------------------","")
- 
- #echo DUT description to screen
- user.scrn_print("----LED description and DC settings----","")
- user.scrn_print("---------------------------------------------------------------","")
- user.scrn_print("manufaurer name", led_mfr_name)
- user.scrn_print("manufaurer part number", led_mfr_prtnum )
- user.scrn_print("manufaurer serial number", led_mfr_srnum)
- user.scrn_print("wavelength (nm)", led_wavelength_nm)
- user.scrn_print("forward voltage (V)", led_fwd_volt)
- user.scrn_print("forward current (mA)", led_fwd_current)
- user.scrn_print("angle of view (degrees)", led_view_angle)
- user.scrn_print("semiconductor material", led_material)
- user.scrn_print("---------------------------------------------------------------","")
- 
- #echo test equipment found to screen
- user.scrn_print("----Test equipment found----","")
- user.scrn_print("---------------------------------------------------------------","")
- user.scrn_print("Spectrum analyser", spec_an)
- user.scrn_print("Signal generator", sig_gen)
- user.scrn_print("Scope", osc_scope)
- user.scrn_print("PSU", psu)
- user.scrn_print("---------------------------------------------------------------","")
-
- #echo test equipment found to screen
- user.scrn_print("----Test results and screen captures files----","")
- user.scrn_print("---------------------------------------------------------------","")
- user.scrn_print("Results file", fd_results)
- user.scrn_print("Captures file", fd_captures)
- user.scrn_print("---------------------------------------------------------------","")
-
-#-----------------------------------------------------------------------------------------------------------------------#
- #!!!!!!!!!!!!!!!!!!!!!!!!USER DEFINED INPUT BEGIN!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
- #test script definition 
- 
- #sweep frequency settings (Hertz)
- freq_start = 1000000  
- freq_stop = 2000000
- sample_pts = 10
-  
- #calcultaed parameter !!DO NOT CHANGE!! 
- step_size = (freq_stop - freq_start) / (sample_pts - 1)
- 
- #sweep lists for voltage and temperature
- psu_list = [9.00,10.00,11.00,12.00,13.00,14.00,15.00,16.00,17.00,18.00,19.00]  #volts DO NOT EXCEED LNB SUPPLY RAILS
- temp_list = [25] #degrees Celcius
-  
- #!!!!!!!!!!!!!!!!!!!!!!!!USER DEFINED INPUT END!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!  
-#-----------------------------------------------------------------------------------------------------------------------# 
-
- user.scrn_print("Test scripts starting......!", "")
- 
- #!!!!!!!!!!!!!!!!!!!!!!!!USER DEFINED INPUT BEGIN!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
- 
-#--------SANDBOX-BEGIN---------------------------#
- 
- equip.lev_esg(addr_sig_gen, -10) #dBm
- equip.output_esg(addr_sig_gen, "ON")
-
- equip.reflev_cxa(addr_spec_an, 10)
- #equip.atten_cxa(addr_spec_an,"AUTO",0) 
- #equip.resbw_cxa(addr_spec_an,"AUTO",0) 
- #equip.vidbw_cxa(addr_spec_an,"AUTO",0) 
-
- freq_current = freq_start
- while(freq_current < (freq_stop + step_size)):
-  equip.freq_esg(addr_sig_gen, freq_current)
-  equip.freqcs_cxa(addr_spec_an, int(freq_current), 1000000)
-  #equip.mrkrmode_cxa(addr_spec_an,1,"NORMAL")
-  #equip.mrkrpksrch_cxa(addr_spec_an,1,"PEAK")
-  freq_current = freq_current + step_size
-
- 
-#--------SANDBOX-END-----------------------------#
-
- addr_spec_an.close() 
- addr_sig_gen.close() 
- addr_osc_scope.close()
- #addr_psu.close()
-
- return(0)
-#-----------------------------------------------------------------------------------------------------------------------#
-#-----------------------------------------------------------------------------------------------------------------------#
-#MAIN() FUNCTION CALL END
-
-#-----------------------------------------------------------------------------------------------------------------------#
-
-#call main function
-main()
-
+#-----------------------------------------------------------------------------------------------------------------------#	
+# Function: vlc_led_test               							      				                                    #
+# Purpose: VLC LED Test Script                                                 	                               		    #
+# Parameters: 										                                                                    #
+# Author: TJA														                                                    #
+# Date: 06/12/2021													                                                    #
+# Revision: A														                                                    #
+# Status: In development											                                                    #
+#-----------------------------------------------------------------------------------------------------------------------#
+
+#imports
+import pyvisa # available changed from visa
+import binascii # available
+import csv # available
+import sys # available
+import importlib # available changed from import imp - depricated
+import os # available
+import time # available
+import argparse # available
+
+#set top level directory path
+dirpath = '/home/instrument/Desktop/'
+
+#append source directory
+sys.path.append (dirpath+'vlc_rig')
+
+import equip
+import csvf
+import colstore
+import user
+import macro
+import scpitrace
+import checkpoint
+import sweepplan
+import rigd
+
+#-----------------------------------------------------------------------------------------------------------------------#
+ 
+#echo information to the screen
+#clear screen and display logo
+#user.scrn_clr()
+user.scrn_print("---------------------------------------------------------------","")
+user.scrn_print("University of Leeds (c)2021","")
+user.scrn_print("Author T J Amsdon","")
+user.scrn_print("VLC Characterisation System","")
+user.scrn_print("---------------------------------------------------------------","")
+
+user.scrn_print("---------------------------------------------------------------","")
+user.scrn_print("Ensure ALL required equipment is powered-up and initialised......","")
+user.scrn_print("---------------------------------------------------------------","")
+#input("PRESS ENTER TO CONTINUE")
+
+#-----------------------------------------------------------------------------------------------------------------------#
+
+#define test results and screen capture files
+CSV_FILE_NAME_RESULTS="results.csv" #general test data
+CSV_FILE_NAME_CAPTURES="captures.csv" #spectrum analyser screen captures
+CSV_FILE_NAME_TRACE="scpitrace.csv" #per command SCPI timings, written when TRACE_SCPI is True
+CSV_FILE_NAME_TRACE_JSON="scpitrace.json"
+TRACE_SCPI=False #time every SCPI command, OPC wait and sleep of the run (see scpitrace.py)
+CSV_PATH="/home/instrument/Desktop/vlc_rig/"  
+RIG_SOCKET=rigd.SOCKET_PATH #instruments opened through the rig daemon when it is running (see rigd.py)
+
+#-----------------------------------------------------------------------------------------------------------------------#
+#MAIN() FUNCTION CALL BEGIN
+def main(rm=None, csv_path=CSV_PATH, trace_scpi=TRACE_SCPI, resume=None):
+
+ #pyVISA connections, rm may be passed in e.g. a simulator.SimResourceManager to run without the lab hardware
+ #the rig daemon keeps the instruments open and initialised between runs, otherwise they are opened directly
+ if rm is None:
+  if rigd.running(RIG_SOCKET):
+   rm = rigd.RemoteResourceManager(RIG_SOCKET)
+  else:
+   rm = pyvisa.ResourceManager("/lib/x86_64-linux-gnu/libivivisa.so")
+ if trace_scpi:
+  rm = scpitrace.wrap_rm(rm)
+  scpitrace.enable()
+
+ #test equipment list (name, VISA resource, init function), opened and initialised concurrently below (init skipped
+ #for instruments the rig daemon already holds initialised)
+ rig = [("spec_an", "TCPIP0::10.42.0.90::inst0::INSTR", rigd.reuse(equip.init_cxa)),   #N9000A Signal Analyser
+        ("sig_gen", "TCPIP0::10.42.0.38::inst0::INSTR", rigd.reuse(equip.init_esg)),   #E4438C Signal Generator
+        ("osc_scope", "TCPIP0::10.42.0.60::inst0::INSTR", rigd.reuse(equip.init_dso))] #DSO6014A Oscilloscope
+ #addr_psu = rm.get_instrument("TCPIP0::10.42.0.72::18190::SOCKET") #72-13330 DC Power Supply
+
+#-----------------------------------------------------------------------------------------------------------------------#
+
+ #create datetime stamp, or carry on with the run stamped resume (the same results files and journal)
+ if resume is None:
+  dtstamp = csvf.csv_dtstamp()
+ else:
+  dtstamp = resume
+
+#-----------------------------------------------------------------------------------------------------------------------#
+ 
+ #!!!!!!!!!!!!!!!!!!!!!!!!USER DEFINED INPUT BEGIN!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!! 
+ #DUT description
+ 
+ led_mfr_name = "Osram"                          # LED manufacturer (no spaces allowed)
+ led_mfr_prtnum = "FW8-15265"                    # LED manufacturer part number (no spaces allowed)
+ led_mfr_srnum = "15265A14300000065"             # LED manufacturer serial number (no spaces allowed)
+ led_wavelength_nm = 470.0                       # LED wavelength (nm)
+ led_fwd_volt = 2.75                             # LED forward voltage (V)
+ led_fwd_current = 500                           # LED forward current (mA)
+ led_view_angle = 35                             # LED angle of view (degrees)
+ led_material = "InGaN"                          # LED semiconductor material
+
+
+ #user information used in file headers and automated email function
+ #!!!!!MS OUTLOOK MUST BE OPEN ON THE MACHINE AUTO EMAILING TO WORK!!!!!
+  
+ tester = "t.j.amsdon@leeds.ac.uk"        # email address of test operator (no spaces allowed)
+ #!!!!!!!!!!!!!!!!!!!!!!!!USER DEFINED INPUT END!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!! 
+ 
+#-----------------------------------------------------------------------------------------------------------------------#
+
+ #applied to each instrument before its init function
+ def prepare(name, addr):
+  #operation complete handling per instrument: "POLL" (legacy), "QUERY" (single *OPC?) or "SRQ" (service request)
+  equip.OPCMODE(addr, "SRQ")
+  #skip resending settings the instruments already hold (hit/miss counts reported at the end of the run)
+  if name in ("spec_an", "sig_gen"):
+   equip.CACHE(addr, "ON")
+  #settling after analyser setting changes: "FIXED" (legacy sleeps) or "SWEEP" (wait for one fresh sweep)
+  if name == "spec_an":
+   equip.SETTLEMODE(addr, "FIXED")
+
+ #test equipment initialisation, all instruments in parallel
+ timestore = time.perf_counter()
+ instruments = equip.INITALL(rm, rig, prepare)
+ (addr_spec_an, spec_an, spec_an_time) = instruments["spec_an"]
+ (addr_sig_gen, sig_gen, sig_gen_time) = instruments["sig_gen"]
+ (addr_osc_scope, osc_scope, osc_scope_time) = instruments["osc_scope"]
+ for (name, (addr, idn, init_time)) in instruments.items():
+  user.scrn_print("%s initialised in %.2f s" %(name, init_time), idn)
+ user.scrn_print("Rig initialised in %.2f s" %(time.perf_counter() - timestore), "")
+ #psu = equip.init_psu(addr_psu) // need to setup names in equip file
+
+ #Dummy place holder for the PSU
+ psu = "72-13330 DC Power Supply"
+#-----------------------------------------------------------------------------------------------------------------------# 
+ 
+#-----------------------------------------------------------------------------------------------------------------------# 
+ 
+ #create CSV results and capture files and create headers for each
+
+#automatically create CSV file for results and screen captures
+ fd_results = csvf.csv_file(csv_path,CSV_FILE_NAME_RESULTS, dtstamp, led_mfr_name, led_mfr_prtnum, led_mfr_srnum)
+ fd_captures = csvf.csv_file(csv_path,CSV_FILE_NAME_CAPTURES, dtstamp, led_mfr_name, led_mfr_prtnum, led_mfr_srnum)
+ if resume is not None and not os.path.exists(checkpoint.journal_path(fd_results)):
+  raise FileNotFoundError("no journal to resume run %s: %s" %(resume, checkpoint.journal_path(fd_results)))
+ 
+ #create file headers, the writers keep both files open for the whole run (and append to them on resume)
+ results = csvf.ResultsWriter(fd_results)
+ captures = csvf.ResultsWriter(fd_captures)
+ if resume is None:
+  results.writerow(["dt stamp", "tester", "mfct", "mfct prt num" , "serial num", "LED wavelenght (nm)", "LED forward voltage (V)", "LED forward current (V)", "LED angle of view (degrees)", "LED material"])
+  results.writerow([dtstamp, tester, led_mfr_name, led_mfr_prtnum, led_mfr_srnum, led_wavelength_nm, led_fwd_volt, led_fwd_current, led_view_angle, led_material])
+  captures.writerow(["dt stamp", "tester", "mfct", "mfct prt num" , "serial num", "LED wavelenght (nm)", "LED forward voltage (V)", "LED forward current (V)", "LED angle of view (degrees)", "LED material"])
+  captures.writerow([dtstamp, tester, led_mfr_name, led_mfr_prtnum, led_mfr_srnum, led_wavelength_nm, led_fwd_volt, led_fwd_current, led_view_angle, led_material])
+
+  #append files with equipment lists
+  results.writerow(["spectrum analyser", "signal gen", "scope", "psu"])
+  results.writerow([spec_an, sig_gen, osc_scope, psu, psu])
+  captures.writerow(["spectrum analyser", "signal gen", "scope", "psu"])
+  captures.writerow([spec_an, sig_gen, osc_scope, psu])
+ results.checkpoint()
+ captures.checkpoint()
+
+ #columnar binary copy of the results and traces (pass store= to the macros and trace readers)
+ store = colstore.ColumnStore(colstore.store_path(fd_results))
+
+#-----------------------------------------------------------------------------------------------------------------------#
+
+ #echo information to the screen
+ #clear screen and display logo
+ #user.scrn_clr()
+
+ #echo user email address to screen
+ user.scrn_print("----Tester/User ID----",tester)
+ user.scrn_print("---------------------------------------------------------------","")
+ 
+ #echo DUT description to screen
+ user.scrn_print("----LED description and DC settings----","")
+ user.scrn_print("---------------------------------------------------------------","")
+ user.scrn_print("manufaurer name", led_mfr_name)
+ user.scrn_print("manufaurer part number", led_mfr_prtnum )
+ user.scrn_print("manufaurer serial number", led_mfr_srnum)
+ user.scrn_print("wavelength (nm)", led_wavelength_nm)
+ user.scrn_print("forward voltage (V)", led_fwd_volt)
+ user.scrn_print("forward current (mA)", led_fwd_current)
+ user.scrn_print("angle of view (degrees)", led_view_angle)
+ user.scrn_print("semiconductor material", led_material)
+ user.scrn_print("---------------------------------------------------------------","")
+ 
+ #echo test equipment found to screen
+ user.scrn_print("----Test equipment found----","")
+ user.scrn_print("---------------------------------------------------------------","")
+ user.scrn_print("Spectrum analyser", spec_an)
+ user.scrn_print("Signal generator", sig_gen)
+ user.scrn_print("Scope", osc_scope)
+ user.scrn_print("PSU", psu)
+ user.scrn_print("---------------------------------------------------------------","")
+
+ #echo test equipment found to screen
+ user.scrn_print("----Test results and screen captures files----","")
+ user.scrn_print("---------------------------------------------------------------","")
+ user.scrn_print("Results file", fd_results)
+ user.scrn_print("Captures file", fd_captures)
+ user.scrn_print("---------------------------------------------------------------","")
+
+#-----------------------------------------------------------------------------------------------------------------------#
+ #!!!!!!!!!!!!!!!!!!!!!!!!USER DEFINED INPUT BEGIN!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+ #test script definition 
+ 
+ #sweep frequency settings (Hertz)
+ freq_start = 1000000  
+ freq_stop = 2000000
+ sample_pts = 10
+ sweep_mode = "LIST"    # "LIST" ESG list sweep stepped by the CXA trigger output (needs the trigger cable), "STEP" per point
+                        # "MAXHOLD" free running ESG list sweep, single max hold acquisition (no trigger cable)
+  
+ #calcultaed parameter !!DO NOT CHANGE!! 
+ step_size = (freq_stop - freq_start) / (sample_pts - 1)
+ freq_list = [freq_start + (step_size*count) for count in range(sample_pts)]
+ 
+ #sweep lists for voltage and temperature
+ psu_list = [9.00,10.00,11.00,12.00,13.00,14.00,15.00,16.00,17.00,18.00,19.00]  #volts DO NOT EXCEED LNB SUPPLY RAILS
+ temp_list = [25] #degrees Celcius
+
+ #time to change each setting (seconds), used to order the sweeps and predict the run duration (see sweepplan.py)
+ temp_soak = 1800       # chamber soak at a new temperature
+ temp_ramp = 60         # chamber ramp, per degree
+ psu_settle = 2         # supply settling after a voltage change
+ freq_settle = 0.01     # ESG retune ("STEP" only, the list sweeps run the frequencies in hardware)
+ meas_time = 0.25       # measurement at each frequency
+  
+ #!!!!!!!!!!!!!!!!!!!!!!!!USER DEFINED INPUT END!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!  
+#-----------------------------------------------------------------------------------------------------------------------# 
+
+ #execution order with the fewest slow setting changes, frequency innermost as the sweep macros run it
+ axes = [sweepplan.axis("temp", temp_list, fixed=temp_soak, rate=temp_ramp), sweepplan.axis("psu", psu_list, fixed=psu_settle)]
+ if sweep_mode == "STEP":
+  axes.append(sweepplan.axis("freq", freq_list, fixed=freq_settle))
+  plan = sweepplan.plan(axes, meas_time, innermost="freq")
+ else:
+  plan = sweepplan.plan(axes, meas_time * sample_pts)
+ sweepplan.report(plan)
+
+ #progress journal, one line per completed point so the run can be resumed with --resume <dtstamp>
+ run = {"sweep_mode": sweep_mode, "freq_start": freq_start, "freq_stop": freq_stop, "sample_pts": sample_pts,
+        "psu_list": psu_list, "temp_list": temp_list}
+ journal = checkpoint.Journal(checkpoint.journal_path(fd_results), run, [results, captures, store])
+ if journal.run != run:
+  for writer in (journal, results, captures, store):
+   writer.close()
+  raise ValueError("run %s was started with different sweep settings: %s" %(dtstamp, journal.run))
+ if resume is not None:
+  user.scrn_print("Resuming run %s, points already completed" %dtstamp, len(journal))
+
+ user.scrn_print("Test scripts starting......!", "")
+ 
+ #!!!!!!!!!!!!!!!!!!!!!!!!USER DEFINED INPUT BEGIN!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
+ 
+ try:
+#--------SANDBOX-BEGIN---------------------------#
+ 
+  equip.lev_esg(addr_sig_gen, -10) #dBm
+  equip.output_esg(addr_sig_gen, "ON")
+
+  equip.reflev_cxa(addr_spec_an, 10)
+  #equip.atten_cxa(addr_spec_an,"AUTO",0) 
+  #equip.resbw_cxa(addr_spec_an,"AUTO",0) 
+  #equip.vidbw_cxa(addr_spec_an,"AUTO",0) 
+
+  #one sweep per temperature and supply voltage in the planned order, the instruments were initialised afresh so on
+  #resume the first sweep still to do sets everything up again and the per point macros skip the points journalled
+  for (setting, freqs) in sweepplan.sweeps(plan, "freq"):
+   (temp, psu_voltage) = (setting["temp"], setting["psu"])
+   if journal.done(temp, psu_voltage):
+    continue
+   hdrenable = 1 if len(journal) > 0 else 0 #column headers once per run
+   #equip.vset_pl303(addr_psu, 1, psu_voltage) // PSU not connected yet
+   user.scrn_print("Sweep at %s degC, supply (V)" %temp, psu_voltage)
+   if sweep_mode == "LIST":
+    macro.freqresp_list(results, captures, addr_spec_an, addr_sig_gen, freq_list, -10, hdrenable, store, journal, (temp, psu_voltage))
+   elif sweep_mode == "MAXHOLD":
+    macro.freqresp_maxhold(results, captures, addr_spec_an, addr_sig_gen, freq_list, -10, hdrenable, store, journal, (temp, psu_voltage))
+   else:
+    macro.freqresp_step(results, addr_spec_an, addr_sig_gen, freqs, -10, 1000000, hdrenable, store, journal, (temp, psu_voltage))
+   journal.mark((temp, psu_voltage))
+
+ 
+#--------SANDBOX-END-----------------------------#
+ finally:
+  #flush, sync and close the results files even if the sweep fails part way through
+  results.close()
+  captures.close()
+  store.close()
+  journal.close()
+  if trace_scpi:
+   scpitrace.disable()
+   scpitrace.export_csv(csvf.csv_file(csv_path,CSV_FILE_NAME_TRACE, dtstamp, led_mfr_name, led_mfr_prtnum, led_mfr_srnum))
+   scpitrace.export_json(csvf.csv_file(csv_path,CSV_FILE_NAME_TRACE_JSON, dtstamp, led_mfr_name, led_mfr_prtnum, led_mfr_srnum), raw=True)
+
+ user.scrn_print("Spectrum analyser cache hits/misses", equip.CACHESTATS(addr_spec_an))
+ user.scrn_print("Signal generator cache hits/misses", equip.CACHESTATS(addr_sig_gen))
+
+ #closed leaving the rig daemon (if used) the settings cached for the next run
+ rigd.release(addr_spec_an)
+ rigd.release(addr_sig_gen)
+ rigd.release(addr_osc_scope)
+ #addr_psu.close()
+
+ return(0)
+#-----------------------------------------------------------------------------------------------------------------------#
+#-----------------------------------------------------------------------------------------------------------------------#
+#MAIN() FUNCTION CALL END
+
+#-----------------------------------------------------------------------------------------------------------------------#
+
+#call main function when run as a script (not when imported, e.g. by the benchmarks)
+if __name__ == "__main__":
+ parser = argparse.ArgumentParser(description="VLC LED characterisation run")
+ parser.add_argument("--resume", metavar="RUN", help="date stamp of an interrupted run to carry on with, as in its results file name")
+ main(resume=parser.parse_args().resume)
+
 #-----------------------------------------------------------------------------------------------------------------------#
\ No newline at end of file